@@ -0,0 +1,98 @@
+# bench_board.py
+"""
+Compare the columnar Board with the previous Dict[str, Tuple[float, Optional[float]]]
+at large symbol counts: memory held, items() iteration, a column scan, and
+pickled size (what crosses the parse-worker pipe).
+
+Usage:
+    python benchmarks/bench_board.py [--symbols 1000 10000 100000]
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from board import Board  # noqa: E402
+from synthetic import make_board  # noqa: E402
+
+
+# Cells as the parser sees them: (ticker, price text, change text, volume text)
+Rows = List[Tuple[str, str, str, str]]
+
+
+def as_text(n: int) -> Rows:
+    return [
+        (symbol, repr(price), "" if change is None else repr(change), str(volume))
+        for symbol, (price, change, volume) in make_board(n).items()
+    ]
+
+
+def build_dict(rows: Rows) -> Dict[str, Tuple[float, Optional[float]]]:
+    # The old parser output: boxed floats in a tuple per ticker, volume dropped
+    return {symbol: (float(price), float(change) if change else None) for symbol, price, change, _ in rows}
+
+
+def build_board(rows: Rows) -> Board:
+    board = Board()
+    for symbol, price, change, volume in rows:
+        board.add(symbol, float(price), float(change) if change else None, int(volume))
+    return board
+
+
+def retained(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    """Build an object and return it with the MiB still allocated for it."""
+    tracemalloc.start()
+    obj = fn()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current / (1024 * 1024)
+
+
+def timed(fn: Callable[[], Any], repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def iterate(data) -> int:
+    n = 0
+    for _, (price, change) in data.items():
+        if change is not None and price > 0:
+            n += 1
+    return n
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--symbols", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = ap.parse_args()
+
+    print(f"{'symbols':>8} {'type':<6} {'MiB':>8} {'items() ms':>11} {'sum(price) ms':>14} {'pickle KiB':>11}")
+    for n in args.symbols:
+        rows = as_text(n)
+        as_dict, dict_mib = retained(lambda: build_dict(rows))
+        as_board, board_mib = retained(lambda: build_board(rows))
+        # The symbol strings are shared and excluded from both figures; the
+        # board's figure includes its symbol list, index and volume column.
+        results = (
+            ("dict", as_dict, dict_mib, lambda: sum(price for price, _ in as_dict.values())),
+            ("board", as_board, board_mib, lambda: sum(as_board.price)),
+        )
+        for name, data, mib, scan in results:
+            print(
+                f"{n:>8} {name:<6} {mib:>8.2f} {timed(lambda: iterate(data)):>11.2f} "
+                f"{timed(scan):>14.2f} {len(pickle.dumps(data)) / 1024:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# bench_fetch_parse.py
+"""
+Compare the text and raw-bytes fetch -> parse paths on a full synthetic page.
+
+The text path mirrors the old pipeline: ``resp.text`` (decode, with charset
+detection when the header has no charset) then ``parse_nse(str)``. The bytes
+path hands ``resp.content`` and the declared charset straight to lxml.
+
+Pages are measured with a charset in Content-Type, with only a <meta>
+charset, and with neither (``text/html`` and no <meta>), where the bytes
+path falls back to ISO-8859-1 rather than detecting the charset.
+
+Usage:
+    python benchmarks/bench_fetch_parse.py [--rows 70 500 2000] [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from fetcher import declared_encoding  # noqa: E402
+from parser import parse_nse  # noqa: E402
+from synthetic import make_board, render_page  # noqa: E402
+
+META = b'<meta charset="utf-8">'
+
+
+def make_response(body: bytes, content_type: str) -> requests.Response:
+    resp = requests.Response()
+    resp._content = body
+    resp.status_code = 200
+    resp.headers["Content-Type"] = content_type
+    resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+    return resp
+
+
+def text_path(body: bytes, content_type: str) -> int:
+    return len(parse_nse(make_response(body, content_type).text))
+
+
+def bytes_path(body: bytes, content_type: str) -> int:
+    resp = make_response(body, content_type)
+    return len(parse_nse(resp.content, encoding=declared_encoding(resp.headers["Content-Type"])))
+
+
+def measure(fn: Callable[[bytes, str], int], body: bytes, content_type: str, repeat: int) -> Tuple[float, float]:
+    """Return (mean CPU ms per tick, peak traced MiB for one tick)."""
+    fn(body, content_type)  # warm caches and imports
+    start = time.process_time()
+    for _ in range(repeat):
+        fn(body, content_type)
+    cpu_ms = (time.process_time() - start) * 1000 / repeat
+
+    tracemalloc.start()
+    fn(body, content_type)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu_ms, peak / (1024 * 1024)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, nargs="+", default=[70, 500, 2000])
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    print(f"{'rows':>6} {'header':<26} {'meta':<5} {'path':<6} {'cpu ms/tick':>12} {'peak MiB':>9}")
+    for rows in args.rows:
+        body = render_page(make_board(rows)).encode("utf-8")
+        bare = body.replace(META, b"")
+        cases = (
+            ("text/html; charset=utf-8", body),
+            ("application/xhtml+xml", body),
+            ("text/html", bare),
+        )
+        for content_type, page in cases:
+            meta = "yes" if META in page else "no"
+            for name, fn in (("text", text_path), ("bytes", bytes_path)):
+                cpu_ms, peak = measure(fn, page, content_type, args.repeat)
+                print(f"{rows:>6} {content_type:<26} {meta:<5} {name:<6} {cpu_ms:>12.2f} {peak:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
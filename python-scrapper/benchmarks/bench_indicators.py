@@ -0,0 +1,116 @@
+# bench_indicators.py
+"""
+Per-tick cost of the incremental indicator stage as window sizes grow,
+against recomputing the same SMA / volatility / VWAP from each ticker's
+last ``window`` samples every tick.
+
+Every configuration runs with sma, ema, vol and vwap at the given window,
+filled past the window before timing so the measured ticks are steady state.
+
+Usage:
+    python benchmarks/bench_indicators.py [--symbols 100] [--windows 10 100 1000]
+"""
+
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from board import Board, SymbolTable  # noqa: E402
+from indicators import IndicatorStage  # noqa: E402
+from synthetic import make_board, mutate_board  # noqa: E402
+
+
+def make_ticks(symbols: int, count: int, table: SymbolTable) -> List[Board]:
+    rng = random.Random(0)
+    source = make_board(symbols)
+    ticks = []
+    for _ in range(count):
+        mutate_board(source, 0.3, rng)
+        board = Board(table)
+        for symbol, (price, change, volume) in source.items():
+            board.add(symbol, price, change, volume)
+        ticks.append(board)
+    return ticks
+
+
+class Recompute:
+    """Baseline: keep raw windows and recompute every indicator from them each tick."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.alpha = 2.0 / (window + 1)
+        self.prices: Dict[str, Deque[float]] = {}
+        self.returns: Dict[str, Deque[float]] = {}
+        self.traded: Dict[str, Deque[Tuple[float, int]]] = {}
+        self.ema: Dict[str, float] = {}
+        self.last_volume: Dict[str, int] = {}
+
+    def update(self, board: Board) -> Dict[str, Dict[str, float]]:
+        out: Dict[str, Dict[str, float]] = {}
+        w = self.window
+        for symbol in board:
+            price = board[symbol][0]
+            volume = board.volume_of(symbol) or 0
+            prices = self.prices.setdefault(symbol, deque(maxlen=w))
+            if prices:
+                self.returns.setdefault(symbol, deque(maxlen=w)).append(math.log(price / prices[-1]))
+            prices.append(price)
+            if symbol in self.last_volume:
+                self.traded.setdefault(symbol, deque(maxlen=w)).append((price, volume - self.last_volume[symbol]))
+            self.last_volume[symbol] = volume
+            self.ema[symbol] = self.ema.get(symbol, price) + self.alpha * (price - self.ema.get(symbol, price))
+
+            values = {"ema": self.ema[symbol]}
+            if len(prices) == w:
+                values["sma"] = sum(prices) / w
+            returns = self.returns.get(symbol)
+            if returns is not None and len(returns) == w and w > 1:
+                values["vol"] = statistics.stdev(returns)
+            traded = self.traded.get(symbol)
+            if traded:
+                total = sum(v for _, v in traded)
+                if total:
+                    values["vwap"] = sum(p * v for p, v in traded) / total
+            out[symbol] = values
+        return out
+
+
+def per_tick_ms(update, ticks: List[Board], warmup: int) -> float:
+    for board in ticks[:warmup]:
+        update(board)
+    samples = []
+    for board in ticks[warmup:]:
+        start = time.perf_counter()
+        update(board)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--symbols", type=int, default=100)
+    ap.add_argument("--windows", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--ticks", type=int, default=30, help="measured ticks per configuration")
+    args = ap.parse_args()
+
+    print(f"{args.symbols} symbols, indicators sma/ema/vol/vwap at each window")
+    print(f"{'window':>7} {'incremental ms/tick':>20} {'recompute ms/tick':>18}")
+    for window in args.windows:
+        table = SymbolTable()
+        ticks = make_ticks(args.symbols, window + 2 + args.ticks, table)
+        stage = IndicatorStage([(kind, window) for kind in ("sma", "ema", "vol", "vwap")], symbol_table=table)
+        incremental = per_tick_ms(stage.update, ticks, window + 2)
+        recompute = per_tick_ms(Recompute(window).update, ticks, window + 2)
+        print(f"{window:>7} {incremental:>20.2f} {recompute:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# bench_push.py
+"""
+Push gateway fan-out: how many concurrent SSE subscribers one process
+sustains.
+
+Starts a PushGateway, connects --subscribers clients spread over
+--client-procs child processes (asyncio, raw sockets), then publishes one
+delta per --tick-interval for --duration seconds. Each delta carries
+--changes synthetic entries shaped like real stream fields, plus a send
+timestamp the clients use to measure delivery latency.
+
+Reports, per subscriber count: delivery latency p50/p99 (publish call to
+the client reading the event), the share of events delivered, the
+gateway's CPU per tick (this process: serialization plus the event-loop
+thread) and how many subscribers were dropped. --slow adds clients that
+stop reading after the snapshot; they should be dropped once they are
+PUSH_QUEUE_SIZE events behind, without raising the others' latency.
+
+Clients share the machine with the gateway, so on few cores the latency
+includes client-side scheduling; run with --client-procs matching spare
+cores.
+
+Usage:
+    python benchmarks/bench_push.py --subscribers 100 1000 5000
+    python benchmarks/bench_push.py --subscribers 1000 --changes 500 --slow 10
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from push import PushGateway  # noqa: E402
+from synthetic import make_board  # noqa: E402
+
+END = "~end"
+
+
+def make_changes(n: int) -> List[Dict[str, str]]:
+    """Stream fields for ``n`` tickers, shaped like RedisStreamer._build_fields output."""
+    changes = []
+    for ticker, (price, change, _) in make_board(n).items():
+        fields = {"ticker": ticker, "price": str(price), "ts": str(int(time.time()))}
+        if change is not None:
+            fields["price_change"] = str(change)
+            fields["price_change_abs"] = str(abs(change))
+            fields["price_change_direction"] = "up" if change > 0 else "down" if change < 0 else "neutral"
+        changes.append(fields)
+    return changes
+
+
+async def subscribe(port: int, latencies: List[float], slow: bool, done: asyncio.Event) -> int:
+    """Read one SSE stream until the end marker; return events received."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=1 << 24)
+    writer.write(b"GET /events HTTP/1.1\r\nHost: bench\r\n\r\n")
+    await reader.readuntil(b"\r\n\r\n")
+    await reader.readuntil(b"\n\n")  # snapshot
+    if slow:
+        # Stop pulling from the socket so the gateway's writes back up
+        writer.transport.pause_reading()
+        await done.wait()
+        writer.close()
+        return 0
+    received = 0
+    try:
+        while True:
+            block = await reader.readuntil(b"\n\n")
+            if not block.startswith(b"id:"):
+                continue
+            received += 1
+            start = block.find(b'"sent":"') + 8
+            if start == 7:
+                continue
+            sent = block[start:block.index(b'"', start)]
+            if sent == END.encode():
+                break
+            latencies.append(time.time() - float(sent))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    writer.close()
+    return received
+
+
+async def client_main(port: int, count: int, slow: int) -> Dict[str, object]:
+    latencies: List[float] = []
+    done = asyncio.Event()
+    slow_tasks = [asyncio.create_task(subscribe(port, latencies, True, done)) for _ in range(slow)]
+    # Connect in batches so the accept backlog does not overflow
+    tasks = []
+    for i in range(0, count, 200):
+        tasks += [asyncio.create_task(subscribe(port, latencies, False, done)) for _ in range(min(200, count - i))]
+        await asyncio.sleep(0.05)
+    received = await asyncio.gather(*tasks, return_exceptions=True)
+    done.set()
+    await asyncio.gather(*slow_tasks, return_exceptions=True)
+    return {
+        "received": sum(r for r in received if isinstance(r, int)),
+        "errors": sum(1 for r in received if isinstance(r, Exception)),
+        "latencies": latencies,
+    }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(subscribers: int, slow: int, procs: int, changes: int, tick_interval: float, duration: float, queue_size: int) -> Dict[str, float]:
+    gateway = PushGateway(port=0, host="127.0.0.1", queue_size=queue_size)
+    gateway.start()
+    gateway.publish(make_changes(changes))  # initial board for the snapshot
+
+    children = []
+    for i in range(procs):
+        count = subscribers // procs + (1 if i < subscribers % procs else 0)
+        n_slow = slow // procs + (1 if i < slow % procs else 0)
+        children.append(subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--child", str(gateway.port), str(count), str(n_slow)],
+            stdout=subprocess.PIPE, text=True,
+        ))
+    deadline = time.time() + 60
+    while gateway.stats()["push_subscribers"] < subscribers + slow:
+        if time.time() > deadline:
+            raise RuntimeError(f"only {gateway.stats()['push_subscribers']} subscribers connected")
+        time.sleep(0.05)
+
+    body = make_changes(changes)
+    ticks = 0
+    cpu_start = time.process_time()
+    started = time.time()
+    next_tick = started
+    while time.time() - started < duration:
+        gateway.publish([{"ticker": "~bench", "sent": repr(time.time())}] + body)
+        ticks += 1
+        next_tick += tick_interval
+        time.sleep(max(0.0, next_tick - time.time()))
+    # Let the last tick drain before the end marker
+    time.sleep(min(1.0, tick_interval * 2))
+    cpu_ms = (time.process_time() - cpu_start) * 1000
+    gateway.publish([{"ticker": "~bench", "sent": END}])
+
+    latencies: List[float] = []
+    received = errors = 0
+    for child in children:
+        out, _ = child.communicate(timeout=120)
+        result = json.loads(out.strip().splitlines()[-1])
+        latencies += result["latencies"]
+        received += result["received"]
+        errors += result["errors"]
+    dropped = gateway.stats()["push_dropped"]
+    gateway.close()
+
+    return {
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        # +1 for the end marker each fast subscriber reads
+        "delivered": received / (subscribers * (ticks + 1)),
+        "cpu_ms_per_tick": cpu_ms / ticks,
+        "dropped": dropped,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--subscribers", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--slow", type=int, default=0, help="extra subscribers that stop reading")
+    ap.add_argument("--client-procs", type=int, default=2)
+    ap.add_argument("--changes", type=int, default=70, help="entries per delta")
+    ap.add_argument("--tick-interval", type=float, default=0.5)
+    ap.add_argument("--duration", type=float, default=10.0)
+    ap.add_argument("--queue-size", type=int, default=64)
+    ap.add_argument("--child", nargs=3, type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        port, count, slow = args.child
+        print(json.dumps(asyncio.run(client_main(port, count, slow))))
+        return
+
+    logging.basicConfig(level=logging.ERROR)
+    print(f"{'subs':>6} {'slow':>5} {'p50 ms':>8} {'p99 ms':>8} {'delivered':>10} {'cpu ms/tick':>12} {'dropped':>8} {'errors':>7}")
+    for subscribers in args.subscribers:
+        m = run(subscribers, args.slow, args.client_procs, args.changes, args.tick_interval, args.duration, args.queue_size)
+        print(
+            f"{subscribers:>6} {args.slow:>5} {m['p50_ms']:>8.1f} {m['p99_ms']:>8.1f} {m['delivered']:>10.1%} "
+            f"{m['cpu_ms_per_tick']:>12.2f} {m['dropped']:>8.0f} {m['errors']:>7.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
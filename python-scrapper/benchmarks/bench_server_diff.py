@@ -0,0 +1,115 @@
+# bench_server_diff.py
+"""
+Compare client-side diffing with server-side (Lua) diffing at different
+board sizes and change rates.
+
+Paths:
+  client      RedisStreamer default: diff in Python, one XADD per change
+  client+pipe diff in Python, all XADDs in one pipeline
+  server      ServerDiff: whole board in one EVALSHA, diff in Redis
+
+Run against a real Redis (network round trips are the point):
+    REDIS_URL=redis://localhost:6379 python benchmarks/bench_server_diff.py
+Use --fake for a fakeredis smoke run (needs fakeredis[lua]; timings are
+not representative).
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis  # noqa: E402
+
+import config  # noqa: E402
+from streamer import RedisStreamer  # noqa: E402
+from synthetic import SyntheticBoard, make_board, mutate_board  # noqa: E402
+
+Board = Dict[str, Tuple[float, Optional[float]]]
+
+
+def as_parsed(board: SyntheticBoard) -> Board:
+    return {ticker: (price, change) for ticker, (price, change, _) in board.items()}
+
+
+def client_pipelined(streamer: RedisStreamer) -> Callable[[Board, float], None]:
+    def publish(data: Board, ts: float) -> None:
+        pipe = streamer.r.pipeline(transaction=False)
+        published = []
+        for ticker, (price, change) in data.items():
+            last = streamer.last_prices.get(ticker)
+            if last is None or price != last:
+                pipe.xadd(
+                    config.STREAM_NAME,
+                    fields=streamer._build_fields(ticker, price, change, last, int(ts)),  # type: ignore[arg-type]
+                    maxlen=config.STREAM_MAXLEN,
+                    approximate=True,
+                )
+                published.append((ticker, price))
+        pipe.execute()
+        for ticker, price in published:
+            streamer.last_prices[ticker] = price
+    return publish
+
+
+def run(r: redis.Redis, mode: str, rows: int, change_rate: float, ticks: int) -> Tuple[float, float]:
+    """Return (median ms per tick, events per tick) for one configuration."""
+    r.delete(config.STREAM_NAME, config.LAST_PRICES_KEY)
+    with patch("streamer.redis.Redis.from_url", return_value=r):
+        streamer = RedisStreamer(server_side=(mode == "server"))
+    publish: Callable[[Board, float], object] = (
+        client_pipelined(streamer) if mode == "client+pipe" else streamer.publish_changes
+    )
+
+    rng = random.Random(1)
+    board = make_board(rows)
+    publish(as_parsed(board), time.time())  # first tick publishes everything
+
+    samples: List[float] = []
+    start_len = r.xlen(config.STREAM_NAME)
+    for _ in range(ticks):
+        mutate_board(board, change_rate, rng)
+        data = as_parsed(board)
+        t0 = time.perf_counter()
+        publish(data, time.time())
+        samples.append((time.perf_counter() - t0) * 1000)
+    events = (r.xlen(config.STREAM_NAME) - start_len) / ticks  # type: ignore[operator]
+    return statistics.median(samples), events
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, nargs="+", default=[70, 500, 2000])
+    ap.add_argument("--change-rates", type=float, nargs="+", default=[0.01, 0.1, 0.5])
+    ap.add_argument("--ticks", type=int, default=50)
+    ap.add_argument("--redis-url", default=config.REDIS_URL)
+    ap.add_argument("--fake", action="store_true", help="use fakeredis instead of a server")
+    args = ap.parse_args()
+
+    if args.fake:
+        import fakeredis
+        r = fakeredis.FakeRedis()
+    else:
+        r = redis.Redis.from_url(args.redis_url)
+    # Keep every event so xlen counts them
+    config.STREAM_MAXLEN = 10_000_000
+    config.STREAM_NAME = "bench:server_diff"
+    config.LAST_PRICES_KEY = "bench:server_diff:last"
+
+    print(f"{'rows':>6} {'rate':>5} {'path':<12} {'ms/tick p50':>12} {'events/tick':>12}")
+    for rows in args.rows:
+        for rate in args.change_rates:
+            for mode in ("client", "client+pipe", "server"):
+                ms, events = run(r, mode, rows, rate, args.ticks)
+                print(f"{rows:>6} {rate:>5.2f} {mode:<12} {ms:>12.2f} {events:>12.1f}")
+    r.delete(config.STREAM_NAME, config.LAST_PRICES_KEY)
+
+
+if __name__ == "__main__":
+    main()
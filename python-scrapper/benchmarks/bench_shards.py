@@ -0,0 +1,78 @@
+# bench_shards.py
+"""
+Sharded publishing throughput: publish synthetic ticks through
+RedisStreamer with a hash ring over several Redis instances and report
+entries, pipeline time and throughput per shard.
+
+Start local instances with the compose "sharded" profile
+(``docker compose --profile sharded up -d`` from the repo root), or use
+--fake for one in-process fakeredis server per shard. fakeredis runs under
+the GIL, so --fake shows the key distribution and the per-node batching,
+not the parallel speed-up.
+
+Usage:
+    python benchmarks/bench_shards.py --urls redis://localhost:6380 redis://localhost:6381 redis://localhost:6382
+    python benchmarks/bench_shards.py --fake 3 --rows 2000 --ticks 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis  # noqa: E402
+from redis import Redis  # noqa: E402
+
+from shards import HashRingShards  # noqa: E402
+from streamer import RedisStreamer  # noqa: E402
+from synthetic import make_board, mutate_board  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--urls", nargs="+", default=[])
+    ap.add_argument("--fake", type=int, default=0, help="number of fakeredis shards instead of --urls")
+    ap.add_argument("--rows", type=int, default=2000)
+    ap.add_argument("--ticks", type=int, default=50)
+    ap.add_argument("--change-rate", type=float, default=0.3)
+    args = ap.parse_args()
+
+    clients: Dict[str, Redis]
+    if args.fake:
+        import fakeredis
+        clients = {f"fake-{i}": fakeredis.FakeRedis(server=fakeredis.FakeServer()) for i in range(args.fake)}
+    elif args.urls:
+        clients = {url: redis.Redis.from_url(url) for url in args.urls}
+    else:
+        ap.error("pass --urls or --fake N")
+
+    shards = HashRingShards(list(clients), clients=clients)
+    streamer = RedisStreamer(shards=shards)
+    rng = random.Random(0)
+    source = make_board(args.rows)
+
+    started = time.perf_counter()
+    for tick in range(args.ticks):
+        if tick:
+            mutate_board(source, args.change_rate, rng)
+        streamer.publish_changes({symbol: (price, change) for symbol, (price, change, _) in source.items()})
+    elapsed = time.perf_counter() - started
+    shards.close()
+
+    stats = streamer.stats()
+    print(f"{args.rows} tickers, {args.ticks} ticks, {stats['published']} entries in {elapsed:.2f}s "
+          f"({stats['published'] / elapsed:.0f} entries/s overall)")
+    print(f"{'shard':<28} {'entries':>8} {'pipeline ms':>12} {'entries/s':>10} {'errors':>7}")
+    for node in shards.nodes():
+        entries = stats[f"shard_entries:{node}"]
+        busy_ms = stats[f"shard_ms:{node}"]
+        rate = entries / (busy_ms / 1000) if busy_ms else 0.0
+        print(f"{node:<28} {entries:>8} {busy_ms:>12} {rate:>10.0f} {stats[f'shard_errors:{node}']:>7}")
+
+
+if __name__ == "__main__":
+    main()
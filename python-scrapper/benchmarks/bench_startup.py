@@ -0,0 +1,152 @@
+# bench_startup.py
+"""
+Cold-start benchmark.
+
+Import time: runs ``python -X importtime -c "import main"`` --runs times
+and reports the median cumulative import time of ``main``, next to the
+same import with requests/redis/bs4/lxml/schedule forced in eagerly (what
+the scraper paid before lazy imports), plus the slowest modules by self
+time.
+
+Time to first publish: spawns fresh interpreters that import ``main``,
+optionally run ``main.startup()`` (parallel warm-up), then run one
+``main.job()`` against a local synthetic upstream with fakeredis standing in
+for Redis. Reports milliseconds since spawn at which imports finished, the
+process was ready and the first board landed in the stream. fakeredis
+set-up time is excluded from the marks.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --rows 2000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+EAGER = ["requests", "redis", "bs4", "lxml.etree", "schedule"]
+
+
+def importtime(code: str) -> List[Tuple[str, int, int]]:
+    """Run ``code`` under -X importtime; return (module, self_us, cumulative_us) rows."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # One space after the bar, then two per nesting level
+        rows.append((name.rstrip()[1:], int(self_us), int(cumulative_us)))
+    return rows
+
+
+def top_level_ms(rows: List[Tuple[str, int, int]], names: List[str]) -> float:
+    """Sum the cumulative time of the given top-level (unindented) imports."""
+    return sum(cum for name, _, cum in rows if name in names) / 1000
+
+
+def bench_imports(runs: int, top: int) -> None:
+    lazy: List[float] = []
+    eager: List[float] = []
+    last: List[Tuple[str, int, int]] = []
+    for _ in range(runs):
+        last = importtime("import main")
+        lazy.append(top_level_ms(last, ["main"]))
+        eager.append(top_level_ms(importtime(f"import {', '.join(EAGER)}; import main"), EAGER + ["main"]))
+
+    print(f"import main (median of {runs}, -X importtime cumulative)")
+    print(f"  lazy:  {statistics.median(lazy):8.1f} ms")
+    print(f"  eager: {statistics.median(eager):8.1f} ms")
+    print("slowest modules by self time (lazy, last run)")
+    for name, self_us, cum_us in sorted(last, key=lambda row: -row[1])[:top]:
+        print(f"  {self_us / 1000:7.2f} ms self {cum_us / 1000:8.2f} ms cum  {name.strip()}")
+
+
+def child(spawned: float, url: str, warm: bool) -> None:
+    """Run in a fresh interpreter: import, (warm up), publish once, print marks."""
+    sys.path.insert(0, ROOT)
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    import main as pipeline
+    import config
+    imported = time.time()
+
+    # fakeredis imports redis eagerly; keep its cost out of the marks
+    t0 = time.time()
+    import fakeredis
+    from unittest.mock import patch
+    r = fakeredis.FakeRedis()
+    excluded = time.time() - t0
+
+    with patch.object(config, "URL", url), \
+            patch("streamer.redis.Redis.from_url", return_value=r):
+        if warm:
+            pipeline.startup()
+        ready = time.time() - excluded
+        pipeline.job()
+        published = time.time() - excluded
+    assert r.xlen(config.STREAM_NAME) > 0, "first tick published nothing"
+
+    print(json.dumps({
+        "import_ms": (imported - spawned) * 1000,
+        "ready_ms": (ready - spawned) * 1000,
+        "publish_ms": (published - spawned) * 1000,
+    }))
+
+
+def bench_first_publish(runs: int, rows: int) -> None:
+    sys.path.insert(0, HERE)
+    from e2e_latency import SyntheticUpstream
+
+    upstream = SyntheticUpstream(rows, 0.0, 1.0)
+    try:
+        print(f"\ntime to first publish, {rows} rows (median of {runs}, ms since spawn)")
+        print(f"{'mode':>10} {'imported':>9} {'ready':>9} {'published':>10}")
+        for warm in (False, True):
+            marks: Dict[str, List[float]] = {"import_ms": [], "ready_ms": [], "publish_ms": []}
+            for _ in range(runs):
+                args = [sys.executable, os.path.abspath(__file__), "--child", str(time.time()), "--url", upstream.url]
+                if warm:
+                    args.append("--warm")
+                out = subprocess.run(args, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+                for key, value in json.loads(out.strip().splitlines()[-1]).items():
+                    marks[key].append(value)
+            print(
+                f"{'warm-up' if warm else 'cold':>10} {statistics.median(marks['import_ms']):>9.1f} "
+                f"{statistics.median(marks['ready_ms']):>9.1f} {statistics.median(marks['publish_ms']):>10.1f}"
+            )
+    finally:
+        upstream.stop()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--rows", type=int, default=500, help="synthetic board size")
+    ap.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    ap.add_argument("--child", type=float, help=argparse.SUPPRESS)
+    ap.add_argument("--url", help=argparse.SUPPRESS)
+    ap.add_argument("--warm", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child is not None:
+        child(args.child, args.url, args.warm)
+        return
+    bench_imports(args.runs, args.top)
+    bench_first_publish(args.runs, args.rows)
+
+
+if __name__ == "__main__":
+    main()
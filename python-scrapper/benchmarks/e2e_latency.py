@@ -0,0 +1,216 @@
+# e2e_latency.py
+"""
+End-to-end scrape-to-stream latency harness.
+
+Runs the real ``main.job`` pipeline (fetch -> parse -> publish) against:
+  * a local HTTP server emitting synthetic NSE pages whose prices mutate
+    on a schedule, recording when each price first appeared, and
+  * a Redis stand-in: the server at --redis-url, or fakeredis with --fake.
+
+For every (board size, change rate) it reports detection latency (time
+from a price appearing on the page to its entry landing in the stream,
+taken from the entry ID), events/sec, CPU per tick and how many price
+moves were overwritten before any tick saw them.
+
+Usage:
+    python benchmarks/e2e_latency.py --fake --rows 70 500 --change-rates 0.05 0.5
+    REDIS_URL=redis://localhost:6379 python benchmarks/e2e_latency.py --duration 60
+"""
+
+import argparse
+import bisect
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis  # noqa: E402
+
+import config  # noqa: E402
+import main as pipeline  # noqa: E402
+from synthetic import make_board, mutate_board, render_page  # noqa: E402
+
+
+class SyntheticUpstream:
+    """Local NSE stand-in whose board mutates every ``interval`` seconds."""
+
+    def __init__(self, rows: int, change_rate: float, interval: float, seed: int = 0):
+        self.board = make_board(rows, seed)
+        self.change_rate = change_rate
+        self.interval = interval
+        self.rng = random.Random(seed)
+        # ticker -> [(appeared_at, price), ...] in time order
+        self.history: Dict[str, List[Tuple[float, float]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._page = render_page(self.board).encode("utf-8")
+
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                with upstream._lock:
+                    body = upstream._page
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/nse/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _publish_page(self, changed: List[str]) -> None:
+        page = render_page(self.board).encode("utf-8")
+        with self._lock:
+            self._page = page
+            now = time.time()
+            for ticker in changed:
+                self.history.setdefault(ticker, []).append((now, self.board[ticker][0]))
+
+    def _mutate_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            changed = mutate_board(self.board, self.change_rate, self.rng)
+            self._publish_page(changed)
+
+    def start_mutating(self) -> None:
+        threading.Thread(target=self._mutate_loop, daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def detection_latencies(
+    history: Dict[str, List[Tuple[float, float]]],
+    entries: List[Tuple[float, str, float]],
+) -> Tuple[List[float], int]:
+    """
+    Match stream entries to the page change that produced them.
+
+    Args:
+        history: ticker -> [(appeared_at, price)] from the upstream.
+        entries: (landed_at, ticker, price) read back from the stream.
+
+    Returns:
+        (latencies in ms, number of page changes never published)
+    """
+    latencies: List[float] = []
+    matched = set()
+    for landed_at, ticker, price in entries:
+        changes = history.get(ticker, [])
+        # Latest page change at or before the entry landed
+        i = bisect.bisect_right([t for t, _ in changes], landed_at) - 1
+        if i >= 0 and changes[i][1] == price and (ticker, i) not in matched:
+            matched.add((ticker, i))
+            latencies.append((landed_at - changes[i][0]) * 1000)
+    total = sum(len(changes) for changes in history.values())
+    return latencies, total - len(matched)
+
+
+def read_entries(r: redis.Redis, stream: str) -> List[Tuple[float, str, float]]:
+    entries = []
+    for entry_id, fields in r.xrange(stream):  # type: ignore[union-attr]
+        landed_ms = int(entry_id.decode().split("-")[0])
+        entries.append((landed_ms / 1000, fields[b"ticker"].decode(), float(fields[b"price"])))
+    return entries
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(
+    r: redis.Redis,
+    rows: int,
+    change_rate: float,
+    mutate_interval: float,
+    tick_interval: float,
+    duration: float,
+) -> Dict[str, float]:
+    """Run the pipeline against a fresh upstream and stream; return metrics."""
+    stream = "bench:e2e"
+    r.delete(stream)
+    upstream = SyntheticUpstream(rows, change_rate, mutate_interval)
+
+    cpu_ms: List[float] = []
+    with patch.object(config, "URL", upstream.url), \
+            patch.object(config, "STREAM_NAME", stream), \
+            patch.object(config, "STREAM_MAXLEN", 10_000_000), \
+            patch("streamer.redis.Redis.from_url", return_value=r):
+        pipeline._streamer = None
+        # The first tick publishes the whole initial board; only changes
+        # made after it count towards detection latency
+        pipeline.job()
+        upstream.start_mutating()
+        started = time.time()
+        next_tick = started
+        while time.time() - started < duration:
+            t0 = time.thread_time()
+            pipeline.job()
+            cpu_ms.append((time.thread_time() - t0) * 1000)
+            next_tick += tick_interval
+            time.sleep(max(0.0, next_tick - time.time()))
+        elapsed = time.time() - started
+        pipeline._streamer = None
+
+    upstream.stop()
+    entries = read_entries(r, stream)[rows:]
+    latencies, missed = detection_latencies(upstream.history, entries)
+    r.delete(stream)
+    return {
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "events_per_s": len(entries) / elapsed,
+        "cpu_ms_per_tick": statistics.median(cpu_ms),
+        "missed": missed,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, nargs="+", default=[70, 500, 2000])
+    ap.add_argument("--change-rates", type=float, nargs="+", default=[0.05, 0.5])
+    ap.add_argument("--mutate-interval", type=float, default=0.5, help="seconds between page mutations")
+    ap.add_argument("--tick-interval", type=float, default=1.0, help="seconds between pipeline runs")
+    ap.add_argument("--duration", type=float, default=20.0, help="seconds per configuration")
+    ap.add_argument("--redis-url", default=config.REDIS_URL)
+    ap.add_argument("--fake", action="store_true", help="use fakeredis instead of a server")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    r: redis.Redis
+    if args.fake:
+        import fakeredis
+        r = fakeredis.FakeRedis()
+    else:
+        r = redis.Redis.from_url(args.redis_url)
+
+    print(f"{'rows':>6} {'rate':>5} {'p50 ms':>8} {'p99 ms':>8} {'events/s':>9} {'cpu ms/tick':>12} {'missed':>7}")
+    for rows in args.rows:
+        for rate in args.change_rates:
+            m = run(r, rows, rate, args.mutate_interval, args.tick_interval, args.duration)
+            print(
+                f"{rows:>6} {rate:>5.2f} {m['p50_ms']:>8.1f} {m['p99_ms']:>8.1f} "
+                f"{m['events_per_s']:>9.1f} {m['cpu_ms_per_tick']:>12.2f} {m['missed']:>7.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# synthetic.py
+"""Synthetic NSE boards and pages for benchmarks."""
+
+import random
+from typing import Dict, List, Optional, Tuple
+
+# ticker -> (price, change, volume)
+SyntheticBoard = Dict[str, Tuple[float, Optional[float], int]]
+
+
+def make_symbols(n: int) -> List[str]:
+    """Return ``n`` distinct ticker-like symbols (AAAA, AAAB, ...)."""
+    symbols = []
+    for i in range(n):
+        chars = []
+        for _ in range(4):
+            i, rem = divmod(i, 26)
+            chars.append(chr(ord("A") + rem))
+        symbols.append("".join(reversed(chars)))
+    return symbols
+
+
+def make_board(n: int, seed: int = 0) -> SyntheticBoard:
+    """Build a board of ``n`` tickers with plausible prices and volumes."""
+    rng = random.Random(seed)
+    board: SyntheticBoard = {}
+    for symbol in make_symbols(n):
+        price = round(rng.uniform(0.5, 400.0), 2)
+        change = None if rng.random() < 0.1 else round(rng.uniform(-2.0, 2.0), 2)
+        board[symbol] = (price, change, rng.randint(100, 2_000_000))
+    return board
+
+
+def mutate_board(board: SyntheticBoard, change_rate: float, rng: random.Random) -> List[str]:
+    """
+    Move the price of roughly ``change_rate`` of the tickers in place.
+
+    Returns:
+        List[str]: The tickers whose price changed.
+    """
+    changed = []
+    for symbol, (price, change, volume) in board.items():
+        if rng.random() < change_rate:
+            step = rng.choice((-0.05, 0.05, -0.10, 0.10))
+            new_price = round(max(0.05, price + step), 2)
+            board[symbol] = (new_price, round((change or 0.0) + step, 2), volume + rng.randint(100, 5_000))
+            changed.append(symbol)
+    return changed
+
+
+def render_page(board: SyntheticBoard, padding_kb: int = 40) -> str:
+    """
+    Render a board as an NSE-style page: the full listing table plus a
+    smaller "top movers" table and some filler markup, like the live site.
+    """
+    rows = []
+    for symbol, (price, change, volume) in board.items():
+        change_text = "—" if change is None else f"{change:+.2f}"
+        rows.append(
+            f"<tr><td><a href=\"/nse/{symbol.lower()}.html\">{symbol}</a></td>"
+            f"<td>{symbol.title()} Holdings Plc — Ordinary</td>"
+            f"<td>{volume:,}</td><td>{price:,.2f}</td><td>{change_text}</td></tr>"
+        )
+    movers = "".join(rows[:5])
+    filler = "<p>Market commentary placeholder. " * (padding_kb * 1024 // 32) + "</p>"
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>NSE</title></head><body>"
+        f"<table class=\"movers\"><thead><tr><th>Ticker</th></tr></thead><tbody>{movers}</tbody></table>"
+        f"<div>{filler}</div>"
+        "<table class=\"listing\"><thead><tr><th>Ticker</th><th>Name</th><th>Volume</th>"
+        f"<th>Price</th><th>Change</th></tr></thead><tbody>{''.join(rows)}</tbody></table>"
+        "</body></html>"
+    )
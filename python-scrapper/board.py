@@ -0,0 +1,186 @@
+# board.py
+
+from array import array
+from collections.abc import ItemsView
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+Quote = Tuple[float, Optional[float]]
+
+# Bits of Board.flags
+HAS_CHANGE = 1
+HAS_VOLUME = 2
+
+
+class SymbolTable:
+    """
+    Append-only symbol -> stable integer id mapping.
+
+    Share one table between successive boards so a ticker keeps the same id
+    from tick to tick; aggregators can then keep per-ticker state in flat
+    arrays indexed by id instead of dicts keyed by symbol.
+    """
+
+    __slots__ = ("symbols", "_ids")
+
+    def __init__(self) -> None:
+        self.symbols: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def id_for(self, symbol: str) -> int:
+        sid = self._ids.get(symbol)
+        if sid is None:
+            sid = self._ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return sid
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
+def quote_fields(ticker: str, price: float, price_change: Optional[float], ts: int) -> Dict[str, str]:
+    """
+    Stream entry fields carried by a quote alone: ticker, price, timestamp
+    and, when the page gave one, the price change with its size and
+    direction. Redis accepts string keys and values.
+    """
+    fields = {
+        "ticker": str(ticker),
+        "price": str(price),
+        "ts": str(ts)
+    }
+    if price_change is not None:
+        fields["price_change"] = str(price_change)
+        fields["price_change_abs"] = str(abs(price_change))
+        fields["price_change_direction"] = "up" if price_change > 0 else "down" if price_change < 0 else "neutral"
+    return fields
+
+
+class _BoardItems(ItemsView):
+    """items() view that walks the columns directly instead of re-looking up each key."""
+
+    _mapping: "Board"
+
+    def __iter__(self) -> Iterator[Tuple[str, Quote]]:
+        board = self._mapping
+        for symbol, price, change, flags in zip(board.symbols, board.price, board.change, board.flags):
+            yield symbol, (price, change if flags & HAS_CHANGE else None)
+
+
+class Board(Mapping[str, Quote]):
+    """
+    Columnar parsed board: one row per ticker, in page order.
+
+    Columns are ``array`` objects (price and change as doubles, volume as
+    int64) plus a ``flags`` validity mask (HAS_CHANGE, HAS_VOLUME), names,
+    and stable ids from an optional shared SymbolTable. As a Mapping it
+    behaves like the previous ``Dict[str, Tuple[float, Optional[float]]]``:
+    ``board[ticker] -> (price, change_or_None)``.
+
+    Boards pickle as raw column bytes, which keeps hand-offs between the
+    parser, its worker processes and the streamer cheap.
+    """
+
+    __slots__ = ("symbols", "names", "price", "change", "volume", "flags", "ids", "symbol_table", "_index")
+
+    def __init__(self, symbol_table: Optional[SymbolTable] = None) -> None:
+        self.symbols: List[str] = []
+        self.names: List[str] = []
+        self.price = array("d")
+        self.change = array("d")
+        self.volume = array("q")
+        self.flags = bytearray()
+        self.ids = array("i")
+        self.symbol_table = symbol_table
+        self._index: Dict[str, int] = {}
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Quote], symbol_table: Optional[SymbolTable] = None) -> "Board":
+        """Build a board from a ticker -> (price, change) mapping."""
+        if isinstance(data, Board):
+            return data
+        board = cls(symbol_table)
+        for symbol, (price, change) in data.items():
+            board.add(symbol, price, change)
+        return board
+
+    def add(
+        self,
+        symbol: str,
+        price: float,
+        change: Optional[float] = None,
+        volume: Optional[int] = None,
+        name: str = "",
+    ) -> None:
+        """Append a row, or overwrite it if the symbol is already present."""
+        flags = (HAS_CHANGE if change is not None else 0) | (HAS_VOLUME if volume is not None else 0)
+        row = self._index.get(symbol)
+        if row is not None:
+            self.price[row] = price
+            self.change[row] = change or 0.0
+            self.volume[row] = volume or 0
+            self.flags[row] = flags
+            self.names[row] = name
+            return
+        self._index[symbol] = len(self.symbols)
+        self.symbols.append(symbol)
+        self.names.append(name)
+        self.price.append(price)
+        self.change.append(change or 0.0)
+        self.volume.append(volume or 0)
+        self.flags.append(flags)
+        if self.symbol_table is not None:
+            self.ids.append(self.symbol_table.id_for(symbol))
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        # The symbol index is rebuilt on load rather than pickled
+        return (self.symbols, self.names, self.price, self.change, self.volume, self.flags, self.ids, self.symbol_table)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        (self.symbols, self.names, self.price, self.change,
+         self.volume, self.flags, self.ids, self.symbol_table) = state
+        self._index = {symbol: row for row, symbol in enumerate(self.symbols)}
+
+    def __getitem__(self, symbol: str) -> Quote:
+        row = self._index[symbol]
+        return self.price[row], self.change[row] if self.flags[row] & HAS_CHANGE else None
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def items(self) -> _BoardItems:  # type: ignore[override]
+        return _BoardItems(self)
+
+    def row(self, symbol: str) -> int:
+        """Row index of a symbol."""
+        return self._index[symbol]
+
+    def volume_of(self, symbol: str) -> Optional[int]:
+        row = self._index[symbol]
+        return self.volume[row] if self.flags[row] & HAS_VOLUME else None
+
+    def name_of(self, symbol: str) -> str:
+        return self.names[self._index[symbol]]
+
+    def numpy(self) -> Dict[str, Any]:
+        """
+        Zero-copy NumPy views of the numeric columns (requires numpy).
+
+        The views share memory with the board; copy them before mutating.
+        """
+        import numpy as np
+
+        return {
+            "price": np.frombuffer(self.price, dtype=np.float64),
+            "change": np.frombuffer(self.change, dtype=np.float64),
+            "volume": np.frombuffer(self.volume, dtype=np.int64),
+            "flags": np.frombuffer(self.flags, dtype=np.uint8),
+        }
+
+    def __repr__(self) -> str:
+        return f"Board({dict(self.items())!r})"
@@ -0,0 +1,126 @@
+# coalescer.py
+
+import logging
+from typing import Dict, List, Optional, Tuple
+import config
+from board import Quote
+
+logger = logging.getLogger(__name__)
+
+
+class Coalescer:
+    """
+    Per-ticker publish policy that suppresses noisy price changes.
+
+    A change is published only when the ticker's last publish is at least
+    ``min_interval`` seconds old and the move since the last published price
+    clears both ``min_abs_change`` and ``min_pct_change``. Suppressed values
+    are held as pending and published by a trailing flush once they have
+    been pending for ``flush_after`` seconds, so the final value always
+    reaches the stream. A ticker that flips back to its published price
+    drops its pending value.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 0.0,
+        min_abs_change: float = 0.0,
+        min_pct_change: float = 0.0,
+        flush_after: float = 60.0,
+    ):
+        self.min_interval = min_interval
+        self.min_abs_change = min_abs_change
+        self.min_pct_change = min_pct_change
+        self.flush_after = flush_after
+        self.suppressed = 0
+        self.flushed = 0
+        self._published_at: Dict[str, float] = {}
+        self._pending: Dict[str, Tuple[Quote, float]] = {}
+
+    @classmethod
+    def from_config(cls) -> Optional["Coalescer"]:
+        """Build a coalescer from config, or None when coalescing is disabled."""
+        if not (config.COALESCE_MIN_INTERVAL or config.COALESCE_MIN_ABS_CHANGE or config.COALESCE_MIN_PCT_CHANGE):
+            return None
+        return cls(
+            min_interval=config.COALESCE_MIN_INTERVAL,
+            min_abs_change=config.COALESCE_MIN_ABS_CHANGE,
+            min_pct_change=config.COALESCE_MIN_PCT_CHANGE,
+            flush_after=config.COALESCE_FLUSH_AFTER,
+        )
+
+    def admit(self, ticker: str, quote: Quote, last: Optional[float], now: float) -> bool:
+        """
+        Decide whether a changed quote should be published now.
+
+        Args:
+            ticker: Ticker symbol.
+            quote: (current_price, price_change) from the parser.
+            last: Last published price, or None if never published.
+            now: Tick timestamp in seconds.
+
+        Returns:
+            bool: True to publish; False if the quote was held as pending.
+        """
+        if last is None:
+            self._published_at[ticker] = now
+            return True
+
+        price = quote[0]
+        delta = abs(price - last)
+        pct = (delta / abs(last)) * 100 if last else float("inf")
+        published_at = self._published_at.get(ticker)
+        interval_ok = published_at is None or now - published_at >= self.min_interval
+        threshold_ok = delta >= self.min_abs_change and pct >= self.min_pct_change
+
+        if interval_ok and threshold_ok:
+            self._pending.pop(ticker, None)
+            self._published_at[ticker] = now
+            return True
+
+        pending = self._pending.get(ticker)
+        self._pending[ticker] = (quote, pending[1] if pending else now)
+        self.suppressed += 1
+        logger.debug(f"Coalesced update: {ticker} -> {price}")
+        return False
+
+    def discard(self, ticker: str) -> None:
+        """Drop a pending value because the ticker is back at its published price."""
+        self._pending.pop(ticker, None)
+
+    def due(self, now: float, force: bool = False) -> List[Tuple[str, Quote]]:
+        """
+        Return pending values whose trailing flush is due.
+
+        The values stay pending until commit() records them as published,
+        so a failed write leaves them to the next flush.
+
+        Args:
+            now: Tick timestamp in seconds.
+            force: Flush every pending value regardless of timing.
+        """
+        due: List[Tuple[str, Quote]] = []
+        for ticker, (quote, since) in self._pending.items():
+            published_at = self._published_at.get(ticker, float("-inf"))
+            if force or (now - since >= self.flush_after and now - published_at >= self.min_interval):
+                due.append((ticker, quote))
+        return due
+
+    def commit(self, flushed: List[Tuple[str, Quote]], now: float) -> None:
+        """
+        Record trailing-flush values from due() as published at ``now``.
+
+        Args:
+            flushed: The (ticker, quote) pairs that reached the stream.
+            now: Tick timestamp in seconds.
+        """
+        for ticker, quote in flushed:
+            pending = self._pending.get(ticker)
+            if pending is not None and pending[0] == quote:
+                del self._pending[ticker]
+            self._published_at[ticker] = now
+        self.flushed += len(flushed)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
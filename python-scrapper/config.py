@@ -7,6 +7,17 @@ URL = "https://afx.kwayisi.org/nse/"
 FETCH_INTERVAL_MIN = 5      # minimum seconds between fetches
 FETCH_INTERVAL_MAX = 15     # maximum seconds between fetches
 
+# Fetch policy: hedged requests, circuit breaker and deadline-bounded retries
+FETCH_DEADLINE = float(os.getenv("FETCH_DEADLINE", FETCH_INTERVAL_MIN))           # seconds a tick may spend fetching, retries included
+FETCH_HEDGE_PERCENTILE = float(os.getenv("FETCH_HEDGE_PERCENTILE", 95))           # hedge requests slower than this percentile, 0 disables
+FETCH_HEDGE_MIN_SAMPLES = int(os.getenv("FETCH_HEDGE_MIN_SAMPLES", 20))           # latencies needed before hedging starts
+FETCH_BREAKER_THRESHOLD = int(os.getenv("FETCH_BREAKER_THRESHOLD", 5))            # consecutive failed attempts to open, 0 disables
+FETCH_BREAKER_RESET = float(os.getenv("FETCH_BREAKER_RESET", 30))                 # seconds open before a probe
+
+# Parsing: run parse_nse in a pool of worker processes (0 parses in-process)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", 0))
+PARSE_TIMEOUT = float(os.getenv("PARSE_TIMEOUT", 5))          # seconds before a runaway worker is killed
+
 # Redis settings
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 STREAM_NAME = "nse:realtime"
@@ -15,6 +26,68 @@ STREAM_NAME = "nse:realtime"
 # Keep only the latest MAXLEN events (approximate)
 STREAM_MAXLEN = int(os.getenv("STREAM_MAX_LENGTH", 1000))        # roughly corresponds to ~1000 price changes
 
+# Idempotent publishing: number each ticker's changes with a sequence kept
+# in STREAM_SEQ_KEY so a replayed batch is rejected by Redis instead of
+# duplicated, and a restart resumes from the stored prices
+STREAM_IDEMPOTENT = os.getenv("STREAM_IDEMPOTENT", "False").lower() == "true"
+STREAM_SEQ_KEY = "nse:publish_seq"
+
+# Coalescing: hold back per-ticker changes that arrive faster than the
+# minimum interval or move less than the thresholds; held values are
+# published by a trailing flush after COALESCE_FLUSH_AFTER seconds
+COALESCE_MIN_INTERVAL = float(os.getenv("COALESCE_MIN_INTERVAL", 0))        # seconds, 0 disables
+COALESCE_MIN_ABS_CHANGE = float(os.getenv("COALESCE_MIN_ABS_CHANGE", 0))    # price units, 0 disables
+COALESCE_MIN_PCT_CHANGE = float(os.getenv("COALESCE_MIN_PCT_CHANGE", 0))    # percent, 0 disables
+COALESCE_FLUSH_AFTER = float(os.getenv("COALESCE_FLUSH_AFTER", 60))
+
+# Consumer-group backpressure: periodically read XINFO GROUPS and react when a
+# group's lag + pending nears STREAM_MAXLEN (actions: alert, raise_maxlen, coalesce)
+GROUP_MONITOR = os.getenv("GROUP_MONITOR", "False").lower() == "true"
+GROUP_CHECK_INTERVAL = float(os.getenv("GROUP_CHECK_INTERVAL", 30))      # seconds between XINFO GROUPS reads
+GROUP_LAG_THRESHOLD = float(os.getenv("GROUP_LAG_THRESHOLD", 0.8))       # fraction of STREAM_MAXLEN
+GROUP_LAG_ACTIONS = os.getenv("GROUP_LAG_ACTIONS", "alert")
+GROUP_MAXLEN_FACTOR = int(os.getenv("GROUP_MAXLEN_FACTOR", 4))           # MAXLEN multiplier under pressure
+GROUP_COALESCE_INTERVAL = float(os.getenv("GROUP_COALESCE_INTERVAL", 30))
+
+# Market-movers indexes: per-day sorted sets of percent change, absolute
+# change and update count, written in the same pipeline as each publish
+MOVERS_INDEX = os.getenv("MOVERS_INDEX", "False").lower() == "true"
+MOVERS_PREFIX = "nse:movers"
+MOVERS_TTL = int(os.getenv("MOVERS_TTL", 2 * 24 * 3600))     # seconds a day's indexes are kept
+
+# Server-side change detection: diff the board against last prices stored in
+# Redis with a Lua script, publishing and updating state in one round trip
+SERVER_SIDE_DIFF = os.getenv("SERVER_SIDE_DIFF", "False").lower() == "true"
+LAST_PRICES_KEY = "nse:last_prices"
+
+# Sharded publishing: per-ticker streams ("<STREAM_NAME>:{TICKER}") and JSON
+# snapshot keys spread over several nodes, by consistent hashing across
+# SHARD_URLS ("ring") or by Redis Cluster slots at REDIS_URL ("cluster")
+SHARD_MODE = os.getenv("SHARD_MODE", "").lower()                  # "", "ring" or "cluster"
+SHARD_URLS = os.getenv("SHARD_URLS", "")                          # comma-separated, ring mode
+SHARD_STREAM_MAXLEN = int(os.getenv("SHARD_STREAM_MAXLEN", 100))  # entries kept per ticker stream
+SNAPSHOT_PREFIX = "nse:snapshot"
+
+# Incremental indicators computed per tick, e.g. "sma:20,ema:12,vol:20,vwap:50"
+# (empty disables). Values are added to the tick's stream entries, or written
+# to INDICATORS_STREAM when set
+INDICATORS = os.getenv("INDICATORS", "")
+INDICATORS_STREAM = os.getenv("INDICATORS_STREAM", "")
+INDICATORS_MAXLEN = int(os.getenv("INDICATORS_MAXLEN", 10000))
+
+# Readiness: after the startup warm-up the process reports ready on
+# http://0.0.0.0:HEALTH_PORT/readyz (liveness on /healthz) and/or by
+# creating READY_FILE; 0 / empty disables each
+HEALTH_PORT = int(os.getenv("HEALTH_PORT", 0))
+READY_FILE = os.getenv("READY_FILE", "")
+
+# Push gateway: Server-Sent Events on http://0.0.0.0:PUSH_PORT/events, a
+# board snapshot on connect then one delta event per tick (0 disables).
+# A subscriber more than PUSH_QUEUE_SIZE ticks behind is disconnected
+PUSH_PORT = int(os.getenv("PUSH_PORT", 0))
+PUSH_QUEUE_SIZE = int(os.getenv("PUSH_QUEUE_SIZE", 64))
+PUSH_HEARTBEAT = float(os.getenv("PUSH_HEARTBEAT", 15))          # seconds between keep-alive comments
+
 # Timestamp format: seconds since epoch
 TIMESTAMP_MS = os.getenv("TIMESTAMP_MS", "False").lower() == "true"       # set True if you prefer milliseconds
 
@@ -0,0 +1,197 @@
+# fetch_policy.py
+
+import time
+import random
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Optional, TypeVar
+import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Numeric codes for stats()
+BREAKER_STATES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``threshold`` failed attempts in a row the breaker opens and
+    ``allow()`` returns False, so failing ticks are skipped without touching
+    the network. Once ``reset_after`` seconds have passed it half-opens and
+    lets one probe through: success closes it, failure re-opens it.
+    A threshold of 0 disables the breaker.
+    """
+
+    def __init__(self, threshold: int = 5, reset_after: float = 30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+
+    def allow(self, now: float) -> bool:
+        """Whether a request may be sent at ``now`` (monotonic seconds)."""
+        if self.state == OPEN and now - self.opened_at >= self.reset_after:
+            self.state = HALF_OPEN
+            logger.info("Circuit breaker half-open; probing upstream")
+        return self.state != OPEN
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info("Circuit breaker closed")
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self, now: float) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or (self.threshold and self.failures >= self.threshold):
+            if self.state != OPEN:
+                self.opens += 1
+                logger.warning(
+                    f"Circuit breaker open after {self.failures} consecutive failures; "
+                    f"skipping fetches for {self.reset_after}s"
+                )
+            self.state = OPEN
+            self.opened_at = now
+
+
+class LatencyTracker:
+    """Rolling window of successful request latencies (seconds)."""
+
+    def __init__(self, window: int = 100):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class FetchPolicy:
+    """
+    Tail-latency controls shared by every fetch.
+
+    * Hedging: once ``hedge_min_samples`` latencies are known, a request still
+      running at the ``hedge_percentile`` latency gets a second, identical
+      request; the first success wins and the other is left to finish.
+    * Circuit breaker: see CircuitBreaker.
+    * Backoff: jittered exponential delays; the caller checks them against
+      its tick deadline rather than sleeping past it.
+    """
+
+    def __init__(
+        self,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+        rng: Optional[random.Random] = None,
+    ):
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.latency = LatencyTracker()
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+        self._rng = rng or random.Random()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "FetchPolicy":
+        return cls(
+            hedge_percentile=config.FETCH_HEDGE_PERCENTILE,
+            hedge_min_samples=config.FETCH_HEDGE_MIN_SAMPLES,
+            breaker_threshold=config.FETCH_BREAKER_THRESHOLD,
+            breaker_reset=config.FETCH_BREAKER_RESET,
+        )
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None when hedging is off or unwarmed."""
+        if self.hedge_percentile <= 0 or len(self.latency) < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+
+    def backoff_delay(self, backoff: float, attempt: int) -> float:
+        """Jittered exponential delay: uniformly between half and all of backoff ** attempt."""
+        delay = backoff ** attempt
+        return self._rng.uniform(delay / 2, delay)
+
+    def send(self, request: Callable[[float], T], timeout: float) -> T:
+        """
+        Run ``request(timeout)``, hedging it if it outlives the hedge delay.
+
+        Raises whatever the request raised if every copy failed.
+        """
+        delay = self.hedge_delay()
+        if delay is None or delay >= timeout:
+            return self._timed(request, timeout)
+
+        executor = self._get_executor()
+        primary = executor.submit(self._timed, request, timeout)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        with self._lock:
+            self.hedges_sent += 1
+        hedge = executor.submit(self._timed, request, timeout - delay)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+        assert error is not None
+        raise error
+
+    def _timed(self, request: Callable[[float], T], timeout: float) -> T:
+        start = time.monotonic()
+        result = request(timeout)
+        self.latency.record(time.monotonic() - start)
+        return result
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fetch-hedge")
+        return self._executor
+
+    def stats(self) -> Dict[str, float]:
+        """Breaker state and hedge counters for monitoring."""
+        return {
+            "breaker_state": BREAKER_STATES[self.breaker.state],
+            "breaker_opens": self.breaker.opens,
+            "hedges_sent": self.hedges_sent,
+            "hedge_wins": self.hedge_wins,
+            "hedge_win_rate": self.hedge_wins / self.hedges_sent if self.hedges_sent else 0.0,
+            "latency_p50": self.latency.percentile(50) or 0.0,
+            "latency_p95": self.latency.percentile(95) or 0.0,
+        }
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
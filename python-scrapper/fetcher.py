@@ -2,9 +2,15 @@
 
 import time
 import logging
-from typing import Optional
-import requests
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Tuple
 import config
+from fetch_policy import FetchPolicy
+from lazy import lazy_import
+
+if TYPE_CHECKING:
+    import requests
+else:
+    requests = lazy_import("requests")
 
 # Configure module-level logger
 logger = logging.getLogger(__name__)
@@ -13,26 +19,221 @@ DEFAULT_HEADERS = {
     "User-Agent": f"Mozilla/5.0 (compatible; NSE-Scraper/1.0; +{config.URL})",
 }
 
-def fetch_html(url: str, timeout: float = 10.0, retries: int = 3, backoff: float = 2.0) -> Optional[str]:
+_policy: Optional[FetchPolicy] = None
+_session: Optional["requests.Session"] = None
+
+
+def get_policy() -> FetchPolicy:
+    """Return the process-wide fetch policy, creating it on first use."""
+    global _policy
+    if _policy is None:
+        _policy = FetchPolicy.from_config()
+    return _policy
+
+
+def get_session() -> "requests.Session":
     """
-    Fetch HTML content from the given URL with retry logic.
-    Returns the HTML text if successful, otherwise None.
+    Return the process-wide keep-alive session, creating it on first use.
+
+    Hedged requests use it from another thread at the same time as the
+    original; both only issue GETs, and urllib3's pool is thread-safe.
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.headers.update(DEFAULT_HEADERS.copy())
+    return _session
+
+
+def warm_up(url: str, timeout: float = 5.0) -> bool:
+    """
+    Import requests and open a keep-alive connection to the upstream.
+
+    Returns:
+        bool: False (after logging) if the upstream did not answer; the
+        first tick then connects as usual.
+    """
+    try:
+        get_session().head(url, timeout=timeout, allow_redirects=True)
+        return True
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"HTTP warm-up failed: {e}")
+        return False
+
+
+def fetch_stats() -> Dict[str, float]:
+    """Breaker state, hedge counters and recent latency percentiles."""
+    return get_policy().stats()
+
+
+def close() -> None:
+    """Stop the hedging threads and close the keep-alive session, if created."""
+    global _policy, _session
+    if _policy is not None:
+        _policy.close()
+        _policy = None
+    if _session is not None:
+        _session.close()
+        _session = None
+
+
+class Page(NamedTuple):
+    """Raw response body plus the charset declared in Content-Type (if any)."""
+    body: bytes
+    encoding: Optional[str]
+
+
+def declared_encoding(content_type: Optional[str]) -> Optional[str]:
+    """
+    Return the charset parameter of a Content-Type header, or None.
+
+    Unlike ``requests``, this never guesses: no ISO-8859-1 default for
+    text/* and no charset sniffing of the body.
+    """
+    if not content_type:
+        return None
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            return value.strip().strip("'\"") or None
+    return None
+
+
+# Called with (delay seconds, next attempt number) to run a retry later
+Retry = Callable[[float, int], None]
+
+
+def _get(
+    url: str,
+    timeout: float,
+    retries: int,
+    backoff: float,
+    deadline: Optional[float] = None,
+    attempt: int = 1,
+    retry: Optional[Retry] = None,
+) -> Optional["requests.Response"]:
     """
-    headers = DEFAULT_HEADERS.copy()
-    session = requests.Session()
-    session.headers.update(headers)
-
-    for attempt in range(1, retries + 1):
-        try:
-            resp = session.get(url, timeout=timeout)
-            resp.raise_for_status()
-            return resp.text
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Fetch attempt {attempt} failed: {e}")
-            if attempt < retries:
-                sleep_d = backoff ** attempt
-                logger.info(f"Retrying in {sleep_d:.1f}s...")
-                time.sleep(sleep_d)
-            else:
-                logger.error(f"All {retries} fetch attempts failed.")
+    Make one GET attempt and return the successful response, or None.
+
+    Nothing sleeps here. When the attempt fails and another is allowed,
+    ``retry(delay, attempt + 1)`` is called with a jittered backoff so the
+    caller can schedule it; without ``retry`` the failure is final.
+    ``deadline`` is a ``time.monotonic()`` instant by which the fetch must be
+    over: the attempt timeout is clipped to it, and a retry that would land
+    past it is dropped, leaving it to the next tick.
+    """
+    policy = get_policy()
+    if not policy.breaker.allow(time.monotonic()):
+        logger.warning("Circuit breaker open, skipping fetch")
+        return None
+
+    attempt_timeout = timeout
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.error(f"Fetch deadline reached before attempt {attempt}.")
+            return None
+        attempt_timeout = min(timeout, remaining)
+
+    session = get_session()
+
+    def request(attempt_timeout: float) -> "requests.Response":
+        resp = session.get(url, timeout=attempt_timeout)
+        resp.raise_for_status()
+        return resp
+
+    try:
+        resp = policy.send(request, attempt_timeout)
+        policy.breaker.record_success()
+        return resp
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Fetch attempt {attempt} failed: {e}")
+        policy.breaker.record_failure(time.monotonic())
+
+    if attempt >= retries:
+        logger.error(f"All {retries} fetch attempts failed.")
+    elif not policy.breaker.allow(time.monotonic()):
+        logger.error("Circuit breaker opened, abandoning retries.")
+    elif retry is not None:
+        delay = policy.backoff_delay(backoff, attempt)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            logger.error(f"Retry in {delay:.1f}s would overrun the tick deadline, leaving it to the next tick.")
+        else:
+            logger.info(f"Retrying in {delay:.1f}s...")
+            retry(delay, attempt + 1)
     return None
+
+
+def _get_in_place(
+    url: str,
+    timeout: float,
+    retries: int,
+    backoff: float,
+    deadline: Optional[float] = None,
+    attempt: int = 1,
+) -> Optional["requests.Response"]:
+    """
+    Run the remaining attempts of a fetch here, sleeping out each backoff.
+
+    For callers without a scheduler; the deadline rules of _get still apply.
+    """
+    while True:
+        scheduled: List[Tuple[float, int]] = []
+        resp = _get(url, timeout, retries, backoff, deadline, attempt,
+                    lambda delay, next_attempt: scheduled.append((delay, next_attempt)))
+        if resp is not None or not scheduled:
+            return resp
+        delay, attempt = scheduled[0]
+        time.sleep(delay)
+
+
+def fetch_html(
+    url: str,
+    timeout: float = 10.0,
+    retries: int = 3,
+    backoff: float = 2.0,
+    deadline: Optional[float] = None,
+    attempt: int = 1,
+    retry: Optional[Retry] = None,
+) -> Optional[str]:
+    """
+    Fetch HTML content from the given URL, making up to ``retries``
+    attempts with jittered backoff.
+
+    With ``retry``, one attempt is made and the next is handed to
+    ``retry(delay, next_attempt)`` to schedule (see _get); without it the
+    attempts run here and the backoff is slept.
+    Returns the HTML text if successful, otherwise None.
+    """
+    if retry is not None:
+        resp = _get(url, timeout, retries, backoff, deadline, attempt, retry)
+    else:
+        resp = _get_in_place(url, timeout, retries, backoff, deadline, attempt)
+    return resp.text if resp is not None else None
+
+
+def fetch_page(
+    url: str,
+    timeout: float = 10.0,
+    retries: int = 3,
+    backoff: float = 2.0,
+    deadline: Optional[float] = None,
+    attempt: int = 1,
+    retry: Optional[Retry] = None,
+) -> Optional[Page]:
+    """
+    Fetch the raw page bytes from the given URL, making up to ``retries``
+    attempts; ``retry`` works as for fetch_html.
+
+    The body is returned undecoded together with the declared charset so the
+    parser can hand it straight to lxml, skipping ``requests``' charset
+    detection and the bytes -> str -> bytes round trip.
+    Returns a Page if successful, otherwise None.
+    """
+    if retry is not None:
+        resp = _get(url, timeout, retries, backoff, deadline, attempt, retry)
+    else:
+        resp = _get_in_place(url, timeout, retries, backoff, deadline, attempt)
+    if resp is None:
+        return None
+    return Page(resp.content, declared_encoding(resp.headers.get("Content-Type")))
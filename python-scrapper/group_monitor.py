@@ -0,0 +1,134 @@
+# group_monitor.py
+
+import math
+import logging
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, Optional, Union
+import config
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = frozenset({"alert", "raise_maxlen", "coalesce"})
+
+
+class GroupMonitor:
+    """
+    Low-frequency sampler of consumer-group backlog on the stream.
+
+    Every ``interval`` seconds it reads XINFO GROUPS and records each group's
+    ``lag`` (entries not yet delivered) and ``pending`` (delivered but not
+    acked). Their sum is the group's backlog: entries that MAXLEN trimming
+    would drop before the group finished with them. The streamer is under
+    pressure when any backlog reaches ``threshold`` of the retention limit,
+    and leaves it once every backlog is below half of that.
+    """
+
+    def __init__(
+        self,
+        interval: float = 30.0,
+        threshold: float = 0.8,
+        actions: Iterable[str] = ("alert",),
+        maxlen_factor: int = 4,
+        coalesce_interval: float = 30.0,
+    ):
+        unknown = set(actions) - ACTIONS
+        if unknown:
+            raise ValueError(f"Unknown group lag actions: {sorted(unknown)}")
+        self.interval = interval
+        self.threshold = threshold
+        self.actions: FrozenSet[str] = frozenset(actions)
+        self.maxlen_factor = maxlen_factor
+        self.coalesce_interval = coalesce_interval
+        self.lag: Dict[str, int] = {}
+        self.pending: Dict[str, int] = {}
+        self.under_pressure = False
+        self._last_check = float("-inf")
+
+    @classmethod
+    def from_config(cls) -> Optional["GroupMonitor"]:
+        """Build a monitor from config, or None when group watching is disabled."""
+        if not config.GROUP_MONITOR:
+            return None
+        return cls(
+            interval=config.GROUP_CHECK_INTERVAL,
+            threshold=config.GROUP_LAG_THRESHOLD,
+            actions=[a.strip() for a in config.GROUP_LAG_ACTIONS.split(",") if a.strip()],
+            maxlen_factor=config.GROUP_MAXLEN_FACTOR,
+            coalesce_interval=config.GROUP_COALESCE_INTERVAL,
+        )
+
+    def due(self, now: float) -> bool:
+        return now - self._last_check >= self.interval
+
+    def sample(self, r: "Redis", stream: str, now: float, maxlen: Optional[int] = None) -> None:
+        """
+        Read XINFO GROUPS and record per-group lag and pending counts.
+
+        Args:
+            r: Redis client.
+            stream: Stream key.
+            now: Sample timestamp in seconds.
+            maxlen: Base retention limit. An unknown lag is counted from
+                the stream only up to the pressure level it implies.
+        """
+        self._last_check = now
+        groups = r.xinfo_groups(stream)
+        self.lag.clear()
+        self.pending.clear()
+        limit = math.ceil(self.threshold * maxlen) if maxlen else None
+        for group in groups:  # type: ignore[union-attr]
+            name = group["name"]
+            name = name.decode() if isinstance(name, bytes) else str(name)
+            lag = group.get("lag")
+            if lag is None:
+                # Redis cannot compute lag (e.g. after XDEL, or before 7.0)
+                lag = self._undelivered(r, stream, group.get("last-delivered-id"), limit)
+            self.pending[name] = int(group.get("pending") or 0)
+            self.lag[name] = int(lag)
+        logger.debug(f"Consumer groups on {stream}: lag={self.lag} pending={self.pending}")
+
+    @staticmethod
+    def _undelivered(r: "Redis", stream: str, last_id: Optional[Union[bytes, str]], limit: Optional[int]) -> int:
+        """
+        Count entries after the group's last delivered ID, stopping at
+        ``limit``. The range starts inclusively (exclusive ranges need
+        Redis 6.2) and drops the delivered entry itself if it is still there.
+        """
+        start = last_id.decode() if isinstance(last_id, bytes) else (last_id or "-")
+        entries = r.xrange(stream, min=start, max="+", count=limit + 1 if limit else None)
+        count = len(entries)  # type: ignore[arg-type]
+        if count and start != "-":
+            first = entries[0][0]  # type: ignore[index]
+            if (first.decode() if isinstance(first, bytes) else first) == start:
+                count -= 1
+        return min(count, limit) if limit else count
+
+    def backlog(self) -> int:
+        """Largest lag + pending across groups."""
+        return max((self.lag[name] + self.pending[name] for name in self.lag), default=0)
+
+    def update_pressure(self, maxlen: int) -> Optional[bool]:
+        """
+        Re-evaluate pressure against the base retention limit.
+
+        Returns:
+            Optional[bool]: True on entering pressure, False on leaving it,
+            None if unchanged.
+        """
+        backlog = self.backlog()
+        if not self.under_pressure and backlog >= self.threshold * maxlen:
+            self.under_pressure = True
+            return True
+        if self.under_pressure and backlog < self.threshold * maxlen / 2:
+            self.under_pressure = False
+            return False
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        stats = {"group_pressure": int(self.under_pressure)}
+        for name in self.lag:
+            stats[f"group_lag:{name}"] = self.lag[name]
+            stats[f"group_pending:{name}"] = self.pending[name]
+        return stats
@@ -0,0 +1,118 @@
+# health.py
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+import config
+
+if TYPE_CHECKING:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """
+    Process liveness/readiness for orchestration.
+
+    Until ``mark_ready()`` the process is live but not ready. Readiness is
+    exposed on an HTTP endpoint (``/healthz`` always answers 200 while the
+    process runs; ``/readyz`` answers 200 once ready, 503 before) and/or as
+    a file that exists only while the process is ready.
+    """
+
+    def __init__(self, port: int = 0, ready_file: str = "", details: Optional[Callable[[], Dict[str, Any]]] = None):
+        """
+        Args:
+            port: Port for the health endpoint (0 disables it).
+            ready_file: Path created on readiness and removed on shutdown
+                (empty disables it).
+            details: Optional callable whose result is included in the
+                ``/readyz`` body, e.g. publish counters.
+        """
+        self.port = port
+        self.ready_file = ready_file
+        self.details = details
+        self.ready = False
+        self.ready_at: Optional[float] = None
+        self._server: Optional["ThreadingHTTPServer"] = None
+
+    @classmethod
+    def from_config(cls, details: Optional[Callable[[], Dict[str, Any]]] = None) -> Optional["Readiness"]:
+        """Build readiness reporting from config, or None when neither endpoint nor file is set."""
+        if not config.HEALTH_PORT and not config.READY_FILE:
+            return None
+        return cls(port=config.HEALTH_PORT, ready_file=config.READY_FILE, details=details)
+
+    def start(self) -> None:
+        """Start the health endpoint, if configured, and clear any stale ready file."""
+        self._remove_file()
+        if not self.port:
+            return
+        # Only pay for http.server when the endpoint is enabled
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        readiness = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path == "/healthz":
+                    readiness._respond(self, 200, {"status": "ok"})
+                elif self.path == "/readyz":
+                    readiness._respond(self, 200 if readiness.ready else 503, readiness.status())
+                else:
+                    readiness._respond(self, 404, {"error": "not found"})
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("0.0.0.0", self.port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="health", daemon=True).start()
+        logger.info(f"Health endpoint listening on :{self.port} (/healthz, /readyz)")
+
+    def status(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {"ready": self.ready, "ready_at": self.ready_at}
+        if self.ready and self.details is not None:
+            try:
+                status.update(self.details())
+            except Exception as e:
+                status["details_error"] = str(e)
+        return status
+
+    def mark_ready(self) -> None:
+        self.ready = True
+        self.ready_at = time.time()
+        if self.ready_file:
+            # Write then rename so a watcher never sees a partial file
+            tmp = f"{self.ready_file}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"pid": os.getpid(), "ready_at": self.ready_at}, f)
+            os.replace(tmp, self.ready_file)
+        logger.info("Scraper is ready")
+
+    def close(self) -> None:
+        """Drop readiness and stop the endpoint."""
+        self.ready = False
+        self._remove_file()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _remove_file(self) -> None:
+        if self.ready_file:
+            try:
+                os.remove(self.ready_file)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _respond(handler: "BaseHTTPRequestHandler", code: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body).encode()
+        handler.send_response(code)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
@@ -0,0 +1,279 @@
+# indicators.py
+
+import math
+import logging
+from array import array
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+import config
+from board import HAS_VOLUME, Board, Quote, SymbolTable
+
+logger = logging.getLogger(__name__)
+
+Spec = Tuple[str, int]
+
+
+class _Ring:
+    """
+    One fixed-size window per ticker, stored back to back in a flat array,
+    with a running sum and sum of squares so pushes are O(1).
+    """
+
+    __slots__ = ("window", "values", "pos", "count", "sum", "sumsq")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = array("d")
+        self.pos = array("l")
+        self.count = array("l")
+        self.sum = array("d")
+        self.sumsq = array("d")
+
+    def grow(self, n: int) -> None:
+        extra = n - len(self.pos)
+        if extra > 0:
+            self.values.extend(array("d", [0.0]) * (self.window * extra))
+            self.pos.extend([0] * extra)
+            self.count.extend([0] * extra)
+            self.sum.extend([0.0] * extra)
+            self.sumsq.extend([0.0] * extra)
+
+    def push(self, i: int, x: float) -> None:
+        slot = i * self.window + self.pos[i]
+        if self.count[i] == self.window:
+            old = self.values[slot]
+            self.sum[i] += x - old
+            self.sumsq[i] += x * x - old * old
+        else:
+            self.count[i] += 1
+            self.sum[i] += x
+            self.sumsq[i] += x * x
+        self.values[slot] = x
+        self.pos[i] = (self.pos[i] + 1) % self.window
+
+    def full(self, i: int) -> bool:
+        return self.count[i] == self.window
+
+
+class SMA:
+    """Simple moving average of the last ``window`` prices."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._ring = _Ring(window)
+
+    def grow(self, n: int) -> None:
+        self._ring.grow(n)
+
+    def update(self, i: int, price: float, ret: Optional[float], volume: Optional[int]) -> Optional[float]:
+        ring = self._ring
+        ring.push(i, price)
+        return ring.sum[i] / ring.window if ring.full(i) else None
+
+
+class EMA:
+    """Exponential moving average with alpha = 2 / (window + 1), seeded with the first price."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.alpha = 2.0 / (window + 1)
+        self._value = array("d")
+        self._seeded = bytearray()
+
+    def grow(self, n: int) -> None:
+        extra = n - len(self._value)
+        if extra > 0:
+            self._value.extend([0.0] * extra)
+            self._seeded.extend(bytes(extra))
+
+    def update(self, i: int, price: float, ret: Optional[float], volume: Optional[int]) -> Optional[float]:
+        if self._seeded[i]:
+            self._value[i] += self.alpha * (price - self._value[i])
+        else:
+            self._value[i] = price
+            self._seeded[i] = 1
+        return self._value[i]
+
+
+class Volatility:
+    """Sample standard deviation of the last ``window`` tick-to-tick log returns."""
+
+    def __init__(self, window: int):
+        if window < 2:
+            raise ValueError("Volatility window must be at least 2")
+        self.window = window
+        self._ring = _Ring(window)
+
+    def grow(self, n: int) -> None:
+        self._ring.grow(n)
+
+    def update(self, i: int, price: float, ret: Optional[float], volume: Optional[int]) -> Optional[float]:
+        if ret is None:
+            return None
+        ring = self._ring
+        ring.push(i, ret)
+        if not ring.full(i):
+            return None
+        n = ring.window
+        var = (ring.sumsq[i] - ring.sum[i] * ring.sum[i] / n) / (n - 1)
+        # Running sums can leave a tiny negative residue for flat series
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class VWAP:
+    """
+    Volume-weighted average price over the last ``window`` ticks.
+
+    ``volume`` is the volume traded since the previous tick, derived from
+    the page's cumulative day volume.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._pv = _Ring(window)
+        self._v = _Ring(window)
+
+    def grow(self, n: int) -> None:
+        self._pv.grow(n)
+        self._v.grow(n)
+
+    def update(self, i: int, price: float, ret: Optional[float], volume: Optional[int]) -> Optional[float]:
+        if volume is None:
+            return None
+        self._pv.push(i, price * volume)
+        self._v.push(i, float(volume))
+        traded = self._v.sum[i]
+        return self._pv.sum[i] / traded if traded > 0 else None
+
+
+KINDS = {"sma": SMA, "ema": EMA, "vol": Volatility, "vwap": VWAP}
+
+
+def parse_specs(value: str) -> List[Spec]:
+    """
+    Parse an indicator list such as ``"sma:20,ema:12,vol:20,vwap:50"``.
+
+    Raises:
+        ValueError: On an unknown kind or a non-positive window.
+    """
+    specs: List[Spec] = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        kind, _, window = item.partition(":")
+        kind = kind.strip().lower()
+        if kind not in KINDS:
+            raise ValueError(f"Unknown indicator '{kind}' (expected one of {sorted(KINDS)})")
+        if not window.strip().isdigit() or int(window) <= 0:
+            raise ValueError(f"Indicator '{item}' needs a positive window, e.g. {kind}:20")
+        specs.append((kind, int(window)))
+    return specs
+
+
+class IndicatorStage:
+    """
+    Incremental per-ticker indicators updated once per parsed board.
+
+    State lives in flat arrays indexed by the ticker's SymbolTable id, and
+    every indicator update is O(1) regardless of its window. Each tick
+    samples every ticker on the board, so windows count ticks, not
+    price changes.
+
+    Results are published either as extra fields on the tick's stream
+    entries (``stream`` is None) or to a separate stream, where a ticker
+    gets an entry only when one of its formatted values changed.
+    """
+
+    def __init__(
+        self,
+        specs: Sequence[Spec],
+        stream: Optional[str] = None,
+        maxlen: int = 10_000,
+        symbol_table: Optional[SymbolTable] = None,
+    ):
+        if not specs:
+            raise ValueError("At least one indicator is required")
+        self.stream = stream
+        self.maxlen = maxlen
+        self.symbols = symbol_table if symbol_table is not None else SymbolTable()
+        self.names = [f"{kind}_{window}" for kind, window in specs]
+        self._indicators = [KINDS[kind](window) for kind, window in specs]
+        self._last_price = array("d")
+        self._last_volume = array("q")
+        self._last_published: Dict[str, Dict[str, str]] = {}
+
+    @classmethod
+    def from_config(cls, symbol_table: Optional[SymbolTable] = None) -> Optional["IndicatorStage"]:
+        """
+        Build a stage from config, or None when no indicators are configured.
+
+        Pass the parser's ``symbol_table`` so boards arrive with ids the
+        stage can use directly.
+        """
+        specs = parse_specs(config.INDICATORS)
+        if not specs:
+            return None
+        return cls(
+            specs,
+            symbol_table=symbol_table,
+            stream=config.INDICATORS_STREAM or None,
+            maxlen=config.INDICATORS_MAXLEN,
+        )
+
+    def _grow(self, n: int) -> None:
+        extra = n - len(self._last_price)
+        if extra > 0:
+            self._last_price.extend([0.0] * extra)
+            # -1: no volume seen yet
+            self._last_volume.extend([-1] * extra)
+            for indicator in self._indicators:
+                indicator.grow(n)
+
+    def update(self, data: Mapping[str, Quote]) -> Dict[str, Dict[str, str]]:
+        """
+        Feed one parsed board through every indicator.
+
+        Returns:
+            Dict[str, Dict[str, str]]: ticker -> {indicator name: value} for
+            the indicators that have enough history.
+        """
+        board = Board.from_mapping(data)
+        if board.symbol_table is self.symbols and len(board.ids) == len(board):
+            ids: Sequence[int] = board.ids
+        else:
+            ids = [self.symbols.id_for(symbol) for symbol in board.symbols]
+        self._grow(len(self.symbols))
+
+        results: Dict[str, Dict[str, str]] = {}
+        last_price, last_volume = self._last_price, self._last_volume
+        for row, sid in enumerate(ids):
+            price = board.price[row]
+            previous = last_price[sid]
+            ret = math.log(price / previous) if previous > 0 and price > 0 else None
+            last_price[sid] = price
+
+            traded: Optional[int] = None
+            if board.flags[row] & HAS_VOLUME:
+                volume = board.volume[row]
+                if last_volume[sid] >= 0:
+                    # Cumulative day volume; a drop means a new trading day
+                    traded = volume - last_volume[sid] if volume >= last_volume[sid] else volume
+                last_volume[sid] = volume
+
+            values: Dict[str, str] = {}
+            for name, indicator in zip(self.names, self._indicators):
+                value = indicator.update(sid, price, ret, traded)
+                if value is not None:
+                    values[name] = str(round(value, 6))
+            if values:
+                results[board.symbols[row]] = values
+        return results
+
+    def changed(self, results: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+        """The subset of ``results`` that differs from what was last published."""
+        changed = {
+            ticker: values for ticker, values in results.items()
+            if self._last_published.get(ticker) != values
+        }
+        self._last_published.update(changed)
+        return changed
@@ -0,0 +1,39 @@
+# lazy.py
+
+import sys
+import importlib
+import importlib.util
+from types import ModuleType
+from typing import Any
+
+
+class _LazyModule(ModuleType):
+    """Stands in for a module until one of its attributes is used."""
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(importlib.import_module(self.__name__), attr)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Return a module that is only imported on first attribute access.
+
+    ``requests = lazy_import("requests")`` costs a spec lookup at import
+    time; the real import happens the first time ``requests.<attr>`` is
+    touched (for example by the startup warm-up). The stand-in forwards
+    every attribute to the real module, which is imported normally and
+    never replaced in ``sys.modules``, so importing a submodule such as
+    ``redis.exceptions`` elsewhere cannot produce a second copy, and the
+    import lock makes concurrent first use safe. Attribute patches such as
+    ``patch('fetcher.requests.Session')`` apply to the stand-in, i.e. to
+    the code that imported it.
+
+    Raises:
+        ModuleNotFoundError: If the module is not installed.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    return _LazyModule(name)
@@ -1,7 +1,25 @@
-from fetcher import fetch_html
+from fetcher import fetch_page
 from parser import parse_nse
+from board import SymbolTable
 from streamer import RedisStreamer
-import scheduler, config, logging
+from coalescer import Coalescer
+from group_monitor import GroupMonitor
+from indicators import IndicatorStage
+from shards import Shards
+from parse_pool import ParsePool, ParseTimeout
+from health import Readiness
+from push import PushGateway
+from warmup import warm_up
+import fetcher, parser, scheduler, config, logging, time
+from typing import Optional
+
+_streamer: Optional[RedisStreamer] = None
+_parse_pool: Optional[ParsePool] = None
+_readiness: Optional[Readiness] = None
+_gateway: Optional[PushGateway] = None
+# Shared by the in-process parser and the indicator stage so boards carry
+# the ids the stage indexes its state by
+_symbols = SymbolTable()
 
 def setup_logging():
     """Configure logging for the application"""
@@ -10,20 +28,80 @@ def setup_logging():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
-def job():
-    """Main job function that fetches, parses, and streams NSE data"""
+def get_streamer() -> RedisStreamer:
+    """Return the process-wide streamer, connecting on first use"""
+    global _streamer
+    if _streamer is None:
+        _streamer = RedisStreamer(
+            coalescer=Coalescer.from_config(),
+            group_monitor=GroupMonitor.from_config(),
+            indicators=IndicatorStage.from_config(symbol_table=_symbols),
+            shards=Shards.from_config(),
+        )
+    return _streamer
+
+def stats() -> dict:
+    """Publish, fetch and push-gateway counters for the readiness endpoint"""
+    result = dict(get_streamer().stats())
+    result.update(fetcher.fetch_stats())
+    if _gateway is not None:
+        result.update(_gateway.stats())
+    return result
+
+def startup():
+    """
+    Warm up the Redis connection, the upstream HTTP session and the parser
+    in parallel, then signal readiness.
+
+    A Redis failure is fatal; an unreachable upstream only logs, since the
+    scheduler retries it every tick anyway.
+    """
+    tasks = {
+        "redis": get_streamer,
+        "http": lambda: fetcher.warm_up(config.URL),
+    }
+    if _parse_pool is None:
+        # Pool workers import the parser themselves
+        tasks["parser"] = parser.warm_up
+    warm_up(tasks)
+    if _readiness is not None:
+        _readiness.mark_ready()
+
+def job(attempt: int = 1, deadline: Optional[float] = None):
+    """
+    Main job function that fetches, parses, and streams NSE data.
+
+    A failed fetch is retried by a one-shot scheduler job that calls this
+    again with the next ``attempt`` and the same ``deadline``, rather than
+    blocking the scheduler while backing off.
+    """
     logger = logging.getLogger(__name__)
-    
+    if deadline is None:
+        deadline = time.monotonic() + config.FETCH_DEADLINE
+
+    def retry(delay: float, next_attempt: int) -> None:
+        scheduler.run_once(delay, job, next_attempt, deadline)
+
     try:
-        html = fetch_html(config.URL)
-        if not html:
+        page = fetch_page(config.URL, deadline=deadline, attempt=attempt, retry=retry)
+        if not page:
             logger.error("Fetch failed, skipping run")
             return
         
-        data = parse_nse(html)
+        try:
+            if _parse_pool is not None:
+                data = _parse_pool.parse(page.body, page.encoding)
+            else:
+                data = parse_nse(page.body, encoding=page.encoding, symbol_table=_symbols)
+        except ParseTimeout as e:
+            logger.warning(f"Parse skipped: {e}")
+            return
+
         if data:
-            streamer = RedisStreamer()
-            streamer.publish_changes(data)
+            streamer = get_streamer()
+            changes = streamer.publish_changes(data)
+            if _gateway is not None:
+                _gateway.publish(changes, board=data)
             logger.info(f"Processed {len(data)} tickers")
         else:
             logger.warning("No data parsed from HTML")
@@ -32,17 +110,43 @@ def job():
 
 def main():
     """Main entry point for the application"""
+    global _parse_pool, _readiness, _gateway
     setup_logging()
     logger = logging.getLogger(__name__)
     
     try:
         logger.info("Starting NSE scraper...")
-        scheduler.schedule_job(job)
+        _readiness = Readiness.from_config(details=stats)
+        if _readiness is not None:
+            _readiness.start()
+        _gateway = PushGateway.from_config()
+        if _gateway is not None:
+            _gateway.start()
+        _parse_pool = ParsePool.from_config()
+        startup()
+        scheduler.schedule_job(job, run_now=True)
     except KeyboardInterrupt:
+        if _streamer is not None:
+            flushed = _streamer.flush_pending()
+            if _gateway is not None:
+                _gateway.publish(flushed)
         logger.info("NSE scraper stopped by user")
     except Exception as e:
         logger.error(f"NSE scraper failed: {e}")
         raise
+    finally:
+        if _streamer is not None:
+            _streamer.close()
+        fetcher.close()
+        if _readiness is not None:
+            _readiness.close()
+            _readiness = None
+        if _gateway is not None:
+            _gateway.close()
+            _gateway = None
+        if _parse_pool is not None:
+            _parse_pool.close()
+            _parse_pool = None
 
 if __name__ == "__main__":
     main()
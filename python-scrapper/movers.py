@@ -0,0 +1,183 @@
+# movers.py
+"""
+Market-movers indexes: per-day sorted sets of percent change, absolute
+change and update count per ticker, maintained alongside the stream.
+
+Run as a script to rebuild the indexes from the stream and check them:
+
+    python movers.py verify [--day YYYYMMDD] [--repair]
+"""
+
+import sys
+import time
+import calendar
+import logging
+import argparse
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import config
+from lazy import lazy_import
+
+if TYPE_CHECKING:
+    import redis
+    from redis import Redis
+else:
+    redis = lazy_import("redis")
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("pct", "abs", "count")
+
+
+def trading_day(ts: float) -> str:
+    """
+    Trading-day bucket for a timestamp in seconds.
+
+    NSE trades 09:00-15:00 EAT (UTC+3, no DST), which falls inside a single
+    UTC date, so the UTC date is used as the day key.
+    """
+    return time.strftime("%Y%m%d", time.gmtime(ts))
+
+
+def index_key(kind: str, day: str) -> str:
+    return f"{config.MOVERS_PREFIX}:{day}:{kind}"
+
+
+def scores_for(fields: Dict[str, str]) -> Optional[Tuple[float, float]]:
+    """
+    (percent change, absolute change) for the day from a stream entry, or
+    None when the page gave no change for the ticker.
+    """
+    if "price_change" not in fields:
+        return None
+    price = float(fields["price"])
+    change = float(fields["price_change"])
+    previous = price - change
+    pct = (change / previous) * 100 if previous else 0.0
+    return round(pct, 4), change
+
+
+def stage_updates(pipe, entries: List[Dict[str, str]], ts: float) -> None:
+    """
+    Queue index updates for published entries on a pipeline.
+
+    Percent and absolute change are overwritten with the latest value (ZADD);
+    the update count is incremented (ZINCRBY). Keys expire after
+    MOVERS_TTL so each trading day starts from empty indexes.
+    """
+    if not entries:
+        return
+    day = trading_day(ts)
+    pct: Dict[str, float] = {}
+    abs_: Dict[str, float] = {}
+    for fields in entries:
+        ticker = fields["ticker"]
+        pipe.zincrby(index_key("count", day), 1, ticker)
+        scores = scores_for(fields)
+        if scores is not None:
+            pct[ticker], abs_[ticker] = scores
+    if pct:
+        pipe.zadd(index_key("pct", day), pct)
+        pipe.zadd(index_key("abs", day), abs_)
+    for kind in KINDS:
+        pipe.expire(index_key(kind, day), config.MOVERS_TTL)
+
+
+def top_movers(r: "Redis", kind: str = "pct", n: int = 10, day: Optional[str] = None, gainers: bool = True) -> List[Tuple[str, float]]:
+    """
+    Top-N tickers for an index: highest scores for gainers (and most active
+    for "count"), lowest for losers.
+    """
+    day = day or trading_day(time.time())
+    rows = r.zrange(index_key(kind, day), 0, n - 1, desc=gainers, withscores=True)
+    return [(ticker.decode() if isinstance(ticker, bytes) else ticker, score) for ticker, score in rows]  # type: ignore[union-attr]
+
+
+def rebuild_from_stream(r: "Redis", day: str, stream: Optional[str] = None) -> Tuple[Dict[str, Dict[str, float]], bool]:
+    """
+    Recompute the day's indexes from the entries still in the stream.
+
+    Returns:
+        Tuple of ({kind: {ticker: score}}, complete). ``complete`` is False
+        when trimming has already dropped part of the day, in which case
+        the recomputed counts are only a lower bound.
+    """
+    stream = stream or config.STREAM_NAME
+    start_ms = calendar.timegm(time.strptime(day, "%Y%m%d")) * 1000
+    end_ms = start_ms + 86_400_000 - 1
+
+    first = r.xrange(stream, count=1)
+    complete = bool(first) and int(_decode(first[0][0]).split("-")[0]) <= start_ms  # type: ignore[index]
+
+    rebuilt: Dict[str, Dict[str, float]] = {kind: {} for kind in KINDS}
+    for _, raw in r.xrange(stream, min=str(start_ms), max=str(end_ms)):  # type: ignore[union-attr]
+        fields = {_decode(k): _decode(v) for k, v in raw.items()}
+        ticker = fields["ticker"]
+        rebuilt["count"][ticker] = rebuilt["count"].get(ticker, 0) + 1
+        scores = scores_for(fields)
+        if scores is not None:
+            rebuilt["pct"][ticker], rebuilt["abs"][ticker] = scores
+    return rebuilt, complete
+
+
+def verify(r: "Redis", day: str, stream: Optional[str] = None, repair: bool = False) -> List[str]:
+    """
+    Check the stored indexes against a rebuild from the stream.
+
+    Returns:
+        List[str]: One line per inconsistency (empty when consistent).
+    """
+    rebuilt, complete = rebuild_from_stream(r, day, stream)
+    problems: List[str] = []
+    for kind in KINDS:
+        stored = {_decode(t): s for t, s in r.zrange(index_key(kind, day), 0, -1, withscores=True)}  # type: ignore[union-attr]
+        expected = rebuilt[kind]
+        for ticker in sorted(set(stored) | set(expected)):
+            have, want = stored.get(ticker), expected.get(ticker)
+            if not complete and want is None:
+                # Every entry for the ticker has been trimmed from the stream
+                ok = have is not None
+            elif kind == "count" and not complete:
+                # Trimmed entries are gone from the stream but still counted
+                ok = have is not None and have >= want
+            else:
+                ok = have is not None and want is not None and abs(have - want) < 1e-6
+            if not ok:
+                problems.append(f"{kind} {ticker}: index={have} stream={want}")
+
+    if repair and problems:
+        pipe = r.pipeline()
+        for kind in KINDS:
+            if kind == "count" and not complete:
+                continue
+            key = index_key(kind, day)
+            pipe.delete(key)
+            if rebuilt[kind]:
+                pipe.zadd(key, rebuilt[kind])
+                pipe.expire(key, config.MOVERS_TTL)
+        pipe.execute()
+        logger.info(f"Rebuilt movers indexes for {day} from {stream or config.STREAM_NAME}")
+    return problems
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Verify market-movers indexes against the stream")
+    ap.add_argument("command", choices=["verify"])
+    ap.add_argument("--day", default=trading_day(time.time()), help="YYYYMMDD (UTC), default today")
+    ap.add_argument("--repair", action="store_true", help="overwrite the indexes with the rebuild")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=config.LOG_LEVEL, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    r = redis.Redis.from_url(config.REDIS_URL)
+    problems = verify(r, args.day, repair=args.repair)
+    for line in problems:
+        print(line)
+    print(f"{len(problems)} inconsistencies for {args.day}")
+    return 1 if problems and not args.repair else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+# parse_pool.py
+
+import logging
+import queue
+import multiprocessing as mp
+from multiprocessing.connection import Connection
+from typing import Any, Callable, List, Mapping, Optional
+import config
+from board import Board, Quote
+from parser import parse_nse
+
+logger = logging.getLogger(__name__)
+
+
+class ParseTimeout(Exception):
+    """A parse exceeded the per-parse timeout and its worker was killed."""
+
+
+class ParseWorkerError(Exception):
+    """The worker raised while parsing or died unexpectedly."""
+
+
+def _worker_main(conn: Connection, parse_fn: Callable[..., Mapping[str, Quote]]) -> None:
+    """Worker loop: parse requests from the pipe until told to stop."""
+    # Importing the parser pulls in bs4/lxml; warm the tree builder once so
+    # the first real parse does not pay for it.
+    parse_fn(b"<table><tbody><tr><td></td></tr></tbody></table>", "utf-8")
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        body, encoding = request
+        try:
+            # Boards pickle as raw column bytes, so the result crosses the
+            # pipe compactly
+            conn.send(("ok", Board.from_mapping(parse_fn(body, encoding))))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    def __init__(self, ctx: Any, parse_fn: Callable[..., Mapping[str, Quote]]):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, parse_fn), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ParsePool:
+    """
+    Small persistent pool of parse worker processes.
+
+    Parsing runs out of process so a slow or pathological page cannot stall
+    the scheduler loop for longer than ``timeout`` seconds: the caller waits
+    for the result, and a parse that overruns gets its worker killed and
+    replaced. Each worker owns a pipe.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        timeout: float = 5.0,
+        parse_fn: Callable[..., Mapping[str, Quote]] = parse_nse,
+    ):
+        self.timeout = timeout
+        self.timeouts = 0
+        self._parse_fn = parse_fn
+        # spawn: workers must not inherit the parent's threads or sockets
+        self._ctx = mp.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        for _ in range(workers):
+            self._add_worker()
+        logger.info(f"Started {workers} parse workers (timeout {timeout}s)")
+
+    @classmethod
+    def from_config(cls) -> Optional["ParsePool"]:
+        """Build a pool from config, or None to parse in-process."""
+        if config.PARSE_WORKERS <= 0:
+            return None
+        return cls(
+            workers=config.PARSE_WORKERS,
+            timeout=config.PARSE_TIMEOUT,
+        )
+
+    def _add_worker(self) -> None:
+        worker = _Worker(self._ctx, self._parse_fn)
+        self._workers.append(worker)
+        self._idle.put(worker)
+
+    def _replace(self, worker: _Worker) -> None:
+        worker.kill()
+        self._workers.remove(worker)
+        self._add_worker()
+
+    def parse(self, body: bytes, encoding: Optional[str] = None) -> Board:
+        """
+        Parse a page in a worker process.
+
+        Raises:
+            ParseTimeout: If no result arrived within ``timeout`` seconds.
+            ParseWorkerError: If the worker raised or died.
+        """
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise ParseTimeout(f"No parse worker free within {self.timeout}s")
+
+        try:
+            worker.conn.send((body, encoding))
+            ready = worker.conn.poll(self.timeout)
+            if not ready:
+                self.timeouts += 1
+                logger.warning(f"Parse exceeded {self.timeout}s; restarting worker {worker.process.pid}")
+                self._replace(worker)
+                raise ParseTimeout(f"Parse exceeded {self.timeout}s")
+            status, payload = worker.conn.recv()
+        except (EOFError, BrokenPipeError, OSError) as e:
+            logger.error(f"Parse worker {worker.process.pid} died: {e}")
+            self._replace(worker)
+            raise ParseWorkerError(f"Parse worker died: {e}") from e
+
+        self._idle.put(worker)
+        if status != "ok":
+            raise ParseWorkerError(payload)
+        return payload
+
+    def close(self) -> None:
+        """Stop all workers."""
+        for worker in self._workers:
+            worker.stop()
+        self._workers.clear()
+        logger.info("Parse workers stopped")
@@ -1,39 +1,94 @@
 # parser.py
 
+import codecs
 import logging
-from typing import Dict, Tuple, Optional
-from bs4 import BeautifulSoup, Tag
+from typing import Optional, Union
+from board import Board, SymbolTable
+from lazy import lazy_import
+
+# bs4 (and lxml behind it) load on the first parse or warm_up()
+bs4 = lazy_import("bs4")
 
 logger = logging.getLogger(__name__)
 
-def parse_nse(html: str) -> Dict[str, Tuple[float, Optional[float]]]:
+# Charset for bytes that declare none, neither in Content-Type nor in a
+# <meta> tag. It is what requests decoded text/html as before the parser
+# took bytes, and naming one keeps bs4 from running charset detection.
+FALLBACK_ENCODING = "iso-8859-1"
+
+def _lxml_encoding(encoding: Optional[str]) -> Optional[str]:
+    """
+    Normalise a declared charset to a codec name libxml2 understands
+    (e.g. "latin-1" -> "iso8859-1"); unknown names return None so the
+    document's own declaration is used instead.
+    """
+    if not encoding:
+        return None
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        logger.warning(f"Unknown declared encoding '{encoding}', ignoring it")
+        return None
+
+def _from_encoding(html: bytes, encoding: Optional[str]) -> Optional[str]:
+    """
+    Encoding to hand bs4 for ``html``: the declared charset if usable, else
+    None when the document has its own <meta> declaration, else
+    FALLBACK_ENCODING.
+    """
+    declared = _lxml_encoding(encoding)
+    if declared is not None:
+        return declared
+    if bs4.dammit.EncodingDetector.find_declared_encoding(html, is_html=True):
+        return None
+    return FALLBACK_ENCODING
+
+def warm_up() -> None:
+    """Import bs4/lxml and build one tree so the first real parse does not pay for it."""
+    parse_nse(b"<table><tbody><tr><td></td></tr></tbody></table>", "utf-8")
+
+def parse_nse(
+    html: Union[str, bytes],
+    encoding: Optional[str] = None,
+    symbol_table: Optional[SymbolTable] = None,
+) -> Board:
     """
     Parse the NSE page HTML and return a mapping of ticker -> (price, change).
 
     Args:
-        html (str): Raw HTML content of the NSE page.
+        html (Union[str, bytes]): Raw HTML content of the NSE page. Bytes are
+            fed to lxml's byte parser without decoding them in Python first.
+        encoding (Optional[str]): Charset declared for ``html`` bytes. When
+            given it is used directly; otherwise the document's <meta>
+            charset applies, or FALLBACK_ENCODING if it has none.
+        symbol_table (Optional[SymbolTable]): Shared table that assigns each
+            ticker a stable id across boards.
 
     Returns:
-        Dict[str, Tuple[float, Optional[float]]]: A mapping from ticker symbol to 
-        (current_price, price_change). price_change can be None if not available.
+        Board: A mapping from ticker symbol to (current_price, price_change).
+        price_change can be None if not available. The board also carries
+        the name and volume columns.
     """
-    soup = BeautifulSoup(html, "lxml")
+    data = Board(symbol_table)
+    if isinstance(html, bytes):
+        soup = bs4.BeautifulSoup(html, "lxml", from_encoding=_from_encoding(html, encoding))
+    else:
+        soup = bs4.BeautifulSoup(html, "lxml")
     tables = soup.find_all("table")
     if not tables:
         logger.error("No <table> elements found.")
-        return {}
+        return data
 
     # Heuristic: choose the table with the most rows (full NSE)
     table = max(
-        (tbl for tbl in tables if isinstance(tbl, Tag)),
+        (tbl for tbl in tables if isinstance(tbl, bs4.Tag)),
         key=lambda tbl: len(tbl.select("tbody tr")),
         default=None
     )
     if table is None:
         logger.error("Could not locate the NSE list table.")
-        return {}
+        return data
 
-    data: Dict[str, Tuple[float, Optional[float]]] = {}
     for idx, row in enumerate(table.select("tbody tr"), start=1):
         cells = row.find_all("td")
         if len(cells) < 5:
@@ -64,7 +119,15 @@ def parse_nse(html: str) -> Dict[str, Tuple[float, Optional[float]]]:
                     except ValueError:
                         logger.debug(f"Could not parse change '{change_text}' for {ticker}")
             
-            data[ticker] = (price, price_change)
+            volume: Optional[int] = None
+            volume_text = cells[2].get_text(strip=True).replace(",", "")
+            if volume_text:
+                try:
+                    volume = int(volume_text)
+                except ValueError:
+                    logger.debug(f"Could not parse volume '{volume_text}' for {ticker}")
+
+            data.add(ticker, price, price_change, volume, cells[1].get_text(strip=True))
             logger.debug(f"Parsed: {ticker} -> price: {price}, change: {price_change}")
             
         except ValueError:
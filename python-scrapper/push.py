@@ -0,0 +1,266 @@
+# push.py
+
+import json
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Set
+import config
+from board import Quote, quote_fields
+from lazy import lazy_import
+
+if TYPE_CHECKING:
+    import asyncio
+else:
+    # asyncio loads when the gateway starts, not with main
+    asyncio = lazy_import("asyncio")
+
+logger = logging.getLogger(__name__)
+
+_HEADERS = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/event-stream\r\n"
+    b"Cache-Control: no-cache\r\n"
+    b"Connection: keep-alive\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"\r\n"
+)
+_NOT_FOUND = b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+_KEEP_ALIVE = b": keep-alive\n\n"
+
+
+def encode_event(event: str, event_id: int, data: List[Dict[str, str]]) -> bytes:
+    """Encode one Server-Sent Event whose data is a JSON list of entry fields."""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+class _Subscriber:
+    __slots__ = ("queue", "writer", "task", "peer")
+
+    def __init__(self, queue: "asyncio.Queue[bytes]", writer: "asyncio.StreamWriter", task: "asyncio.Task"):
+        self.queue = queue
+        self.writer = writer
+        self.task = task
+        self.peer = writer.get_extra_info("peername")
+
+
+class PushGateway:
+    """
+    Server-Sent Events fan-out of the published ticks.
+
+    A subscriber to ``GET /events`` first receives a ``snapshot`` event with
+    the latest published fields of every ticker, then one ``delta`` event per
+    tick with the entries ``publish_changes`` returned. Tickers on the parsed
+    board that nothing has been published for since the gateway started
+    (e.g. unchanged since a restart, with sequenced or server-side
+    publishing) enter the snapshot with the fields of their quote. Each event is
+    serialized once and the same bytes are queued for every subscriber; a
+    subscriber whose queue is full (it is ``queue_size`` ticks behind) is
+    disconnected so it cannot hold up the others or grow memory.
+
+    The server runs on its own asyncio loop in a daemon thread; ``publish``
+    is called from the scheduler thread.
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        host: str = "0.0.0.0",
+        queue_size: int = 64,
+        heartbeat: float = 15.0,
+    ):
+        """
+        Args:
+            port: Port to listen on (0 picks a free one; see ``self.port``
+                after ``start()``).
+            host: Interface to bind.
+            queue_size: Events a subscriber may fall behind before it is
+                dropped.
+            heartbeat: Seconds of silence after which a keep-alive comment
+                is sent, so proxies keep the connection and dead peers are
+                noticed.
+        """
+        self.port = port
+        self.host = host
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.events = 0
+        self.dropped = 0
+        self._seq = 0
+        # ticker -> latest published fields; only touched on the loop thread
+        self._board: Dict[str, Dict[str, str]] = {}
+        self._board_id = 0
+        self._snapshot: Optional[bytes] = None
+        self._subscribers: Set[_Subscriber] = set()
+        self._loop: Optional["asyncio.AbstractEventLoop"] = None
+        self._server: Optional["asyncio.Server"] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls) -> Optional["PushGateway"]:
+        """Build the gateway from config, or None when PUSH_PORT is 0."""
+        if not config.PUSH_PORT:
+            return None
+        return cls(
+            port=config.PUSH_PORT,
+            queue_size=config.PUSH_QUEUE_SIZE,
+            heartbeat=config.PUSH_HEARTBEAT,
+        )
+
+    def start(self) -> None:
+        """
+        Start serving on a background event loop.
+
+        Raises:
+            OSError: If the port cannot be bound.
+        """
+        self._loop = asyncio.new_event_loop()
+        bound: Future = Future()
+        self._thread = threading.Thread(target=self._run, args=(bound,), name="push-gateway", daemon=True)
+        self._thread.start()
+        try:
+            self.port = bound.result(timeout=10)
+        except Exception:
+            self._thread.join(timeout=5)
+            self._loop = None
+            raise
+        logger.info(f"Push gateway listening on :{self.port} (/events)")
+
+    def _run(self, bound: Future) -> None:
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        except Exception as e:
+            bound.set_exception(e)
+            loop.close()
+            return
+        bound.set_result(self._server.sockets[0].getsockname()[1])
+        loop.run_forever()
+        loop.close()
+
+    def publish(self, changes: List[Dict[str, str]], board: Optional[Mapping[str, Quote]] = None) -> None:
+        """
+        Push one tick's published entries to every subscriber.
+
+        Args:
+            changes: Stream fields as returned by ``publish_changes``; a
+                tick without changes sends no delta.
+            board: The tick's parsed board, so tickers that were not
+                published still appear in the snapshot.
+        """
+        if self._loop is None or not (changes or board):
+            return
+        payload: Optional[bytes] = None
+        if changes:
+            self._seq += 1
+            payload = encode_event("delta", self._seq, changes)
+            self.events += 1
+        ts = int(time.time() * (1000 if config.TIMESTAMP_MS else 1))
+        self._loop.call_soon_threadsafe(self._fan_out, self._seq, payload, changes, board, ts)
+
+    def _fan_out(
+        self,
+        event_id: int,
+        payload: Optional[bytes],
+        changes: List[Dict[str, str]],
+        board: Optional[Mapping[str, Quote]] = None,
+        ts: int = 0,
+    ) -> None:
+        for fields in changes:
+            self._board[fields["ticker"]] = fields
+        seeded = self._seed(board, ts) if board is not None else 0
+        if payload is None:
+            if seeded:
+                self._snapshot = None
+            return
+        self._board_id = event_id
+        self._snapshot = None
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+
+    def _seed(self, board: Mapping[str, Quote], ts: int) -> int:
+        """Add board tickers missing from the snapshot; return how many."""
+        seeded = 0
+        for ticker in board:
+            if ticker not in self._board:
+                self._board[ticker] = quote_fields(ticker, *board[ticker], ts)
+                seeded += 1
+        return seeded
+
+    def _drop(self, subscriber: _Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        self.dropped += 1
+        logger.warning(f"Dropping slow push subscriber {subscriber.peer} ({self.queue_size} events behind)")
+        # Abort rather than close: do not wait to flush a backlog it is not reading
+        subscriber.writer.transport.abort()
+        subscriber.task.cancel()
+
+    def _snapshot_event(self) -> bytes:
+        """Serialize the board once per tick, on the first subscribe after it changed."""
+        if self._snapshot is None:
+            self._snapshot = encode_event("snapshot", self._board_id, [self._board[t] for t in sorted(self._board)])
+        return self._snapshot
+
+    async def _handle(self, reader: "asyncio.StreamReader", writer: "asyncio.StreamWriter") -> None:
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=10)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        method, _, rest = request.partition(b" ")
+        path = rest.split(b" ", 1)[0].split(b"?", 1)[0]
+        if method != b"GET" or path != b"/events":
+            writer.write(_NOT_FOUND)
+            writer.close()
+            return
+
+        subscriber = _Subscriber(asyncio.Queue(self.queue_size), writer, asyncio.current_task())
+        # Snapshot and registration happen without an await in between, so
+        # the first delta queued is the first tick after the snapshot
+        writer.write(_HEADERS + self._snapshot_event())
+        self._subscribers.add(subscriber)
+        logger.debug(f"Push subscriber connected: {subscriber.peer}")
+        try:
+            await writer.drain()
+            while True:
+                try:
+                    payload = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    payload = _KEEP_ALIVE
+                writer.write(payload)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._subscribers.discard(subscriber)
+            writer.close()
+            logger.debug(f"Push subscriber disconnected: {subscriber.peer}")
+
+    def stats(self) -> Dict[str, int]:
+        """Return gateway counters for monitoring."""
+        return {
+            "push_subscribers": len(self._subscribers),
+            "push_events": self.events,
+            "push_dropped": self.dropped,
+        }
+
+    def close(self) -> None:
+        """Disconnect every subscriber and stop the server."""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+    async def _shutdown(self) -> None:
+        self._server.close()
+        tasks = [subscriber.task for subscriber in self._subscribers]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,16 +1,21 @@
 # scheduler.py
 
 import time
-import schedule
 import logging
-from typing import Callable
+from typing import Any, Callable
+from lazy import lazy_import
+
+schedule = lazy_import("schedule")
 
 logger = logging.getLogger(__name__)
 
-def schedule_job(func: Callable) -> None:
+def schedule_job(func: Callable, run_now: bool = False) -> None:
     """
     Schedule the given function to run every FETCH_INTERVAL_MIN to
     FETCH_INTERVAL_MAX seconds, indefinitely.
+
+    With ``run_now`` the function also runs once immediately instead of
+    waiting out the first interval.
     """
     from config import FETCH_INTERVAL_MIN, FETCH_INTERVAL_MAX
 
@@ -18,7 +23,21 @@ def schedule_job(func: Callable) -> None:
         f"Scheduling job to run every {FETCH_INTERVAL_MIN} -- {FETCH_INTERVAL_MAX} seconds."
     )
     schedule.every(FETCH_INTERVAL_MIN).to(FETCH_INTERVAL_MAX).seconds.do(func)
+    if run_now:
+        func()
 
     while True:
         schedule.run_pending()
         time.sleep(1)
+
+
+def run_once(delay: float, func: Callable, *args: Any) -> None:
+    """
+    Run ``func(*args)`` once, about ``delay`` seconds from now, from the
+    scheduler loop (which checks once a second), then drop the job.
+    """
+    def once() -> Any:
+        func(*args)
+        return schedule.CancelJob
+
+    schedule.every(delay).seconds.do(once)
@@ -0,0 +1,98 @@
+# sequencer.py
+
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+import config
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+# Adds each change only if its per-ticker sequence is newer than the one
+# stored in a hash, and records the new sequence, atomically in one call.
+#
+# KEYS[1]  stream
+# KEYS[2]  hash of ticker -> "<seq>|<price>" of the last accepted change
+# ARGV[1]  MAXLEN (approximate)
+# ARGV[2..] per change: ticker, seq, price, field count N, then N
+#          field/value pairs
+#
+# Returns 1 per accepted change, or the stored "<seq>|<price>" when the
+# change's sequence is not newer.
+PUBLISH_SCRIPT = """
+local result = {}
+local i = 2
+while i <= #ARGV do
+    local ticker, seq, price, n = ARGV[i], ARGV[i + 1], ARGV[i + 2], tonumber(ARGV[i + 3])
+    local fields = {}
+    for j = 1, n * 2 do
+        fields[j] = ARGV[i + 3 + j]
+    end
+    i = i + 4 + n * 2
+    local stored = redis.call('HGET', KEYS[2], ticker)
+    if stored and tonumber(string.match(stored, '^(%d+)')) >= tonumber(seq) then
+        table.insert(result, stored)
+    else
+        redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', unpack(fields))
+        redis.call('HSET', KEYS[2], ticker, seq .. '|' .. price)
+        table.insert(result, 1)
+    end
+end
+return result
+"""
+
+# (ticker, seq, price, stream fields) for one change
+Sequenced = Tuple[str, int, str, Dict[str, str]]
+
+
+def _decode(value: Union[bytes, str]) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class Sequencer:
+    """
+    Per-ticker publish sequences persisted in Redis.
+
+    Every change of a ticker gets the next number in that ticker's
+    sequence. The script writes the entry only if that number is newer
+    than the stored one, so a replayed batch is refused entry by entry.
+    Because the sequences live in Redis, a restarted process picks up
+    where the last one stopped instead of republishing the board.
+    Stream IDs stay auto-generated, so a clock stepping back or another
+    writer's newer entries cannot cause rejections.
+    """
+
+    def __init__(self, r: "Redis", seq_key: Optional[str] = None):
+        self.r = r
+        self.seq_key = seq_key or config.STREAM_SEQ_KEY
+        self._script = r.register_script(PUBLISH_SCRIPT)
+
+    def load(self) -> Dict[str, Tuple[int, float]]:
+        """Read ticker -> (last sequence, last price) from Redis."""
+        stored = self.r.hgetall(self.seq_key)
+        return {_decode(k): self.parse(v) for k, v in stored.items()}  # type: ignore[union-attr]
+
+    @staticmethod
+    def parse(stored: Union[bytes, str]) -> Tuple[int, float]:
+        """Split a stored "<seq>|<price>" value."""
+        seq, _, price = _decode(stored).partition("|")
+        return int(seq), float(price)
+
+    def publish(self, changes: List[Sequenced], maxlen: int) -> List[Optional[Tuple[int, float]]]:
+        """
+        Write a batch in one round trip.
+
+        Returns:
+            List[Optional[Tuple[int, float]]]: Per change, None if it was
+            written, else the stored (sequence, price) that refused it.
+        """
+        if not changes:
+            return []
+        args: List[Union[int, str]] = [maxlen]
+        for ticker, seq, price, fields in changes:
+            args.extend((ticker, seq, price, len(fields)))
+            for key, value in fields.items():
+                args.extend((key, value))
+        result = self._script(keys=[config.STREAM_NAME, self.seq_key], args=args)
+        return [None if item == 1 else self.parse(item) for item in result]  # type: ignore[union-attr]
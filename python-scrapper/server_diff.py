@@ -0,0 +1,131 @@
+# server_diff.py
+
+import logging
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional
+import config
+from board import Quote
+
+if TYPE_CHECKING:
+    from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+# Compares each ticker's price with the value stored in a hash, XADDs only
+# the real changes and records the new prices, atomically in one call.
+#
+# KEYS[1]  stream
+# KEYS[2]  hash of ticker -> last published price (as sent by the client)
+# ARGV[1]  MAXLEN (approximate)
+# ARGV[2]  tick timestamp for the "ts" field
+# ARGV[3..] groups of 5: ticker, price, price_change, price_change_abs,
+#          price_change_direction ("" for the last three when unavailable)
+#
+# Returns one flat field list per published entry.
+PUBLISH_SCRIPT = """
+-- Python's str() of a float: the shortest digits that read back as the
+-- same number, fixed notation for exponents -4..15, and ".0" on integers
+local function pyfloat(x)
+    local s
+    for p = 1, 17 do
+        s = string.format('%.' .. p .. 'g', x)
+        if tonumber(s) == x then break end
+    end
+    local mantissa, exp = string.match(s, '^(-?[%d.]+)e([-+]%d+)$')
+    if exp and tonumber(exp) >= -4 and tonumber(exp) < 16 then
+        local digits = #string.gsub(mantissa, '[-.]', '')
+        s = string.format('%.' .. math.max(digits - 1 - tonumber(exp), 0) .. 'f', x)
+    end
+    if not string.find(s, '[.e]') then
+        s = s .. '.0'
+    end
+    return s
+end
+
+local changed = {}
+for i = 3, #ARGV, 5 do
+    local ticker, price = ARGV[i], ARGV[i + 1]
+    local last = redis.call('HGET', KEYS[2], ticker)
+    if last ~= price then
+        local fields = {'ticker', ticker, 'price', price, 'ts', ARGV[2]}
+        if ARGV[i + 2] ~= '' then
+            table.insert(fields, 'price_change')
+            table.insert(fields, ARGV[i + 2])
+            table.insert(fields, 'price_change_abs')
+            table.insert(fields, ARGV[i + 3])
+            table.insert(fields, 'price_change_direction')
+            table.insert(fields, ARGV[i + 4])
+        end
+        if last then
+            local previous = tonumber(last)
+            if previous ~= 0 then
+                local change = tonumber(price) - previous
+                -- %.4f rounds the exact value, as Python's round(pct, 4) does
+                local pct = tonumber(string.format('%.4f', change / previous * 100))
+                table.insert(fields, 'calculated_change')
+                table.insert(fields, pyfloat(change))
+                table.insert(fields, 'calculated_pct_change')
+                table.insert(fields, pyfloat(pct))
+            end
+        end
+        redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', unpack(fields))
+        redis.call('HSET', KEYS[2], ticker, price)
+        table.insert(changed, fields)
+    end
+end
+return changed
+"""
+
+
+class ServerDiff:
+    """
+    Server-side change detection via a Lua publish primitive.
+
+    The whole parsed board is sent in one EVALSHA; Redis keeps the last
+    published price per ticker in a hash, so change detection survives
+    restarts and is shared by every replica writing the same stream.
+    Prices are compared as their Python ``str()`` form, which is exact for
+    equal floats. The script formats ``calculated_change`` and
+    ``calculated_pct_change`` as Python's ``str()`` would, so entries are
+    identical to the client-side path's.
+    """
+
+    def __init__(self, r: "Redis", state_key: Optional[str] = None):
+        self.r = r
+        self.state_key = state_key or config.LAST_PRICES_KEY
+        self._script = r.register_script(PUBLISH_SCRIPT)
+
+    @staticmethod
+    def encode_board(data: Mapping[str, Quote]) -> List[str]:
+        """Flatten a parsed board into the script's ARGV groups."""
+        args: List[str] = []
+        for ticker, (price, price_change) in data.items():
+            if price_change is None:
+                args.extend((ticker, str(price), "", "", ""))
+            else:
+                direction = "up" if price_change > 0 else "down" if price_change < 0 else "neutral"
+                args.extend((ticker, str(price), str(price_change), str(abs(price_change)), direction))
+        return args
+
+    def publish(self, data: Mapping[str, Quote], ts: int, maxlen: int) -> List[Dict[str, str]]:
+        """
+        Diff and publish a board in one round trip.
+
+        Returns:
+            List[Dict[str, str]]: The stream fields of every published entry.
+        """
+        if not data:
+            return []
+        changed = self._script(
+            keys=[config.STREAM_NAME, self.state_key],
+            args=[maxlen, ts, *self.encode_board(data)],
+        )
+        published = []
+        for flat in changed:  # type: ignore[union-attr]
+            values = [v.decode() if isinstance(v, bytes) else str(v) for v in flat]
+            published.append(dict(zip(values[::2], values[1::2])))
+        return published
+
+    def last_prices(self) -> Dict[str, float]:
+        """Read the stored last prices (e.g. to seed a client-side cache)."""
+        stored = self.r.hgetall(self.state_key)
+        return {k.decode() if isinstance(k, bytes) else k: float(v) for k, v in stored.items()}  # type: ignore[union-attr]
@@ -0,0 +1,209 @@
+# shards.py
+"""
+Sharded publishing: per-ticker streams and snapshot keys spread across
+several Redis nodes, either by client-side consistent hashing over a list
+of URLs or by Redis Cluster hash slots.
+
+Every per-ticker key carries the ticker as a hash tag (``{ABSA}``), so a
+ticker's stream and snapshot always live on the same node in both modes.
+"""
+
+import bisect
+from abc import ABC, abstractmethod
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+import config
+from lazy import lazy_import
+
+if TYPE_CHECKING:
+    import redis
+    from redis import Redis
+    from redis.cluster import RedisCluster
+else:
+    redis = lazy_import("redis")
+
+logger = logging.getLogger(__name__)
+
+# Stages one node's share of a batch on that node's pipeline
+StageFn = Callable[..., None]
+
+
+def stream_key(ticker: str) -> str:
+    """Per-ticker stream, e.g. ``nse:realtime:{ABSA}``."""
+    return f"{config.STREAM_NAME}:{{{ticker}}}"
+
+
+def snapshot_key(ticker: str) -> str:
+    """Latest published fields for a ticker, e.g. ``nse:snapshot:{ABSA}``."""
+    return f"{config.SNAPSHOT_PREFIX}:{{{ticker}}}"
+
+
+class Shards(ABC):
+    """
+    A set of Redis nodes and the rule that assigns each ticker to one.
+
+    Subclasses provide ``nodes``, ``node_for`` and ``client``; this class
+    runs one pipeline per node in parallel and keeps per-node counters.
+    """
+
+    def __init__(self) -> None:
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.entries: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.busy_ms: Dict[str, float] = {}
+
+    @classmethod
+    def from_config(cls) -> Optional["Shards"]:
+        """Build the configured shard layout, or None for a single node."""
+        mode = config.SHARD_MODE
+        if not mode:
+            return None
+        if mode == "ring":
+            urls = [url.strip() for url in config.SHARD_URLS.split(",") if url.strip()]
+            return HashRingShards(urls)
+        if mode == "cluster":
+            return ClusterShards(config.REDIS_URL)
+        raise ValueError(f"Unknown SHARD_MODE '{mode}' (expected 'ring' or 'cluster')")
+
+    @abstractmethod
+    def nodes(self) -> List[str]:
+        """Every node name, in a stable order."""
+
+    @abstractmethod
+    def node_for(self, ticker: str) -> str:
+        """The node that owns a ticker's keys."""
+
+    @abstractmethod
+    def client(self, node: str) -> "Redis":
+        """The client for one node."""
+
+    def refresh(self, error: Exception) -> None:
+        """React to a node error (e.g. reload the slot map); no-op by default."""
+
+    def ping(self) -> None:
+        """Ping every node; raises on the first that does not answer."""
+        for node in self.nodes():
+            self.client(node).ping()
+
+    def group(self, tickers: Sequence[str]) -> Dict[str, List[int]]:
+        """Indexes into ``tickers`` grouped by owning node."""
+        groups: Dict[str, List[int]] = {}
+        for i, ticker in enumerate(tickers):
+            groups.setdefault(self.node_for(ticker), []).append(i)
+        return groups
+
+    def execute(self, groups: Dict[str, List[int]], stage: StageFn) -> Dict[str, Optional[Exception]]:
+        """
+        Run ``stage(pipe, indexes)`` and execute one pipeline per node, in parallel.
+
+        Returns:
+            Dict[str, Optional[Exception]]: Per node, None on success or the
+            error its pipeline raised. A failing node does not stop the others.
+        """
+        def run(node: str) -> Tuple[str, Optional[Exception]]:
+            start = time.perf_counter()
+            try:
+                pipe = self.client(node).pipeline(transaction=False)
+                stage(pipe, groups[node])
+                pipe.execute()
+            except (redis.exceptions.RedisError, OSError) as e:
+                self.errors[node] = self.errors.get(node, 0) + 1
+                logger.error(f"Shard {node} failed to publish {len(groups[node])} entries: {e}")
+                self.refresh(e)
+                return node, e
+            finally:
+                self.busy_ms[node] = self.busy_ms.get(node, 0.0) + (time.perf_counter() - start) * 1000
+            self.entries[node] = self.entries.get(node, 0) + len(groups[node])
+            return node, None
+
+        if len(groups) <= 1:
+            return dict(run(node) for node in groups)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max(len(self.nodes()), 1), thread_name_prefix="shard")
+        return dict(self._executor.map(run, list(groups)))
+
+    def stats(self) -> Dict[str, int]:
+        """Per-shard entries written, pipeline errors and cumulative pipeline time (ms)."""
+        stats: Dict[str, int] = {}
+        for node in self.nodes():
+            stats[f"shard_entries:{node}"] = self.entries.get(node, 0)
+            stats[f"shard_errors:{node}"] = self.errors.get(node, 0)
+            stats[f"shard_ms:{node}"] = int(self.busy_ms.get(node, 0.0))
+        return stats
+
+    def close(self) -> None:
+        """Shut down the per-node pipeline threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _point(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class HashRingShards(Shards):
+    """
+    Client-side consistent hashing over independent Redis instances.
+
+    Each URL gets ``replicas`` points on a 64-bit ring; a ticker belongs to
+    the first point at or after the hash of its hash tag. Adding or removing
+    an instance moves only the tickers on its arcs.
+    """
+
+    def __init__(self, urls: Sequence[str], replicas: int = 64, clients: Optional[Dict[str, "Redis"]] = None):
+        super().__init__()
+        if not urls:
+            raise ValueError("Ring sharding needs at least one URL in SHARD_URLS")
+        self._urls = list(urls)
+        self._clients = clients or {url: redis.Redis.from_url(url) for url in self._urls}
+        ring = sorted((_point(f"{url}#{i}"), url) for url in self._urls for i in range(replicas))
+        self._points = [point for point, _ in ring]
+        self._owners = [url for _, url in ring]
+        self._cache: Dict[str, str] = {}
+
+    def nodes(self) -> List[str]:
+        return list(self._urls)
+
+    def node_for(self, ticker: str) -> str:
+        node = self._cache.get(ticker)
+        if node is None:
+            i = bisect.bisect_left(self._points, _point(ticker)) % len(self._points)
+            node = self._cache[ticker] = self._owners[i]
+        return node
+
+    def client(self, node: str) -> "Redis":
+        return self._clients[node]
+
+
+class ClusterShards(Shards):
+    """
+    Redis Cluster: tickers follow their hash slot to the owning primary.
+
+    Batches are pipelined straight to each primary's connection. If a
+    pipeline hits MOVED/ASK during resharding, the slot map is reloaded and
+    the affected tickers, which were not marked published, go out on the
+    next tick.
+    """
+
+    def __init__(self, url: str, cluster: Optional["RedisCluster"] = None):
+        super().__init__()
+        self.cluster = cluster or redis.cluster.RedisCluster.from_url(url)
+
+    def nodes(self) -> List[str]:
+        return [node.name for node in self.cluster.get_primaries()]
+
+    def node_for(self, ticker: str) -> str:
+        return self.cluster.get_node_from_key(stream_key(ticker)).name
+
+    def client(self, node: str) -> "Redis":
+        return self.cluster.get_redis_connection(self.cluster.get_node(node_name=node))
+
+    def refresh(self, error: Exception) -> None:
+        # MovedError is a subclass of AskError
+        if isinstance(error, redis.exceptions.AskError):
+            logger.info("Cluster slots moved; reloading the slot map")
+            self.cluster.nodes_manager.initialize()
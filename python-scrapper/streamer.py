@@ -1,81 +1,483 @@
 # streamer.py
 
+import json
 import time
 import logging
-from typing import Dict, Optional, Tuple
-import redis
-from redis import Redis
-from redis.exceptions import ConnectionError, RedisError
+from typing import Dict, List, Mapping, Optional, Tuple
+from typing import TYPE_CHECKING
 import config
+from board import Quote, quote_fields
+from coalescer import Coalescer
+from group_monitor import GroupMonitor
+from indicators import IndicatorStage
+from shards import Shards, snapshot_key, stream_key
+import movers
+from server_diff import ServerDiff
+from sequencer import Sequenced, Sequencer
+from lazy import lazy_import
+
+if TYPE_CHECKING:
+    import redis
+    from redis import Redis
+else:
+    redis = lazy_import("redis")
 
 logger = logging.getLogger(__name__)
 
+# (ticker, (price, price_change), stream fields) for one pending XADD
+Change = Tuple[str, Quote, Dict[str, str]]
+
 class RedisStreamer:
-    def __init__(self):
-        self.r: Redis = redis.Redis.from_url(config.REDIS_URL)
+    def __init__(
+        self,
+        idempotent: bool = config.STREAM_IDEMPOTENT,
+        publish_retries: int = 1,
+        coalescer: Optional[Coalescer] = None,
+        group_monitor: Optional[GroupMonitor] = None,
+        movers_index: bool = config.MOVERS_INDEX,
+        server_side: bool = config.SERVER_SIDE_DIFF,
+        indicators: Optional[IndicatorStage] = None,
+        shards: Optional[Shards] = None,
+    ):
+        """
+        Args:
+            idempotent: Number each ticker's changes with a sequence
+                persisted in Redis (see sequencer.py) so a replayed batch
+                is rejected by Redis instead of being duplicated, and a
+                restart resumes from the stored prices.
+            publish_retries: How many times an idempotent batch is replayed
+                after a connection error before giving up.
+            coalescer: Optional policy that rate-limits and thresholds
+                per-ticker changes before they are published.
+            group_monitor: Optional consumer-group backlog watcher; when a
+                group nears the retention limit the streamer raises MAXLEN,
+                switches to coalesced publishing and/or alerts.
+            movers_index: Maintain the per-day market-movers sorted sets
+                (see movers.py) in the same pipeline as each publish.
+            server_side: Diff and publish the whole board in one Lua call
+                against last prices stored in Redis (see server_diff.py).
+                Not combinable with idempotent or coalesced publishing.
+            indicators: Optional incremental indicator stage fed with every
+                board; values are added to the tick's entries, or written
+                to the stage's own stream when it has one.
+            shards: Optional shard layout (see shards.py). Changes then go
+                to per-ticker streams and snapshot keys spread across its
+                nodes, with one pipeline per node run in parallel. Only
+                plain or coalesced publishing with in-entry indicators.
+        """
+        if server_side and (idempotent or coalescer is not None):
+            raise ValueError("Server-side diffing cannot be combined with idempotent or coalesced publishing")
+        if server_side and indicators is not None and indicators.stream is None:
+            raise ValueError("Server-side diffing needs a separate indicators stream")
+        if shards is not None and (
+            server_side or idempotent or movers_index or group_monitor is not None
+            or (indicators is not None and indicators.stream is not None)
+        ):
+            raise ValueError(
+                "Sharded publishing cannot be combined with server-side diffing, idempotent publishing, "
+                "movers indexes, group monitoring or a separate indicators stream"
+            )
+        self.shards = shards
+        # In sharded mode there is no single stream; self.r is the first node
+        self.r: Redis = redis.Redis.from_url(config.REDIS_URL) if shards is None else shards.client(shards.nodes()[0])
         self.last_prices: Dict[str, float] = {}
+        self.idempotent = idempotent
+        self.publish_retries = publish_retries
+        self.coalescer = coalescer
+        self.group_monitor = group_monitor
+        self.movers_index = movers_index
+        self.indicators = indicators
+        self.maxlen_override: Optional[int] = None
+        self._pressure_coalescer = False
+        self.published = 0
+        self.duplicates_rejected = 0
+        self.indicators_published = 0
         self._test_connection()
-        logger.info(f"Connected to Redis: {config.REDIS_URL}")
+        self.server_diff: Optional[ServerDiff] = ServerDiff(self.r) if server_side else None
+        self.sequencer: Optional[Sequencer] = None
+        self._seq: Dict[str, int] = {}
+        if idempotent:
+            self.sequencer = Sequencer(self.r)
+            for ticker, (seq, price) in self.sequencer.load().items():
+                self._seq[ticker] = seq
+                self.last_prices[ticker] = price
+            logger.info(f"Resumed publish sequences for {len(self._seq)} tickers")
+        if shards is not None:
+            logger.info(f"Sharded publishing across {len(shards.nodes())} Redis nodes")
+        else:
+            logger.info(f"Connected to Redis: {config.REDIS_URL}")
 
     def _test_connection(self) -> None:
         """
         Test Redis connection and raise an exception if connection fails.
         """
         try:
+            if self.shards is not None:
+                self.shards.ping()
             # Test the connection with a simple ping
-            if not self.r.ping():
-                raise ConnectionError("Redis ping failed")
+            elif not self.r.ping():
+                raise redis.exceptions.ConnectionError("Redis ping failed")
             logger.info("Redis connection test successful")
-        except (ConnectionError, RedisError, Exception) as e:
+        except Exception as e:
             logger.error(f"Failed to connect to Redis at {config.REDIS_URL}: {e}")
-            raise ConnectionError(f"Redis connection failed: {e}") from e
+            raise redis.exceptions.ConnectionError(f"Redis connection failed: {e}") from e
+
+    def stats(self) -> Dict[str, int]:
+        """Return publish counters for monitoring."""
+        stats = {
+            "published": self.published,
+            "duplicates_rejected": self.duplicates_rejected,
+        }
+        if self.coalescer is not None:
+            stats["coalesce_suppressed"] = self.coalescer.suppressed
+            stats["coalesce_flushed"] = self.coalescer.flushed
+            stats["coalesce_pending"] = self.coalescer.pending
+        if self.group_monitor is not None:
+            stats.update(self.group_monitor.stats())
+            stats["stream_maxlen"] = self._maxlen()
+        if self.indicators is not None:
+            stats["indicators_published"] = self.indicators_published
+        if self.shards is not None:
+            stats.update(self.shards.stats())
+        return stats
+
+    def close(self) -> None:
+        """Release the shard layout's worker threads, if any."""
+        if self.shards is not None:
+            self.shards.close()
 
-    def publish_changes(self, data: Dict[str, Tuple[float, Optional[float]]]) -> None:
+    def _maxlen(self) -> int:
+        """Effective MAXLEN: the configured limit unless raised under backpressure."""
+        return self.maxlen_override or config.STREAM_MAXLEN
+
+    def publish_changes(
+        self,
+        data: Mapping[str, Quote],
+        ts: Optional[float] = None,
+    ) -> List[Dict[str, str]]:
         """
         Compare incoming ticker-price data with cached prices,
         publish only on change, and trim the Redis stream.
         
         Args:
-            data: Dict mapping ticker -> (current_price, price_change)
+            data: Mapping (e.g. a parsed Board) of ticker -> (current_price, price_change)
+            ts: Tick timestamp in seconds since epoch. Defaults to now.
+
+        Returns:
+            List[Dict[str, str]]: The stream fields of every published entry.
+        """
+        if ts is None:
+            ts = time.time()
+        tick_ts = int(ts * (1000 if config.TIMESTAMP_MS else 1))
+        flushed = self._watch_groups(ts)
+        indicator_values = self.indicators.update(data) if self.indicators is not None else {}
+
+        if self.server_diff is not None:
+            published = self._publish_server_side(data, ts, tick_ts)
+            self._publish_indicators(indicator_values, tick_ts)
+            return flushed + published
+
+        changes: List[Change] = []
+        for ticker, quote in data.items():
+            last = self.last_prices.get(ticker)
+            if last is None or quote[0] != last:
+                if self.coalescer is not None and not self.coalescer.admit(ticker, quote, last, ts):
+                    continue
+                changes.append((ticker, quote, self._build_fields(ticker, *quote, last, tick_ts)))
+            elif self.coalescer is not None:
+                self.coalescer.discard(ticker)
+
+        due: List[Tuple[str, Quote]] = []
+        if self.coalescer is not None:
+            due = self.coalescer.due(ts)
+            changes.extend(self._flushed_changes(due, tick_ts))
+
+        if self.indicators is not None and self.indicators.stream is None:
+            for ticker, _, fields in changes:
+                fields.update(indicator_values.get(ticker, {}))
+
+        written = self._write(changes, ts)
+        if due:
+            self._commit_flushed(due, ts)
+        self._publish_indicators(indicator_values, tick_ts)
+        # Optionally trim by time-based logic using XTRIM
+        # e.g., remove entries older than an hour (commented out for simplicity)
+        # self._trim_by_age()
+        return flushed + [fields for _, _, fields in written]
+
+    def flush_pending(self, ts: Optional[float] = None) -> List[Dict[str, str]]:
+        """
+        Publish every value held back by the coalescer, e.g. on shutdown.
+
+        Returns:
+            List[Dict[str, str]]: The stream fields of every published entry.
+        """
+        if self.coalescer is None:
+            return []
+        if ts is None:
+            ts = time.time()
+        tick_ts = int(ts * (1000 if config.TIMESTAMP_MS else 1))
+        due = self.coalescer.due(ts, force=True)
+        written = self._write(self._flushed_changes(due, tick_ts), ts)
+        self._commit_flushed(due, ts)
+        return [fields for _, _, fields in written]
+
+    def _watch_groups(self, ts: float) -> List[Dict[str, str]]:
+        """
+        Sample consumer-group backlog when due and adapt to pressure.
+
+        Returns:
+            List[Dict[str, str]]: The stream fields of entries flushed when
+            a pressure-time coalescer is dropped, otherwise empty.
         """
-        ts = int(time.time() * (1000 if config.TIMESTAMP_MS else 1))
-        for ticker, (price, price_change) in data.items():
+        monitor = self.group_monitor
+        if monitor is None or not monitor.due(ts):
+            return []
+        try:
+            monitor.sample(self.r, config.STREAM_NAME, ts, config.STREAM_MAXLEN)
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"Could not read consumer groups on {config.STREAM_NAME}: {e}")
+            return []
+
+        change = monitor.update_pressure(config.STREAM_MAXLEN)
+        if monitor.under_pressure and "alert" in monitor.actions:
+            logger.warning(
+                f"Consumer group backlog {monitor.backlog()} is near MAXLEN {config.STREAM_MAXLEN}: "
+                f"lag={monitor.lag} pending={monitor.pending}"
+            )
+        if change is True:
+            if "raise_maxlen" in monitor.actions:
+                self.maxlen_override = config.STREAM_MAXLEN * monitor.maxlen_factor
+                logger.warning(f"Raised stream MAXLEN to {self.maxlen_override} under consumer backpressure")
+            if "coalesce" in monitor.actions and self.coalescer is None and self.server_diff is None:
+                self.coalescer = Coalescer(min_interval=monitor.coalesce_interval, flush_after=monitor.coalesce_interval)
+                self._pressure_coalescer = True
+                logger.warning(f"Coalescing publishes every {monitor.coalesce_interval}s under consumer backpressure")
+        elif change is False:
+            logger.info(f"Consumer backlog recovered ({monitor.backlog()}); restoring normal publishing")
+            self.maxlen_override = None
+            if self._pressure_coalescer:
+                # Publish anything the temporary coalescer held before dropping it
+                flushed = self.flush_pending(ts)
+                self.coalescer = None
+                self._pressure_coalescer = False
+                return flushed
+        return []
+
+    def _publish_server_side(
+        self,
+        data: Mapping[str, Quote],
+        ts: float,
+        tick_ts: int,
+    ) -> List[Dict[str, str]]:
+        """Publish through the Lua primitive; Redis decides what changed."""
+        assert self.server_diff is not None
+        published = self.server_diff.publish(data, tick_ts, self._maxlen())
+        for fields in published:
+            self.last_prices[fields["ticker"]] = float(fields["price"])
+            self.published += 1
+        if self.movers_index and published:
+            pipe = self.r.pipeline(transaction=False)
+            movers.stage_updates(pipe, published, ts)
+            pipe.execute()
+        logger.debug(f"Server-side diff published {len(published)} of {len(data)} tickers")
+        return published
+
+    def _publish_indicators(self, values: Dict[str, Dict[str, str]], tick_ts: int) -> None:
+        """Write changed indicator values to the indicators stream, if one is configured."""
+        stage = self.indicators
+        if stage is None or stage.stream is None:
+            return
+        changed = stage.changed(values)
+        if not changed:
+            return
+        pipe = self.r.pipeline(transaction=False)
+        for ticker, fields in changed.items():
+            pipe.xadd(
+                stage.stream,
+                fields={"ticker": ticker, "ts": str(tick_ts), **fields},  # type: ignore[arg-type]
+                maxlen=stage.maxlen,
+                approximate=True
+            )
+        pipe.execute()
+        self.indicators_published += len(changed)
+
+    def _flushed_changes(self, flushed: List[Tuple[str, Quote]], tick_ts: int) -> List[Change]:
+        """Turn trailing-flush values into changes, skipping any already published."""
+        changes: List[Change] = []
+        for ticker, quote in flushed:
             last = self.last_prices.get(ticker)
-            if last is None or price != last:
-                # Create fields dict - Redis accepts string keys and values
-                fields = {
-                    "ticker": str(ticker),
-                    "price": str(price),
-                    "ts": str(ts)
-                }
-                
-                # Add price change if available
-                if price_change is not None:
-                    fields["price_change"] = str(price_change)
-                    fields["price_change_abs"] = str(abs(price_change))
-                    fields["price_change_direction"] = "up" if price_change > 0 else "down" if price_change < 0 else "neutral"
-                
-                # Calculate percentage change if we have previous price
-                if last is not None and last != 0:
-                    calculated_change = price - last
-                    pct_change = (calculated_change / last) * 100
-                    fields["calculated_change"] = str(calculated_change)
-                    fields["calculated_pct_change"] = str(round(pct_change, 4))
-                
-                # XADD with approximate trimming for efficiency
-                self.r.xadd(
+            if quote[0] != last:
+                changes.append((ticker, quote, self._build_fields(ticker, *quote, last, tick_ts)))
+        return changes
+
+    def _commit_flushed(self, due: List[Tuple[str, Quote]], ts: float) -> None:
+        """
+        Tell the coalescer which trailing-flush values are now published.
+
+        A value counts once it is the last published price, whether written
+        this tick or earlier; the rest (e.g. on a failed shard) stay pending.
+        """
+        assert self.coalescer is not None
+        self.coalescer.commit([(t, q) for t, q in due if q[0] == self.last_prices.get(t)], ts)
+
+    def _write(self, changes: List[Change], ts: float) -> List[Change]:
+        """
+        Write a batch of changes to the stream.
+
+        Returns:
+            List[Change]: The changes that were actually written; rejected
+            duplicates are left out.
+        """
+        if self.shards is not None:
+            return self._write_sharded(changes)
+        if self.idempotent:
+            written = self._publish_idempotent(changes)
+            if self.movers_index and written:
+                pipe = self.r.pipeline(transaction=False)
+                movers.stage_updates(pipe, [fields for _, _, fields in written], ts)
+                pipe.execute()
+            return written
+        if self.movers_index:
+            if not changes:
+                return []
+            # One round trip for the stream entries and their index updates
+            pipe = self.r.pipeline(transaction=False)
+            for _, _, fields in changes:
+                pipe.xadd(
                     config.STREAM_NAME,
                     fields=fields,  # type: ignore[arg-type]
-                    maxlen=config.STREAM_MAXLEN,
+                    maxlen=self._maxlen(),
                     approximate=True
                 )
-                self.last_prices[ticker] = price
-                
-                change_info = f" (change: {price_change:+.2f})" if price_change is not None else ""
-                logger.debug(f"Published update: {ticker} -> {price}{change_info}")
-        # Optionally trim by time-based logic using XTRIM
-        # e.g., remove entries older than an hour (commented out for simplicity)
-        # self._trim_by_age()
+            movers.stage_updates(pipe, [fields for _, _, fields in changes], ts)
+            pipe.execute()
+            for ticker, quote, _ in changes:
+                self._mark_published(ticker, quote)
+            return changes
+        for ticker, quote, fields in changes:
+            # XADD with approximate trimming for efficiency
+            self.r.xadd(
+                config.STREAM_NAME,
+                fields=fields,  # type: ignore[arg-type]
+                maxlen=self._maxlen(),
+                approximate=True
+            )
+            self._mark_published(ticker, quote)
+        return changes
+
+    def _write_sharded(self, changes: List[Change]) -> List[Change]:
+        """
+        Write each change to its ticker's stream and snapshot key on the
+        owning node, one pipeline per node in parallel. Changes on a node
+        that failed are neither marked published nor returned; they go out
+        on the next tick.
+
+        Returns:
+            List[Change]: The changes whose node pipeline succeeded.
+        """
+        assert self.shards is not None
+        if not changes:
+            return []
+
+        def stage(pipe, indexes: List[int]) -> None:
+            for i in indexes:
+                ticker, _, fields = changes[i]
+                pipe.xadd(
+                    stream_key(ticker),
+                    fields=fields,  # type: ignore[arg-type]
+                    maxlen=config.SHARD_STREAM_MAXLEN,
+                    approximate=True
+                )
+                pipe.set(snapshot_key(ticker), json.dumps(fields))
+
+        groups = self.shards.group([ticker for ticker, _, _ in changes])
+        landed: List[int] = []
+        for node, error in self.shards.execute(groups, stage).items():
+            if error is None:
+                landed.extend(groups[node])
+        written = [changes[i] for i in sorted(landed)]
+        for ticker, quote, _ in written:
+            self._mark_published(ticker, quote)
+        return written
+
+    def _build_fields(
+        self,
+        ticker: str,
+        price: float,
+        price_change: Optional[float],
+        last: Optional[float],
+        ts: int,
+    ) -> Dict[str, str]:
+        """Build the stream entry fields for a single price change."""
+        fields = quote_fields(ticker, price, price_change, ts)
+
+        # Calculate percentage change if we have previous price
+        if last is not None and last != 0:
+            calculated_change = price - last
+            pct_change = (calculated_change / last) * 100
+            fields["calculated_change"] = str(calculated_change)
+            fields["calculated_pct_change"] = str(round(pct_change, 4))
+        return fields
+
+    def _mark_published(self, ticker: str, quote: Quote) -> None:
+        price, price_change = quote
+        self.last_prices[ticker] = price
+        self.published += 1
+        change_info = f" (change: {price_change:+.2f})" if price_change is not None else ""
+        logger.debug(f"Published update: {ticker} -> {price}{change_info}")
+
+    def _publish_idempotent(self, changes: List[Change]) -> List[Change]:
+        """
+        Write each change under the next number of its ticker's sequence.
+
+        Sequences only advance for accepted changes, so a batch replayed
+        after a connection error carries the same numbers and Redis refuses
+        whatever an earlier attempt already wrote. A change refused because
+        its number was taken by a different price (another writer got there
+        first) is not a duplicate: the stored state is adopted and the price
+        goes out again on the next tick.
+
+        Returns:
+            List[Change]: The changes written by this call.
+        """
+        assert self.sequencer is not None
+        batch: List[Sequenced] = []
+        for ticker, quote, fields in changes:
+            seq = self._seq.get(ticker, 0) + 1
+            fields["seq"] = str(seq)
+            batch.append((ticker, seq, str(quote[0]), fields))
+
+        for attempt in range(self.publish_retries + 1):
+            try:
+                results = self.sequencer.publish(batch, self._maxlen())
+                break
+            except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as e:
+                if attempt >= self.publish_retries:
+                    raise
+                logger.warning(f"Publish attempt {attempt + 1} failed, replaying batch: {e}")
+
+        written: List[Change] = []
+        for change, (ticker, seq, _, _), stored in zip(changes, batch, results):
+            quote = change[1]
+            if stored is None or (attempt > 0 and stored == (seq, quote[0])):
+                # Written now, or by an earlier attempt whose reply was lost
+                if stored is not None:
+                    self.duplicates_rejected += 1
+                self._seq[ticker] = seq
+                self._mark_published(ticker, quote)
+                written.append(change)
+                continue
+            self._seq[ticker], self.last_prices[ticker] = stored
+            if stored[1] == quote[0]:
+                self.duplicates_rejected += 1
+                logger.debug(f"Duplicate update rejected: {ticker} #{seq}")
+            else:
+                logger.warning(
+                    f"{ticker} sequence {stored[0]} already holds price {stored[1]}, not {quote[0]}; "
+                    "resyncing and republishing next tick"
+                )
+        return written
 
     def _trim_by_age(self, min_age_sec: int = 3600) -> None:
         """
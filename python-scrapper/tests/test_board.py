@@ -0,0 +1,86 @@
+"""Tests for board module"""
+
+import pickle
+import pytest
+from board import Board, SymbolTable, HAS_CHANGE, HAS_VOLUME
+
+
+@pytest.fixture
+def board():
+    board = Board()
+    board.add("ABSA", 19.80, 0.05, 426200, "Absa Bank Kenya Plc")
+    board.add("BAT", 377.50, -1.25, 45200, "British American Tobacco Kenya")
+    board.add("NOKCHANGE", 100.00, None, None, "No Change Stock")
+    return board
+
+
+class TestBoard:
+    """Test cases for the columnar board"""
+
+    def test_mapping_view_matches_dict(self, board, sample_ticker_data):
+        """Test the board compares and indexes like the old dict of tuples"""
+        assert board == sample_ticker_data
+        assert board["NOKCHANGE"] == (100.00, None)
+        assert list(board) == ["ABSA", "BAT", "NOKCHANGE"]
+        assert dict(board.items()) == sample_ticker_data
+        assert "BAT" in board
+        assert "XYZ" not in board
+        assert board.get("XYZ") is None
+
+    def test_empty_board_equals_empty_dict(self):
+        """Test an empty board is falsy and equal to {}"""
+        assert Board() == {}
+        assert not Board()
+
+    def test_columns_and_mask(self, board):
+        """Test numeric columns and the validity mask"""
+        assert list(board.price) == [19.80, 377.50, 100.00]
+        assert board.flags[0] == HAS_CHANGE | HAS_VOLUME
+        assert board.flags[2] == 0
+        assert board.volume_of("BAT") == 45200
+        assert board.volume_of("NOKCHANGE") is None
+        assert board.name_of("ABSA") == "Absa Bank Kenya Plc"
+
+    def test_duplicate_symbol_overwrites(self, board):
+        """Test re-adding a symbol replaces its row, like dict assignment"""
+        board.add("ABSA", 20.00, None)
+
+        assert len(board) == 3
+        assert board["ABSA"] == (20.00, None)
+        assert board.volume_of("ABSA") is None
+
+    def test_pickle_round_trip(self, board):
+        """Test boards survive pickling (used by parse workers)"""
+        clone = pickle.loads(pickle.dumps(board))
+
+        assert clone == board
+        assert clone.volume_of("ABSA") == 426200
+
+    def test_from_mapping(self, sample_ticker_data):
+        """Test dicts convert and boards pass through unchanged"""
+        board = Board.from_mapping(sample_ticker_data)
+
+        assert board == sample_ticker_data
+        assert Board.from_mapping(board) is board
+
+    def test_shared_symbol_table_gives_stable_ids(self):
+        """Test a ticker keeps its id across boards sharing a table"""
+        table = SymbolTable()
+        first, second = Board(table), Board(table)
+        first.add("ABSA", 19.80)
+        first.add("BAT", 377.50)
+        second.add("BAT", 378.00)
+        second.add("ABSA", 19.85)
+
+        assert list(first.ids) == [0, 1]
+        assert list(second.ids) == [1, 0]
+        assert len(table) == 2
+
+    def test_numpy_views(self, board):
+        """Test zero-copy NumPy views when numpy is installed"""
+        np = pytest.importorskip("numpy")
+
+        cols = board.numpy()
+
+        assert cols["price"].dtype == np.float64
+        assert cols["volume"][1] == 45200
@@ -0,0 +1,104 @@
+"""Tests for coalescer module"""
+
+from unittest.mock import patch
+from coalescer import Coalescer
+
+
+class TestCoalescer:
+    """Test cases for the per-ticker coalescing policy"""
+
+    def test_first_value_always_admitted(self):
+        """Test a ticker with no published price is published immediately"""
+        coalescer = Coalescer(min_interval=30)
+
+        assert coalescer.admit("ABSA", (19.80, 0.05), None, now=0) is True
+        assert coalescer.suppressed == 0
+
+    def test_min_interval_suppresses_fast_changes(self):
+        """Test changes inside the minimum interval are held as pending"""
+        coalescer = Coalescer(min_interval=30)
+        coalescer.admit("ABSA", (19.80, 0.05), None, now=0)
+
+        assert coalescer.admit("ABSA", (19.85, 0.10), 19.80, now=10) is False
+        assert coalescer.admit("ABSA", (19.90, 0.15), 19.80, now=31) is True
+        assert coalescer.suppressed == 1
+        assert coalescer.pending == 0
+
+    def test_abs_and_pct_thresholds(self):
+        """Test small moves are suppressed by either threshold"""
+        coalescer = Coalescer(min_abs_change=0.10, min_pct_change=1.0)
+        coalescer.admit("BAT", (377.50, -1.25), None, now=0)
+
+        # 0.50 clears the absolute threshold but is only ~0.13%
+        assert coalescer.admit("BAT", (378.00, -0.75), 377.50, now=10) is False
+        # 4.00 is just over 1%
+        assert coalescer.admit("BAT", (381.50, 2.75), 377.50, now=20) is True
+
+    def test_trailing_flush_publishes_final_value(self):
+        """Test a pending value is flushed once it has waited long enough"""
+        coalescer = Coalescer(min_interval=30, flush_after=45)
+        coalescer.admit("ABSA", (19.80, 0.05), None, now=0)
+        coalescer.admit("ABSA", (19.85, 0.10), 19.80, now=10)
+        coalescer.admit("ABSA", (19.90, 0.15), 19.80, now=20)
+
+        assert coalescer.due(now=50) == []
+        assert coalescer.due(now=55) == [("ABSA", (19.90, 0.15))]
+        coalescer.commit([("ABSA", (19.90, 0.15))], now=55)
+        assert coalescer.flushed == 1
+        assert coalescer.pending == 0
+
+    def test_uncommitted_flush_stays_pending(self):
+        """Test a due value that was not written is offered again"""
+        coalescer = Coalescer(min_interval=30, flush_after=0)
+        coalescer.admit("ABSA", (19.80, 0.05), None, now=0)
+        coalescer.admit("ABSA", (19.85, 0.10), 19.80, now=10)
+        coalescer.admit("BAT", (377.50, -1.25), None, now=0)
+        coalescer.admit("BAT", (378.00, -0.75), 377.50, now=10)
+
+        due = coalescer.due(now=40)
+        coalescer.commit([("BAT", (378.00, -0.75))], now=40)
+
+        assert due == [("ABSA", (19.85, 0.10)), ("BAT", (378.00, -0.75))]
+        assert coalescer.flushed == 1
+        assert coalescer.due(now=41) == [("ABSA", (19.85, 0.10))]
+
+    def test_flip_back_drops_pending(self):
+        """Test returning to the published price cancels the pending value"""
+        coalescer = Coalescer(min_interval=30, flush_after=0)
+        coalescer.admit("ABSA", (19.80, 0.05), None, now=0)
+        coalescer.admit("ABSA", (19.85, 0.10), 19.80, now=10)
+        coalescer.discard("ABSA")
+
+        assert coalescer.due(now=100) == []
+
+    def test_forced_flush(self):
+        """Test force flushes everything regardless of timing"""
+        coalescer = Coalescer(min_interval=30)
+        coalescer.admit("ABSA", (19.80, 0.05), None, now=0)
+        coalescer.admit("ABSA", (19.85, 0.10), 19.80, now=1)
+
+        assert coalescer.due(now=2, force=True) == [("ABSA", (19.85, 0.10))]
+
+    @patch('coalescer.config')
+    def test_from_config_disabled(self, mock_config):
+        """Test no coalescer is built when every knob is zero"""
+        mock_config.COALESCE_MIN_INTERVAL = 0
+        mock_config.COALESCE_MIN_ABS_CHANGE = 0
+        mock_config.COALESCE_MIN_PCT_CHANGE = 0
+
+        assert Coalescer.from_config() is None
+
+    @patch('coalescer.config')
+    def test_from_config_enabled(self, mock_config):
+        """Test config values are passed through"""
+        mock_config.COALESCE_MIN_INTERVAL = 20
+        mock_config.COALESCE_MIN_ABS_CHANGE = 0
+        mock_config.COALESCE_MIN_PCT_CHANGE = 0.5
+        mock_config.COALESCE_FLUSH_AFTER = 90
+
+        coalescer = Coalescer.from_config()
+
+        assert coalescer is not None
+        assert coalescer.min_interval == 20
+        assert coalescer.min_pct_change == 0.5
+        assert coalescer.flush_after == 90
@@ -0,0 +1,144 @@
+"""Tests for fetch_policy module"""
+
+import random
+import threading
+import time
+import pytest
+from fetch_policy import CircuitBreaker, FetchPolicy, LatencyTracker, CLOSED, OPEN, HALF_OPEN
+
+
+class TestCircuitBreaker:
+    """Test cases for the circuit breaker"""
+
+    def test_opens_after_threshold(self):
+        """Test consecutive failures open the breaker"""
+        breaker = CircuitBreaker(threshold=3, reset_after=10)
+        for _ in range(2):
+            breaker.record_failure(0)
+        assert breaker.allow(0)
+
+        breaker.record_failure(0)
+        assert breaker.state == OPEN
+        assert not breaker.allow(5)
+        assert breaker.opens == 1
+
+    def test_success_resets_failure_count(self):
+        """Test a success in between keeps the breaker closed"""
+        breaker = CircuitBreaker(threshold=2)
+        breaker.record_failure(0)
+        breaker.record_success()
+        breaker.record_failure(0)
+        assert breaker.state == CLOSED
+
+    def test_half_open_probe(self):
+        """Test the breaker half-opens after the reset period and closes on success"""
+        breaker = CircuitBreaker(threshold=1, reset_after=10)
+        breaker.record_failure(0)
+        assert breaker.allow(10)
+        assert breaker.state == HALF_OPEN
+
+        breaker.record_success()
+        assert breaker.state == CLOSED
+
+    def test_failed_probe_reopens(self):
+        """Test a failed half-open probe re-opens for another period"""
+        breaker = CircuitBreaker(threshold=1, reset_after=10)
+        breaker.record_failure(0)
+        breaker.allow(10)
+        breaker.record_failure(10)
+        assert breaker.state == OPEN
+        assert not breaker.allow(15)
+        assert breaker.opens == 2
+
+    def test_zero_threshold_disables(self):
+        """Test threshold 0 never opens"""
+        breaker = CircuitBreaker(threshold=0)
+        for _ in range(100):
+            breaker.record_failure(0)
+        assert breaker.allow(0)
+
+
+class TestFetchPolicy:
+    """Test cases for hedging and backoff"""
+
+    def test_percentile(self):
+        """Test latency percentiles over the window"""
+        tracker = LatencyTracker(window=100)
+        for ms in range(1, 101):
+            tracker.record(ms / 1000)
+        assert tracker.percentile(50) == pytest.approx(0.051)
+        assert tracker.percentile(95) == pytest.approx(0.096)
+
+    def test_no_hedging_until_warmed_up(self):
+        """Test no hedge delay before enough samples are recorded"""
+        policy = FetchPolicy(hedge_min_samples=5)
+        for _ in range(4):
+            policy.latency.record(0.1)
+        assert policy.hedge_delay() is None
+        policy.latency.record(0.1)
+        assert policy.hedge_delay() == pytest.approx(0.1)
+
+    def test_backoff_is_jittered_within_bounds(self):
+        """Test backoff delays fall between half and all of the exponential delay"""
+        policy = FetchPolicy(rng=random.Random(1))
+        delays = [policy.backoff_delay(2.0, 2) for _ in range(50)]
+        assert all(2.0 <= d <= 4.0 for d in delays)
+        assert len(set(delays)) > 1
+
+    def test_slow_request_is_hedged(self):
+        """Test a request past the hedge delay is raced by a second copy"""
+        policy = FetchPolicy(hedge_percentile=50, hedge_min_samples=1)
+        policy.latency.record(0.01)
+        release = threading.Event()
+        calls = []
+
+        def request(timeout):
+            calls.append(timeout)
+            if len(calls) == 1:
+                # The primary stalls until the test ends
+                release.wait(5)
+                return "primary"
+            return "hedge"
+
+        try:
+            assert policy.send(request, timeout=5.0) == "hedge"
+        finally:
+            release.set()
+            policy.close()
+        assert len(calls) == 2
+        assert policy.stats()["hedges_sent"] == 1
+        assert policy.stats()["hedge_win_rate"] == 1.0
+
+    def test_fast_request_is_not_hedged(self):
+        """Test a request finishing before the hedge delay runs once"""
+        policy = FetchPolicy(hedge_percentile=50, hedge_min_samples=1)
+        policy.latency.record(1.0)
+        calls = []
+
+        def request(timeout):
+            calls.append(timeout)
+            return "ok"
+
+        try:
+            assert policy.send(request, timeout=5.0) == "ok"
+        finally:
+            policy.close()
+        assert len(calls) == 1
+        assert policy.hedges_sent == 0
+
+    def test_all_copies_failing_raises(self):
+        """Test the error propagates when primary and hedge both fail"""
+        policy = FetchPolicy(hedge_percentile=50, hedge_min_samples=1)
+        policy.latency.record(0.01)
+
+        def request(timeout):
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        try:
+            with pytest.raises(ValueError):
+                policy.send(request, timeout=5.0)
+        finally:
+            policy.close()
+        assert policy.hedges_sent == 1
+        assert policy.hedge_wins == 0
@@ -3,7 +3,33 @@
 import pytest
 from unittest.mock import patch, Mock
 import requests
-from fetcher import fetch_html
+import fetcher
+from fetch_policy import FetchPolicy, OPEN
+from fetcher import fetch_html, fetch_page, declared_encoding, Page
+
+
+def fetch_retrying(fetch, url, **kwargs):
+    """Run a fetch, performing each retry it schedules straight away"""
+    scheduled = []
+
+    def retry(delay, attempt):
+        scheduled.append((delay, attempt))
+
+    result = fetch(url, retry=retry, **kwargs)
+    while scheduled:
+        _, attempt = scheduled.pop()
+        result = fetch(url, attempt=attempt, retry=retry, **kwargs)
+    return result
+
+
+@pytest.fixture(autouse=True)
+def reset_policy():
+    """Give each test a fresh breaker and latency history"""
+    fetcher._policy = None
+    fetcher._session = None
+    yield
+    fetcher._policy = None
+    fetcher._session = None
 
 
 class TestFetchHTML:
@@ -30,8 +56,7 @@ class TestFetchHTML:
         # Setup mock to raise HTTP error
         mock_session.return_value.get.side_effect = requests.exceptions.HTTPError("404 Not Found")
         
-        with patch('fetcher.time.sleep'):  # Mock sleep to speed up test
-            result = fetch_html("https://example.com", retries=2)
+        result = fetch_retrying(fetch_html, "https://example.com", retries=2)
         
         assert result is None
         assert mock_session.return_value.get.call_count == 2
@@ -42,8 +67,7 @@ class TestFetchHTML:
         # Setup mock to raise connection error
         mock_session.return_value.get.side_effect = requests.exceptions.ConnectionError("Connection failed")
         
-        with patch('fetcher.time.sleep'):  # Mock sleep to speed up test
-            result = fetch_html("https://example.com", retries=3)
+        result = fetch_retrying(fetch_html, "https://example.com", retries=3)
         
         assert result is None
         assert mock_session.return_value.get.call_count == 3
@@ -54,8 +78,7 @@ class TestFetchHTML:
         # Setup mock to raise timeout error
         mock_session.return_value.get.side_effect = requests.exceptions.Timeout("Request timed out")
         
-        with patch('fetcher.time.sleep'):
-            result = fetch_html("https://example.com", timeout=5.0, retries=1)
+        result = fetch_html("https://example.com", timeout=5.0, retries=1)
         
         assert result is None
 
@@ -71,8 +94,7 @@ class TestFetchHTML:
             mock_response
         ]
         
-        with patch('fetcher.time.sleep'):
-            result = fetch_html("https://example.com", retries=2)
+        result = fetch_retrying(fetch_html, "https://example.com", retries=2)
         
         assert result == "<html>Success after retry</html>"
         assert mock_session.return_value.get.call_count == 2
@@ -114,9 +136,177 @@ class TestFetchHTML:
         """Test that failures are properly logged"""
         mock_session.return_value.get.side_effect = requests.exceptions.ConnectionError("Connection failed")
         
-        with patch('fetcher.time.sleep'):
-            result = fetch_html("https://example.com", retries=1)
+        result = fetch_html("https://example.com", retries=1)
         
         assert result is None
         mock_logger.warning.assert_called()
         mock_logger.error.assert_called()
+
+
+class TestFetchPage:
+    """Test cases for the raw-bytes page fetcher"""
+
+    @patch('fetcher.requests.Session')
+    def test_returns_raw_bytes_and_declared_charset(self, mock_session):
+        """Test the body is returned undecoded with the header charset"""
+        mock_response = Mock()
+        mock_response.content = b"<html>Caf\xc3\xa9</html>"
+        mock_response.headers = {"Content-Type": "text/html; charset=UTF-8"}
+        mock_session.return_value.get.return_value = mock_response
+
+        page = fetch_page("https://example.com")
+
+        assert page == Page(b"<html>Caf\xc3\xa9</html>", "UTF-8")
+
+    @patch('fetcher.requests.Session')
+    def test_missing_charset_is_not_guessed(self, mock_session):
+        """Test no encoding is invented when the header has none"""
+        mock_response = Mock()
+        mock_response.content = b"<html></html>"
+        mock_response.headers = {"Content-Type": "text/html"}
+        mock_session.return_value.get.return_value = mock_response
+
+        page = fetch_page("https://example.com")
+
+        assert page is not None
+        assert page.encoding is None
+
+    @patch('fetcher.requests.Session')
+    def test_failure_returns_none(self, mock_session):
+        """Test exhausted retries return None"""
+        mock_session.return_value.get.side_effect = requests.exceptions.ConnectionError("Connection failed")
+
+        page = fetch_retrying(fetch_page, "https://example.com", retries=2)
+
+        assert page is None
+
+    @pytest.mark.parametrize("content_type,expected", [
+        (None, None),
+        ("text/html", None),
+        ("text/html; charset=utf-8", "utf-8"),
+        ('text/html; Charset="windows-1252"', "windows-1252"),
+        ("text/html; boundary=x; charset=iso-8859-1", "iso-8859-1"),
+    ])
+    def test_declared_encoding(self, content_type, expected):
+        """Test charset extraction from Content-Type"""
+        assert declared_encoding(content_type) == expected
+
+
+class TestFetchPolicyIntegration:
+    """Test cases for breaker and deadline handling in the fetcher"""
+
+    @patch('fetcher.requests.Session')
+    def test_open_breaker_skips_fetch(self, mock_session):
+        """Test repeated failures open the breaker and later ticks skip the network"""
+        fetcher._policy = FetchPolicy(breaker_threshold=2, breaker_reset=60)
+        mock_session.return_value.get.side_effect = requests.exceptions.ConnectionError("down")
+
+        assert fetch_retrying(fetch_page, "https://example.com", retries=3) is None
+
+        # The breaker opened after the second attempt, so the third never ran
+        assert mock_session.return_value.get.call_count == 2
+        assert fetcher._policy.breaker.state == OPEN
+
+        assert fetch_page("https://example.com") is None
+        assert mock_session.return_value.get.call_count == 2
+        assert fetcher.fetch_stats()["breaker_state"] == 1
+
+    @patch('fetcher.requests.Session')
+    def test_backoff_past_deadline_is_not_scheduled(self, mock_session):
+        """Test a retry that would overrun the deadline is left to the next tick"""
+        mock_session.return_value.get.side_effect = requests.exceptions.ConnectionError("down")
+        retry = Mock()
+
+        result = fetch_page("https://example.com", retries=3, backoff=10.0,
+                            deadline=fetcher.time.monotonic() + 1.0, retry=retry)
+
+        assert result is None
+        assert mock_session.return_value.get.call_count == 1
+        retry.assert_not_called()
+
+    @patch('fetcher.requests.Session')
+    def test_retry_is_handed_to_caller(self, mock_session):
+        """Test a failed attempt asks for a later retry instead of sleeping"""
+        mock_session.return_value.get.side_effect = requests.exceptions.ConnectionError("down")
+        fetcher._policy = FetchPolicy(rng=Mock(uniform=Mock(return_value=1.5)))
+        retry = Mock()
+
+        with patch('fetcher.time.sleep') as mock_sleep:
+            assert fetch_page("https://example.com", retries=3, retry=retry) is None
+            assert fetch_page("https://example.com", retries=3, attempt=3, retry=retry) is None
+
+        retry.assert_called_once_with(1.5, 2)
+        mock_sleep.assert_not_called()
+
+    @patch('fetcher.requests.Session')
+    def test_retries_in_place_without_callback(self, mock_session):
+        """Test a fetch without a retry callback runs its attempts and sleeps the backoff"""
+        mock_session.return_value.get.side_effect = requests.exceptions.ConnectionError("down")
+        fetcher._policy = FetchPolicy(rng=Mock(uniform=Mock(return_value=1.5)))
+
+        with patch('fetcher.time.sleep') as mock_sleep:
+            assert fetch_html("https://example.com", retries=3) is None
+
+        assert mock_session.return_value.get.call_count == 3
+        assert mock_sleep.call_count == 2
+        mock_sleep.assert_called_with(1.5)
+
+    @patch('fetcher.requests.Session')
+    def test_in_place_retry_respects_deadline(self, mock_session):
+        """Test in-place retries stop when the backoff would overrun the deadline"""
+        mock_session.return_value.get.side_effect = requests.exceptions.ConnectionError("down")
+
+        with patch('fetcher.time.sleep') as mock_sleep:
+            result = fetch_page("https://example.com", retries=3, backoff=10.0,
+                                deadline=fetcher.time.monotonic() + 1.0)
+
+        assert result is None
+        assert mock_session.return_value.get.call_count == 1
+        mock_sleep.assert_not_called()
+
+
+class TestSessionWarmUp:
+    """Test cases for the shared session and its warm-up"""
+
+    @patch('fetcher.requests.Session')
+    def test_session_reused_across_fetches(self, mock_session):
+        """Test consecutive fetches share one keep-alive session"""
+        mock_response = Mock()
+        mock_response.text = "<html></html>"
+        mock_session.return_value.get.return_value = mock_response
+
+        fetch_html("https://example.com")
+        fetch_html("https://example.com")
+
+        mock_session.assert_called_once()
+        assert mock_session.return_value.get.call_count == 2
+
+    @patch('fetcher.requests.Session')
+    def test_warm_up_opens_connection(self, mock_session):
+        """Test warm-up sends a HEAD through the shared session"""
+        assert fetcher.warm_up("https://example.com") is True
+
+        mock_session.return_value.head.assert_called_once_with(
+            "https://example.com", timeout=5.0, allow_redirects=True
+        )
+        assert fetcher.get_session() is mock_session.return_value
+
+    @patch('fetcher.requests.Session')
+    def test_close_releases_session_and_policy(self, mock_session):
+        """Test close shuts the hedge threads and session, and later use recreates them"""
+        policy = fetcher.get_policy()
+        fetcher.get_session()
+
+        with patch.object(policy, 'close') as mock_policy_close:
+            fetcher.close()
+
+        mock_policy_close.assert_called_once()
+        mock_session.return_value.close.assert_called_once()
+        assert fetcher.get_policy() is not policy
+
+    @patch('fetcher.requests.Session')
+    def test_warm_up_failure_is_not_fatal(self, mock_session):
+        """Test an unreachable upstream makes warm-up return False"""
+        mock_session.return_value.head.side_effect = requests.exceptions.ConnectionError("refused")
+
+        assert fetcher.warm_up("https://example.com") is False
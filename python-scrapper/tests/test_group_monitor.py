@@ -0,0 +1,112 @@
+"""Tests for group_monitor module"""
+
+import pytest
+from unittest.mock import Mock
+from group_monitor import GroupMonitor
+
+
+def xinfo(*groups):
+    """Build an XINFO GROUPS reply as redis-py returns it"""
+    return [
+        {"name": name.encode(), "consumers": 1, "pending": pending, "lag": lag}
+        for name, lag, pending in groups
+    ]
+
+
+def stream_client(ids):
+    """A mock client whose XRANGE serves the given entry IDs in order"""
+    def xrange(stream, min="-", max="+", count=None):
+        key = lambda entry_id: tuple(int(part) for part in entry_id.split("-"))
+        entries = [(i, {}) for i in ids if min == "-" or key(i.decode()) >= key(min)]
+        return entries[:count] if count else entries
+
+    r = Mock()
+    r.xrange.side_effect = xrange
+    return r
+
+
+class TestGroupMonitor:
+    """Test cases for consumer-group backlog sampling"""
+
+    def test_sample_records_lag_and_pending(self):
+        """Test per-group lag and pending are recorded by name"""
+        r = Mock()
+        r.xinfo_groups.return_value = xinfo(("java-api", 120, 30), ("audit", 40, 5))
+        monitor = GroupMonitor()
+
+        monitor.sample(r, "nse:realtime", now=0)
+
+        r.xinfo_groups.assert_called_once_with("nse:realtime")
+        r.xrange.assert_not_called()
+        assert monitor.lag == {"java-api": 120, "audit": 40}
+        assert monitor.pending == {"java-api": 30, "audit": 5}
+        assert monitor.backlog() == 150
+        assert monitor.stats()["group_lag:java-api"] == 120
+
+    def test_unknown_lag_counts_undelivered_entries(self):
+        """Test a group without a lag figure is counted from its last delivered ID"""
+        ids = [f"{i}-0".encode() for i in range(1, 1001)]
+        r = stream_client(ids)
+        r.xinfo_groups.return_value = [
+            {"name": b"java-api", "pending": 0, "lag": 10, "last-delivered-id": b"990-0"},
+            {"name": b"audit", "pending": 5, "lag": None, "last-delivered-id": b"900-0"},
+            {"name": b"ops", "pending": 0, "lag": None, "last-delivered-id": b"0-0"},
+        ]
+        monitor = GroupMonitor(threshold=0.8)
+
+        monitor.sample(r, "nse:realtime", now=0, maxlen=1000)
+
+        # ops has read nothing: counted up to the 800-entry pressure level only
+        assert monitor.lag == {"java-api": 10, "audit": 100, "ops": 800}
+        r.xrange.assert_any_call("nse:realtime", min="0-0", max="+", count=801)
+        assert monitor.update_pressure(1000) is True
+
+    def test_unknown_lag_releases_when_caught_up(self):
+        """Test pressure from an unknown-lag group releases once it has read the stream"""
+        ids = [f"{i}-0".encode() for i in range(1, 1051)]
+        r = stream_client(ids)
+        monitor = GroupMonitor(threshold=0.8)
+
+        r.xinfo_groups.return_value = [{"name": b"audit", "pending": 0, "lag": None, "last-delivered-id": b"100-0"}]
+        monitor.sample(r, "nse:realtime", now=0, maxlen=1000)
+        assert monitor.update_pressure(1000) is True
+
+        # The stream stays at MAXLEN or above, but the group is now 20 behind
+        r.xinfo_groups.return_value = [{"name": b"audit", "pending": 0, "lag": None, "last-delivered-id": b"1030-0"}]
+        monitor.sample(r, "nse:realtime", now=30, maxlen=1000)
+        assert monitor.lag == {"audit": 20}
+        assert monitor.update_pressure(1000) is False
+
+    def test_due_respects_interval(self):
+        """Test sampling only happens on the configured cadence"""
+        r = Mock()
+        r.xinfo_groups.return_value = []
+        monitor = GroupMonitor(interval=30)
+
+        assert monitor.due(0)
+        monitor.sample(r, "nse:realtime", now=0)
+        assert not monitor.due(29)
+        assert monitor.due(30)
+
+    def test_pressure_hysteresis(self):
+        """Test pressure engages at the threshold and clears below half of it"""
+        r = Mock()
+        monitor = GroupMonitor(threshold=0.8)
+
+        r.xinfo_groups.return_value = xinfo(("java-api", 800, 0))
+        monitor.sample(r, "s", now=0)
+        assert monitor.update_pressure(1000) is True
+
+        r.xinfo_groups.return_value = xinfo(("java-api", 500, 0))
+        monitor.sample(r, "s", now=30)
+        assert monitor.update_pressure(1000) is None
+        assert monitor.under_pressure
+
+        r.xinfo_groups.return_value = xinfo(("java-api", 399, 0))
+        monitor.sample(r, "s", now=60)
+        assert monitor.update_pressure(1000) is False
+
+    def test_unknown_action_rejected(self):
+        """Test misspelled actions fail fast"""
+        with pytest.raises(ValueError):
+            GroupMonitor(actions=["raise-maxlen"])
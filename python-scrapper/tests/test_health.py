@@ -0,0 +1,90 @@
+"""Tests for health module"""
+
+import json
+import socket
+import urllib.request
+import urllib.error
+from unittest.mock import patch, Mock
+from health import Readiness
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(port, path):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestReadiness:
+    """Test cases for the Readiness class"""
+
+    def test_from_config_disabled(self):
+        """Test no readiness reporting when neither port nor file is set"""
+        with patch('health.config') as mock_config:
+            mock_config.HEALTH_PORT = 0
+            mock_config.READY_FILE = ""
+            assert Readiness.from_config() is None
+
+    def test_from_config_file_only(self):
+        """Test a ready file alone enables readiness reporting"""
+        with patch('health.config') as mock_config:
+            mock_config.HEALTH_PORT = 0
+            mock_config.READY_FILE = "/tmp/ready"
+            readiness = Readiness.from_config()
+
+        assert readiness.port == 0
+        assert readiness.ready_file == "/tmp/ready"
+
+    def test_ready_file_lifecycle(self, tmp_path):
+        """Test the file appears on readiness and is removed on close"""
+        path = tmp_path / "ready"
+        path.write_text("stale")
+        readiness = Readiness(ready_file=str(path))
+
+        readiness.start()
+        assert not path.exists()
+
+        readiness.mark_ready()
+        assert json.loads(path.read_text())["ready_at"] == readiness.ready_at
+        assert not (tmp_path / "ready.tmp").exists()
+
+        readiness.close()
+        assert not path.exists()
+
+    def test_endpoints(self):
+        """Test /readyz flips from 503 to 200 while /healthz is always 200"""
+        port = _free_port()
+        readiness = Readiness(port=port, details=lambda: {"published": 3})
+        readiness.start()
+        try:
+            assert _get(port, "/healthz") == (200, {"status": "ok"})
+            code, body = _get(port, "/readyz")
+            assert code == 503 and body["ready"] is False
+
+            readiness.mark_ready()
+            code, body = _get(port, "/readyz")
+            assert code == 200
+            assert body["ready"] is True and body["published"] == 3
+
+            assert _get(port, "/nope")[0] == 404
+        finally:
+            readiness.close()
+        assert readiness._server is None
+
+    def test_details_error_reported(self):
+        """Test a failing details callable does not break the status"""
+        readiness = Readiness(details=Mock(side_effect=RuntimeError("boom")))
+        readiness.mark_ready()
+
+        status = readiness.status()
+
+        assert status["ready"] is True
+        assert "boom" in status["details_error"]
+
@@ -0,0 +1,121 @@
+"""Tests for indicators module"""
+
+import math
+import statistics
+import pytest
+from unittest.mock import patch
+from board import Board, SymbolTable
+from indicators import IndicatorStage, parse_specs
+
+
+def feed(stage, prices, ticker="ABSA"):
+    """Run a price series through a stage and return each tick's values for the ticker"""
+    return [stage.update({ticker: (price, None)}).get(ticker, {}) for price in prices]
+
+
+class TestParseSpecs:
+    """Test cases for indicator configuration"""
+
+    def test_parses_list(self):
+        """Test a comma-separated list of kind:window pairs"""
+        assert parse_specs("sma:20, EMA:12,vol:5,,vwap:50") == [
+            ("sma", 20), ("ema", 12), ("vol", 5), ("vwap", 50)
+        ]
+
+    def test_empty_is_disabled(self):
+        """Test an empty setting yields no indicators"""
+        assert parse_specs("") == []
+
+    @pytest.mark.parametrize("value", ["macd:10", "sma", "sma:0", "sma:x"])
+    def test_rejects_bad_specs(self, value):
+        """Test unknown kinds and bad windows are rejected"""
+        with pytest.raises(ValueError):
+            parse_specs(value)
+
+
+class TestIndicatorStage:
+    """Test cases for incremental indicator updates"""
+
+    def test_sma_matches_recomputation(self):
+        """Test the rolling SMA equals the mean of the last window prices"""
+        prices = [10, 11, 12, 13, 12, 15, 14, 13, 16, 17]
+        results = feed(IndicatorStage([("sma", 4)]), prices)
+
+        assert "sma_4" not in results[2]
+        for i in range(3, len(prices)):
+            assert float(results[i]["sma_4"]) == pytest.approx(statistics.mean(prices[i - 3:i + 1]))
+
+    def test_ema(self):
+        """Test the EMA is seeded with the first price and smoothed after"""
+        results = feed(IndicatorStage([("ema", 3)]), [10.0, 12.0, 12.0])
+        assert [r["ema_3"] for r in results] == ["10.0", "11.0", "11.5"]
+
+    def test_volatility_matches_recomputation(self):
+        """Test rolling volatility equals the stdev of the last window log returns"""
+        prices = [100, 101, 99, 102, 103, 101, 100, 104]
+        results = feed(IndicatorStage([("vol", 3)]), prices)
+        returns = [math.log(b / a) for a, b in zip(prices, prices[1:])]
+
+        assert "vol_3" not in results[2]
+        for i in range(3, len(prices)):
+            expected = statistics.stdev(returns[i - 3:i])
+            assert float(results[i]["vol_3"]) == pytest.approx(expected, abs=1e-6)
+
+    def test_vwap_uses_volume_deltas(self):
+        """Test VWAP weights prices by volume traded since the previous tick"""
+        stage = IndicatorStage([("vwap", 2)])
+        ticks = [(10.0, 100), (11.0, 200), (12.0, 500), (13.0, 500)]
+        results = []
+        for price, volume in ticks:
+            board = Board()
+            board.add("ABSA", price, None, volume)
+            results.append(stage.update(board).get("ABSA", {}))
+
+        assert results[0] == {}  # no previous volume yet
+        assert float(results[1]["vwap_2"]) == pytest.approx(11.0)
+        # (11 * 100 + 12 * 300) / 400
+        assert float(results[2]["vwap_2"]) == pytest.approx(11.75)
+        # No trades this tick: the window still holds the 300 at 12
+        assert float(results[3]["vwap_2"]) == pytest.approx(12.0)
+
+    def test_tickers_are_independent(self):
+        """Test each ticker keeps its own window"""
+        stage = IndicatorStage([("sma", 2)])
+        stage.update({"ABSA": (10.0, None), "BAT": (100.0, None)})
+        results = stage.update({"BAT": (200.0, None), "ABSA": (20.0, None), "KQ": (5.0, None)})
+
+        assert results["ABSA"]["sma_2"] == "15.0"
+        assert results["BAT"]["sma_2"] == "150.0"
+        assert "KQ" not in results
+
+    def test_uses_board_ids_from_shared_table(self):
+        """Test boards parsed with the stage's symbol table reuse its ids"""
+        table = SymbolTable()
+        stage = IndicatorStage([("sma", 2)], symbol_table=table)
+        assert stage.symbols is table
+        for price in (10.0, 20.0):
+            board = Board(table)
+            board.add("ABSA", price)
+            results = stage.update(board)
+        assert results["ABSA"]["sma_2"] == "15.0"
+        assert len(table) == 1
+
+    @patch('indicators.config')
+    def test_from_config_uses_given_table(self, mock_config):
+        """Test from_config hands the parser's symbol table to the stage"""
+        mock_config.INDICATORS = "sma:5"
+        mock_config.INDICATORS_STREAM = ""
+        mock_config.INDICATORS_MAXLEN = 1000
+        table = SymbolTable()
+
+        stage = IndicatorStage.from_config(symbol_table=table)
+
+        assert stage is not None
+        assert stage.symbols is table
+        assert stage.stream is None
+
+    def test_changed_filters_repeats(self):
+        """Test only values that differ from the last publish are reported"""
+        stage = IndicatorStage([("sma", 1)])
+        assert stage.changed(stage.update({"ABSA": (10.0, None)})) == {"ABSA": {"sma_1": "10.0"}}
+        assert stage.changed(stage.update({"ABSA": (10.0, None)})) == {}
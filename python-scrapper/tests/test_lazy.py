@@ -0,0 +1,40 @@
+"""Tests for lazy module"""
+
+import sys
+import pytest
+from lazy import lazy_import
+
+
+class TestLazyImport:
+    """Test cases for lazy_import"""
+
+    def test_module_loads_on_first_attribute(self, monkeypatch):
+        """Test the module body runs only when an attribute is touched"""
+        monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+
+        module = lazy_import("colorsys")
+        assert "colorsys" not in sys.modules
+
+        assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert "colorsys" in sys.modules
+
+    def test_already_imported_module_returned(self):
+        """Test a loaded module is handed back as is"""
+        import json
+        assert lazy_import("json") is json
+
+    def test_submodule_import_keeps_one_copy(self, monkeypatch):
+        """Test importing a submodule after lazy_import does not duplicate it"""
+        for name in ("email", "email.errors"):
+            monkeypatch.delitem(sys.modules, name, raising=False)
+
+        email = lazy_import("email")
+        from email.errors import MessageError
+
+        assert email.errors.MessageError is MessageError
+        assert sys.modules["email.errors"].MessageError is MessageError
+
+    def test_missing_module(self):
+        """Test a missing module fails at lazy_import time"""
+        with pytest.raises(ModuleNotFoundError):
+            lazy_import("no_such_module_here")
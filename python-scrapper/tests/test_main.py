@@ -2,19 +2,30 @@
 
 import pytest
 from unittest.mock import patch, Mock
+import main as main_module
+from fetcher import Page
+from parse_pool import ParseTimeout
 from main import job, main
 
 
+@pytest.fixture(autouse=True)
+def reset_streamer():
+    """Drop the cached streamer so each test builds its own"""
+    main_module._streamer = None
+    yield
+    main_module._streamer = None
+
+
 class TestJob:
     """Test cases for the main job function"""
 
     @patch('main.RedisStreamer')
     @patch('main.parse_nse')
-    @patch('main.fetch_html')
+    @patch('main.fetch_page')
     def test_successful_job_execution(self, mock_fetch, mock_parse, mock_streamer_class):
         """Test successful job execution"""
         # Setup mocks
-        mock_fetch.return_value = "<html>test</html>"
+        mock_fetch.return_value = Page(b"<html>test</html>", "utf-8")
         mock_parse.return_value = {"ABSA": (19.80, 0.05)}
         mock_streamer = Mock()
         mock_streamer_class.return_value = mock_streamer
@@ -24,12 +35,14 @@ class TestJob:
 
         # Verify calls
         mock_fetch.assert_called_once()
-        mock_parse.assert_called_once_with("<html>test</html>")
+        mock_parse.assert_called_once_with(
+            b"<html>test</html>", encoding="utf-8", symbol_table=main_module._symbols
+        )
         mock_streamer.publish_changes.assert_called_once_with({"ABSA": (19.80, 0.05)})
 
     @patch('main.RedisStreamer')
     @patch('main.parse_nse')
-    @patch('main.fetch_html')
+    @patch('main.fetch_page')
     def test_job_with_fetch_failure(self, mock_fetch, mock_parse, mock_streamer_class):
         """Test job when fetch fails"""
         # Setup mocks
@@ -42,13 +55,27 @@ class TestJob:
         mock_parse.assert_not_called()
         mock_streamer_class.assert_not_called()
 
+    @patch('main.scheduler.run_once')
+    @patch('main.fetch_page')
+    def test_failed_fetch_schedules_retry(self, mock_fetch, mock_run_once):
+        """Test a retry the fetcher asks for becomes a one-shot job on the same deadline"""
+        def fail(url, deadline, attempt, retry):
+            retry(1.5, attempt + 1)
+            return None
+        mock_fetch.side_effect = fail
+
+        job()
+
+        deadline = mock_fetch.call_args[1]["deadline"]
+        mock_run_once.assert_called_once_with(1.5, job, 2, deadline)
+
     @patch('main.RedisStreamer')
     @patch('main.parse_nse')
-    @patch('main.fetch_html')
+    @patch('main.fetch_page')
     def test_job_with_parse_failure(self, mock_fetch, mock_parse, mock_streamer_class):
         """Test job when parse returns no data"""
         # Setup mocks
-        mock_fetch.return_value = "<html>test</html>"
+        mock_fetch.return_value = Page(b"<html>test</html>", "utf-8")
         mock_parse.return_value = {}
 
         # Execute job
@@ -59,7 +86,7 @@ class TestJob:
 
     @patch('main.RedisStreamer')
     @patch('main.parse_nse')
-    @patch('main.fetch_html')
+    @patch('main.fetch_page')
     def test_job_with_exception(self, mock_fetch, mock_parse, mock_streamer_class):
         """Test job handles exceptions gracefully"""
         # Setup mocks to raise exception
@@ -72,13 +99,58 @@ class TestJob:
         mock_parse.assert_not_called()
         mock_streamer_class.assert_not_called()
 
+    @patch('main.RedisStreamer')
+    @patch('main.parse_nse')
+    @patch('main.fetch_page')
+    def test_streamer_reused_across_jobs(self, mock_fetch, mock_parse, mock_streamer_class):
+        """Test the streamer (and its change cache) survives between runs"""
+        mock_fetch.return_value = Page(b"<html>test</html>", "utf-8")
+        mock_parse.return_value = {"ABSA": (19.80, 0.05)}
+
+        job()
+        job()
+
+        mock_streamer_class.assert_called_once()
+        assert mock_streamer_class.return_value.publish_changes.call_count == 2
+
+
+    @patch('main.RedisStreamer')
+    @patch('main.parse_nse')
+    @patch('main.fetch_page')
+    def test_job_uses_parse_pool(self, mock_fetch, mock_parse, mock_streamer_class):
+        """Test parsing is delegated to the worker pool when configured"""
+        mock_fetch.return_value = Page(b"<html>test</html>", "utf-8")
+        pool = Mock()
+        pool.parse.return_value = {"ABSA": (19.80, 0.05)}
+
+        with patch('main._parse_pool', pool):
+            job()
+
+        pool.parse.assert_called_once_with(b"<html>test</html>", "utf-8")
+        mock_parse.assert_not_called()
+        mock_streamer_class.return_value.publish_changes.assert_called_once()
+
+    @patch('main.RedisStreamer')
+    @patch('main.fetch_page')
+    def test_job_skips_on_parse_timeout(self, mock_fetch, mock_streamer_class):
+        """Test a timed-out parse skips the tick without publishing"""
+        mock_fetch.return_value = Page(b"<html>test</html>", "utf-8")
+        pool = Mock()
+        pool.parse.side_effect = ParseTimeout("Parse exceeded 5s")
+
+        with patch('main._parse_pool', pool):
+            job()
+
+        mock_streamer_class.assert_not_called()
+
 
 class TestMain:
     """Test cases for the main function"""
 
+    @patch('main.startup')
     @patch('main.scheduler.schedule_job')
     @patch('main.setup_logging')
-    def test_main_function(self, mock_setup_logging, mock_schedule_job):
+    def test_main_function(self, mock_setup_logging, mock_schedule_job, mock_startup):
         """Test main function execution"""
         # Setup mock to avoid infinite loop
         mock_schedule_job.side_effect = KeyboardInterrupt()
@@ -88,11 +160,27 @@ class TestMain:
 
         # Verify setup was called
         mock_setup_logging.assert_called_once()
-        mock_schedule_job.assert_called_once()
+        mock_startup.assert_called_once()
+        mock_schedule_job.assert_called_once_with(main_module.job, run_now=True)
 
+    @patch('main.startup')
     @patch('main.scheduler.schedule_job')
     @patch('main.setup_logging')
-    def test_main_with_exception(self, mock_setup_logging, mock_schedule_job):
+    def test_main_closes_streamer(self, mock_setup_logging, mock_schedule_job, mock_startup):
+        """Test shutdown releases the streamer's and the fetcher's resources"""
+        mock_schedule_job.side_effect = KeyboardInterrupt()
+        streamer = Mock()
+
+        with patch('main._streamer', streamer), patch('main.fetcher.close') as mock_close:
+            main()
+
+        streamer.close.assert_called_once()
+        mock_close.assert_called_once()
+
+    @patch('main.startup')
+    @patch('main.scheduler.schedule_job')
+    @patch('main.setup_logging')
+    def test_main_with_exception(self, mock_setup_logging, mock_schedule_job, mock_startup):
         """Test main function handles exceptions"""
         # Setup mock to raise exception
         mock_schedule_job.side_effect = Exception("Scheduler error")
@@ -102,3 +190,96 @@ class TestMain:
             main()
 
         mock_setup_logging.assert_called_once()
+
+    @patch('main.scheduler.schedule_job')
+    @patch('main.setup_logging')
+    def test_main_stops_when_redis_warm_up_fails(self, mock_setup_logging, mock_schedule_job):
+        """Test an unreachable Redis aborts start-up before scheduling"""
+        with patch('main.get_streamer', side_effect=ConnectionError("refused")), \
+             patch('main.fetcher.warm_up', return_value=True), \
+             patch('main.parser.warm_up'):
+            with pytest.raises(ConnectionError):
+                main()
+
+        mock_schedule_job.assert_not_called()
+
+
+class TestStartup:
+    """Test cases for the start-up warm-up"""
+
+    @patch('main.parser.warm_up')
+    @patch('main.fetcher.warm_up')
+    @patch('main.get_streamer')
+    def test_warms_everything_and_marks_ready(self, mock_get_streamer, mock_http, mock_parser):
+        """Test Redis, HTTP and parser are warmed before readiness is signalled"""
+        readiness = Mock()
+
+        with patch('main._readiness', readiness):
+            main_module.startup()
+
+        mock_get_streamer.assert_called_once()
+        mock_http.assert_called_once_with(main_module.config.URL)
+        mock_parser.assert_called_once()
+        readiness.mark_ready.assert_called_once()
+
+    @patch('main.parser.warm_up')
+    @patch('main.fetcher.warm_up')
+    @patch('main.get_streamer')
+    def test_parser_not_warmed_with_parse_pool(self, mock_get_streamer, mock_http, mock_parser):
+        """Test the in-process parser is left cold when a worker pool parses"""
+        with patch('main._parse_pool', Mock()):
+            main_module.startup()
+
+        mock_parser.assert_not_called()
+
+    @patch('main.parser.warm_up')
+    @patch('main.fetcher.warm_up', return_value=False)
+    @patch('main.get_streamer')
+    def test_http_failure_still_ready(self, mock_get_streamer, mock_http, mock_parser):
+        """Test an unreachable upstream does not block readiness"""
+        readiness = Mock()
+
+        with patch('main._readiness', readiness):
+            main_module.startup()
+
+        readiness.mark_ready.assert_called_once()
+
+
+class TestPushForwarding:
+    """Test cases for forwarding published ticks to the push gateway"""
+
+    @patch('main.RedisStreamer')
+    @patch('main.parse_nse')
+    @patch('main.fetch_page')
+    def test_job_forwards_changes(self, mock_fetch, mock_parse, mock_streamer_class):
+        """Test the entries publish_changes returned and the board are pushed to subscribers"""
+        mock_fetch.return_value = Page(b"<html>test</html>", "utf-8")
+        mock_parse.return_value = {"ABSA": (19.80, 0.05)}
+        changes = [{"ticker": "ABSA", "price": "19.8"}]
+        mock_streamer_class.return_value.publish_changes.return_value = changes
+        gateway = Mock()
+
+        with patch('main._gateway', gateway):
+            job()
+
+        gateway.publish.assert_called_once_with(changes, board={"ABSA": (19.80, 0.05)})
+
+    @patch('main.IndicatorStage.from_config')
+    @patch('main.RedisStreamer')
+    def test_indicators_share_parser_symbol_table(self, mock_streamer_class, mock_from_config):
+        """Test the indicator stage indexes by the table the parser assigns ids from"""
+        main_module.get_streamer()
+
+        mock_from_config.assert_called_once_with(symbol_table=main_module._symbols)
+
+    @patch('main.fetcher.fetch_stats')
+    @patch('main.RedisStreamer')
+    def test_stats_include_gateway(self, mock_streamer_class, mock_fetch_stats):
+        """Test the readiness details merge streamer, fetch and gateway counters"""
+        mock_streamer_class.return_value.stats.return_value = {"published": 5}
+        mock_fetch_stats.return_value = {"breaker_state": 0}
+        gateway = Mock()
+        gateway.stats.return_value = {"push_subscribers": 2}
+
+        with patch('main._gateway', gateway):
+            assert main_module.stats() == {"published": 5, "breaker_state": 0, "push_subscribers": 2}
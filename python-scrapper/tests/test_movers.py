@@ -0,0 +1,133 @@
+"""Tests for movers module"""
+
+import pytest
+from unittest.mock import Mock, patch
+import movers
+from movers import index_key, rebuild_from_stream, scores_for, stage_updates, top_movers, trading_day, verify
+
+# 2022-01-20 16:00:00 UTC
+TS = 1642694400
+DAY = "20220120"
+DAY_START_MS = 1642636800000
+
+
+def entry(ms, ticker, price, change=None):
+    fields = {b"ticker": ticker.encode(), b"price": str(price).encode()}
+    if change is not None:
+        fields[b"price_change"] = str(change).encode()
+    return (f"{ms}-0".encode(), fields)
+
+
+class TestScores:
+    """Test cases for index scoring"""
+
+    def test_trading_day_is_utc_date(self):
+        """Test the day key is the UTC date"""
+        assert trading_day(TS) == DAY
+
+    def test_scores_from_day_change(self):
+        """Test percent change is relative to the previous close"""
+        pct, abs_change = scores_for({"ticker": "ABSA", "price": "20.0", "price_change": "1.0"})
+
+        assert pct == pytest.approx(5.2632)
+        assert abs_change == 1.0
+
+    def test_no_change_no_scores(self):
+        """Test entries without a page change are not scored"""
+        assert scores_for({"ticker": "ABSA", "price": "20.0"}) is None
+
+
+class TestStageUpdates:
+    """Test cases for queuing index updates on a pipeline"""
+
+    def test_updates_all_indexes(self):
+        """Test pct/abs are set, count incremented and keys expire"""
+        pipe = Mock()
+        entries = [
+            {"ticker": "ABSA", "price": "20.0", "price_change": "1.0"},
+            {"ticker": "NOK", "price": "100.0"},
+        ]
+
+        stage_updates(pipe, entries, TS)
+
+        assert pipe.zincrby.call_count == 2
+        pipe.zincrby.assert_any_call(index_key("count", DAY), 1, "NOK")
+        pipe.zadd.assert_any_call(index_key("abs", DAY), {"ABSA": 1.0})
+        assert pipe.expire.call_count == 3
+
+    def test_empty_batch_is_noop(self):
+        """Test nothing is queued when nothing was published"""
+        pipe = Mock()
+
+        stage_updates(pipe, [], TS)
+
+        pipe.assert_not_called()
+        assert pipe.method_calls == []
+
+
+class TestQueriesAndVerify:
+    """Test cases for top-N reads and stream verification"""
+
+    def test_top_gainers(self):
+        """Test gainers read the highest scores first"""
+        r = Mock()
+        r.zrange.return_value = [(b"ABSA", 5.26), (b"BAT", 1.1)]
+
+        assert top_movers(r, "pct", n=2, day=DAY) == [("ABSA", 5.26), ("BAT", 1.1)]
+        r.zrange.assert_called_once_with(index_key("pct", DAY), 0, 1, desc=True, withscores=True)
+
+    def test_rebuild_from_complete_stream(self):
+        """Test the last entry of the day sets pct/abs and every entry counts"""
+        r = Mock()
+        r.xrange.side_effect = [
+            [entry(DAY_START_MS - 1000, "ABSA", 19.0, 0.0)],
+            [entry(DAY_START_MS + 1, "ABSA", 19.5, 0.5), entry(DAY_START_MS + 2, "ABSA", 20.0, 1.0)],
+        ]
+
+        rebuilt, complete = rebuild_from_stream(r, DAY, "test:stream")
+
+        assert complete
+        assert rebuilt["count"] == {"ABSA": 2}
+        assert rebuilt["abs"] == {"ABSA": 1.0}
+
+    def test_verify_reports_and_repairs(self):
+        """Test mismatches are listed and --repair rewrites the indexes"""
+        r = Mock()
+        r.xrange.side_effect = [
+            [entry(DAY_START_MS - 1000, "ABSA", 19.0, 0.0)],
+            [entry(DAY_START_MS + 1, "ABSA", 20.0, 1.0)],
+        ]
+        stored = {
+            index_key("pct", DAY): [(b"ABSA", 5.2632)],
+            index_key("abs", DAY): [(b"ABSA", 0.5)],
+            index_key("count", DAY): [(b"ABSA", 1.0)],
+        }
+        r.zrange.side_effect = lambda key, *a, **kw: stored[key]
+
+        problems = verify(r, DAY, "test:stream", repair=True)
+
+        assert problems == ["abs ABSA: index=0.5 stream=1.0"]
+        r.pipeline.return_value.execute.assert_called_once()
+
+    def test_verify_tolerates_trimmed_stream(self):
+        """Test counts are a lower bound once the day has been trimmed"""
+        r = Mock()
+        r.xrange.side_effect = [
+            [entry(DAY_START_MS + 5000, "ABSA", 20.0, 1.0)],
+            [entry(DAY_START_MS + 5000, "ABSA", 20.0, 1.0)],
+        ]
+        stored = {
+            index_key("pct", DAY): [(b"ABSA", 5.2632), (b"BAT", 0.4)],
+            index_key("abs", DAY): [(b"ABSA", 1.0), (b"BAT", 1.5)],
+            index_key("count", DAY): [(b"ABSA", 7.0), (b"BAT", 2.0)],
+        }
+        r.zrange.side_effect = lambda key, *a, **kw: stored[key]
+
+        assert verify(r, DAY, "test:stream") == []
+
+    @patch('movers.verify', return_value=["abs ABSA: index=0.5 stream=1.0"])
+    @patch('movers.redis.Redis.from_url')
+    def test_cli_exit_code(self, mock_redis, mock_verify):
+        """Test the CLI fails on inconsistencies unless repairing"""
+        assert movers.main(["verify", "--day", DAY]) == 1
+        assert movers.main(["verify", "--day", DAY, "--repair"]) == 0
@@ -0,0 +1,67 @@
+"""Tests for parse_pool module"""
+
+import time
+import pytest
+from parse_pool import (
+    ParsePool,
+    ParseTimeout,
+    ParseWorkerError,
+)
+from board import Board
+
+
+def slow_parse(body, encoding=None):
+    """Parse stand-in that hangs on a marker page (must be importable by workers)"""
+    if body == b"hang":
+        time.sleep(60)
+    if body == b"boom":
+        raise ValueError("bad page")
+    return {"ABSA": (19.80, 0.05)}
+
+
+@pytest.fixture
+def pool():
+    pool = ParsePool(workers=1, timeout=2.0)
+    yield pool
+    pool.close()
+
+
+class TestParsePool:
+    """Test cases for the worker process pool"""
+
+    def test_parse_in_worker(self, pool, sample_nse_html):
+        """Test a page parsed out of process matches an in-process parse"""
+        result = pool.parse(sample_nse_html.encode("utf-8"), "utf-8")
+
+        assert isinstance(result, Board)
+        assert result.volume_of("ABSA") == 426200
+        assert result == {
+            "ABSA": (19.80, 0.05),
+            "BAT": (377.50, -1.25),
+            "NOKCHANGE": (100.00, None),
+        }
+
+    def test_runaway_worker_is_replaced(self):
+        """Test a parse over the timeout kills the worker and the pool recovers"""
+        pool = ParsePool(workers=1, timeout=1.0, parse_fn=slow_parse)
+        try:
+            old_pid = pool._workers[0].process.pid
+            with pytest.raises(ParseTimeout):
+                pool.parse(b"hang")
+
+            assert pool.timeouts == 1
+            assert pool._workers[0].process.pid != old_pid
+            pool.timeout = 10.0
+            assert pool.parse(b"ok") == {"ABSA": (19.80, 0.05)}
+        finally:
+            pool.close()
+
+    def test_worker_exception_is_reported(self):
+        """Test an exception inside the worker surfaces without killing it"""
+        pool = ParsePool(workers=1, timeout=10.0, parse_fn=slow_parse)
+        try:
+            with pytest.raises(ParseWorkerError, match="bad page"):
+                pool.parse(b"boom")
+            assert pool.parse(b"ok") == {"ABSA": (19.80, 0.05)}
+        finally:
+            pool.close()
@@ -3,6 +3,7 @@
 import pytest
 from unittest.mock import patch
 from parser import parse_nse
+from board import Board, SymbolTable
 
 
 class TestParseNSE:
@@ -192,3 +193,62 @@ class TestParseNSE:
         # Verify info logging was called
         mock_logger.info.assert_called_once()
         assert "Parsed 1 tickers from NSE table" in str(mock_logger.info.call_args)
+
+    def test_parse_bytes_with_declared_encoding(self, sample_nse_html):
+        """Test raw bytes parse identically to the decoded text"""
+        body = sample_nse_html.encode("utf-8")
+
+        assert parse_nse(body, encoding="utf-8") == parse_nse(sample_nse_html)
+
+    def test_parse_bytes_uses_given_encoding(self):
+        """Test the declared encoding is used to decode non-ASCII bytes"""
+        html = (
+            "<table><tbody><tr><td>CAFÉ</td><td>Café Plc</td>"
+            "<td>1,000</td><td>10.00</td><td>+0.50</td></tr></tbody></table>"
+        )
+
+        result = parse_nse(html.encode("latin-1"), encoding="latin-1")
+
+        assert result == {"CAFÉ": (10.00, 0.50)}
+
+    def test_parse_bytes_meta_charset_used_without_header(self):
+        """Test a <meta> charset applies when no encoding is declared"""
+        html = (
+            "<html><head><meta charset=\"utf-8\"></head><body>"
+            "<table><tbody><tr><td>CAFÉ</td><td>Café Plc</td>"
+            "<td>1,000</td><td>10.00</td><td>+0.50</td></tr></tbody></table></body></html>"
+        )
+
+        result = parse_nse(html.encode("utf-8"))
+
+        assert result == {"CAFÉ": (10.00, 0.50)}
+
+    def test_parse_bytes_without_any_charset_uses_fallback(self):
+        """Test undeclared bytes are read as ISO-8859-1 without charset detection"""
+        html = (
+            "<table><tbody><tr><td>CAFÉ</td><td>Café Plc</td>"
+            "<td>1,000</td><td>10.00</td><td>+0.50</td></tr></tbody></table>"
+        )
+
+        with patch('bs4.dammit._chardet_dammit') as mock_detect:
+            result = parse_nse(html.encode("latin-1"))
+
+        assert result == {"CAFÉ": (10.00, 0.50)}
+        mock_detect.assert_not_called()
+
+    def test_parse_returns_board_with_volume_and_names(self, sample_nse_html):
+        """Test the name and volume columns are kept"""
+        result = parse_nse(sample_nse_html)
+
+        assert isinstance(result, Board)
+        assert result.volume_of("ABSA") == 426200
+        assert result.name_of("BAT") == "British American Tobacco Kenya"
+
+    def test_parse_with_shared_symbol_table(self, sample_nse_html):
+        """Test successive parses share stable ticker ids"""
+        table = SymbolTable()
+
+        first = parse_nse(sample_nse_html, symbol_table=table)
+        second = parse_nse(sample_nse_html, symbol_table=table)
+
+        assert list(first.ids) == list(second.ids) == [0, 1, 2]
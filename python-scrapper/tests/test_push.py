@@ -0,0 +1,230 @@
+"""Tests for push module"""
+
+import json
+import socket
+import time
+import pytest
+from unittest.mock import patch, Mock
+import push
+from push import PushGateway, encode_event
+from streamer import RedisStreamer
+
+
+@pytest.fixture
+def gateway():
+    """A started gateway on a free local port"""
+    gw = PushGateway(port=0, host="127.0.0.1", queue_size=4, heartbeat=0.2)
+    gw.start()
+    yield gw
+    gw.close()
+
+
+class SSEClient:
+    """Minimal blocking SSE reader over a raw socket"""
+
+    def __init__(self, port, path="/events", read=True):
+        self.sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+        self.sock.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        self.buffer = b""
+        if read:
+            self.status = self._read_until(b"\r\n\r\n").split(b"\r\n", 1)[0]
+
+    def _read_until(self, marker):
+        while marker not in self.buffer:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("closed")
+            self.buffer += chunk
+        head, _, self.buffer = self.buffer.partition(marker)
+        return head
+
+    def event(self):
+        """Return (event, id, data) of the next event, skipping comments"""
+        while True:
+            block = self._read_until(b"\n\n").decode()
+            if block.startswith(":"):
+                continue
+            lines = dict(line.split(": ", 1) for line in block.split("\n"))
+            return lines["event"], int(lines["id"]), json.loads(lines["data"])
+
+    def close(self):
+        self.sock.close()
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            raise AssertionError("condition not met")
+        time.sleep(0.01)
+
+
+def tick(ticker, price):
+    return {"ticker": ticker, "price": str(price), "ts": "1700000000"}
+
+
+class TestPushGateway:
+    """Test cases for the PushGateway class"""
+
+    def test_from_config_disabled(self):
+        """Test no gateway when PUSH_PORT is 0"""
+        with patch('push.config') as mock_config:
+            mock_config.PUSH_PORT = 0
+            assert PushGateway.from_config() is None
+
+    def test_from_config_enabled(self):
+        """Test gateway settings are taken from config"""
+        with patch('push.config') as mock_config:
+            mock_config.PUSH_PORT = 8090
+            mock_config.PUSH_QUEUE_SIZE = 16
+            mock_config.PUSH_HEARTBEAT = 5
+            gw = PushGateway.from_config()
+
+        assert gw.port == 8090
+        assert gw.queue_size == 16
+        assert gw.heartbeat == 5
+
+    def test_encode_event(self):
+        """Test SSE framing of an event"""
+        payload = encode_event("delta", 7, [tick("ABSA", 19.8)])
+
+        assert payload == b'id: 7\nevent: delta\ndata: [{"ticker":"ABSA","price":"19.8","ts":"1700000000"}]\n\n'
+
+    def test_snapshot_then_deltas(self, gateway):
+        """Test a subscriber gets the current board once, then only deltas"""
+        gateway.publish([tick("ABSA", 19.8), tick("KCB", 40.0)])
+        gateway.publish([tick("ABSA", 19.9)])
+        client = SSEClient(gateway.port)
+        try:
+            assert client.status == b"HTTP/1.1 200 OK"
+            event, event_id, data = client.event()
+            assert (event, event_id) == ("snapshot", 2)
+            assert data == [tick("ABSA", 19.9), tick("KCB", 40.0)]
+
+            gateway.publish([tick("KCB", 40.5)])
+            assert client.event() == ("delta", 3, [tick("KCB", 40.5)])
+        finally:
+            client.close()
+
+    def test_unpublished_tickers_in_snapshot(self, gateway):
+        """Test board tickers without a published entry still reach the snapshot"""
+        with patch('push.time.time', return_value=1700000000):
+            gateway.publish([tick("ABSA", 19.8)], board={"ABSA": (19.8, None), "KCB": (40.0, None)})
+            gateway.publish([], board={"ABSA": (19.8, None), "KCB": (40.5, None)})
+        client = SSEClient(gateway.port)
+        try:
+            event, event_id, data = client.event()
+            assert (event, event_id) == ("snapshot", 1)
+            # KCB keeps its first quote: only published entries replace it
+            assert data == [tick("ABSA", 19.8), tick("KCB", 40.0)]
+        finally:
+            client.close()
+        assert gateway.stats()["push_events"] == 1
+
+    def test_snapshot_after_restart(self, gateway):
+        """Test a restarted server-side streamer's unchanged tickers are in the snapshot"""
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        r = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        with patch('streamer.redis.Redis.from_url', return_value=r):
+            RedisStreamer(server_side=True).publish_changes(
+                {"ABSA": (19.80, None), "BAT": (377.50, None)}, ts=1700000000
+            )
+
+            restarted = RedisStreamer(server_side=True)
+            board = {"ABSA": (19.85, None), "BAT": (377.50, None)}
+            changes = restarted.publish_changes(board, ts=1700000005)
+            gateway.publish(changes, board=board)
+
+        assert [fields["ticker"] for fields in changes] == ["ABSA"]
+        client = SSEClient(gateway.port)
+        try:
+            event, _, data = client.event()
+            assert event == "snapshot"
+            assert [(fields["ticker"], fields["price"]) for fields in data] == [("ABSA", "19.85"), ("BAT", "377.5")]
+        finally:
+            client.close()
+
+    def test_empty_tick_not_sent(self, gateway):
+        """Test a tick without changes sends no event"""
+        gateway.publish([])
+
+        assert gateway.stats()["push_events"] == 0
+
+    def test_serialized_once_per_tick(self, gateway):
+        """Test every subscriber gets the same bytes from one serialization"""
+        clients = [SSEClient(gateway.port) for _ in range(3)]
+        try:
+            for client in clients:
+                client.event()
+            wait_for(lambda: gateway.stats()["push_subscribers"] == 3)
+
+            with patch('push.json.dumps', wraps=json.dumps) as dumps:
+                gateway.publish([tick("ABSA", 20.0)])
+                events = [client.event() for client in clients]
+
+            assert dumps.call_count == 1
+            assert all(event == ("delta", 1, [tick("ABSA", 20.0)]) for event in events)
+        finally:
+            for client in clients:
+                client.close()
+
+    def test_slow_subscriber_dropped(self, gateway):
+        """Test a subscriber that falls queue_size events behind is disconnected"""
+        subscriber = Mock()
+        subscriber.queue = push.asyncio.Queue(1)
+        subscriber.queue.put_nowait(b"unread")
+        gateway._subscribers.add(subscriber)
+
+        gateway._fan_out(1, b"payload", [tick("ABSA", 20.0)])
+
+        assert subscriber not in gateway._subscribers
+        subscriber.writer.transport.abort.assert_called_once()
+        subscriber.task.cancel.assert_called_once()
+        assert gateway.stats()["push_dropped"] == 1
+
+    def test_heartbeat_sent_when_idle(self, gateway):
+        """Test an idle connection receives keep-alive comments"""
+        client = SSEClient(gateway.port)
+        try:
+            client.event()
+            assert client._read_until(b"\n\n") == b": keep-alive"
+        finally:
+            client.close()
+
+    def test_unknown_path(self, gateway):
+        """Test paths other than /events are rejected"""
+        client = SSEClient(gateway.port, path="/nope")
+        try:
+            assert client.status == b"HTTP/1.1 404 Not Found"
+        finally:
+            client.close()
+
+    def test_disconnect_unregisters(self, gateway):
+        """Test a subscriber that goes away is removed"""
+        client = SSEClient(gateway.port)
+        client.event()
+        wait_for(lambda: gateway.stats()["push_subscribers"] == 1)
+
+        client.close()
+        gateway.publish([tick("ABSA", 20.0)])
+
+        wait_for(lambda: gateway.stats()["push_subscribers"] == 0)
+
+    def test_close_disconnects_subscribers(self):
+        """Test closing the gateway ends open streams"""
+        gw = PushGateway(port=0, host="127.0.0.1")
+        gw.start()
+        client = SSEClient(gw.port)
+        client.event()
+
+        gw.close()
+
+        with pytest.raises(ConnectionError):
+            client._read_until(b"\n\n")
+        client.close()
+
+    def test_port_in_use(self, gateway):
+        """Test start fails when the port is taken"""
+        with pytest.raises(OSError):
+            PushGateway(port=gateway.port, host="127.0.0.1").start()
@@ -0,0 +1,39 @@
+"""Tests for scheduler module"""
+
+import pytest
+from unittest.mock import Mock
+import schedule
+from scheduler import run_once
+
+
+@pytest.fixture(autouse=True)
+def clear_jobs():
+    """Start and end each test with no scheduled jobs"""
+    schedule.clear()
+    yield
+    schedule.clear()
+
+
+class TestRunOnce:
+    """Test cases for one-shot jobs"""
+
+    def test_runs_once_with_arguments(self):
+        """Test the job runs with its arguments and is then dropped"""
+        func = Mock()
+        run_once(2.5, func, 3, "deadline")
+
+        assert len(schedule.get_jobs()) == 1
+        schedule.run_all()
+        schedule.run_all()
+
+        func.assert_called_once_with(3, "deadline")
+        assert schedule.get_jobs() == []
+
+    def test_not_run_before_delay(self):
+        """Test the job waits out its delay"""
+        func = Mock()
+        run_once(60, func)
+
+        schedule.run_pending()
+
+        func.assert_not_called()
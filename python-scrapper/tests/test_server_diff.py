@@ -0,0 +1,150 @@
+"""Tests for server_diff module"""
+
+import pytest
+from unittest.mock import Mock, patch
+from server_diff import PUBLISH_SCRIPT, ServerDiff
+from streamer import RedisStreamer
+
+
+@pytest.fixture
+def fake_redis():
+    """An in-process Redis that runs the real Lua script"""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.FakeRedis(server=fakeredis.FakeServer())
+
+
+class TestServerDiff:
+    """Test cases for the Lua publish primitive wrapper"""
+
+    def test_script_registered_once(self):
+        """Test the script is registered at construction (EVALSHA afterwards)"""
+        r = Mock()
+
+        ServerDiff(r, state_key="test:last")
+
+        r.register_script.assert_called_once_with(PUBLISH_SCRIPT)
+
+    def test_encode_board(self, sample_ticker_data):
+        """Test boards flatten to 5-value groups with blanks for no change"""
+        args = ServerDiff.encode_board(sample_ticker_data)
+
+        assert args == [
+            "ABSA", "19.8", "0.05", "0.05", "up",
+            "BAT", "377.5", "-1.25", "1.25", "down",
+            "NOKCHANGE", "100.0", "", "", "",
+        ]
+
+    @patch('server_diff.config')
+    def test_publish_decodes_changed_entries(self, mock_config):
+        """Test the script reply is returned as field dicts"""
+        mock_config.STREAM_NAME = "test:stream"
+        r = Mock()
+        script = r.register_script.return_value
+        script.return_value = [[b"ticker", b"ABSA", b"price", b"19.8", b"ts", b"1642694400"]]
+
+        published = ServerDiff(r, state_key="test:last").publish({"ABSA": (19.80, None)}, 1642694400, 1000)
+
+        assert published == [{"ticker": "ABSA", "price": "19.8", "ts": "1642694400"}]
+        script.assert_called_once_with(
+            keys=["test:stream", "test:last"],
+            args=[1000, 1642694400, "ABSA", "19.8", "", "", ""],
+        )
+
+    def test_empty_board_skips_round_trip(self):
+        """Test nothing is sent for an empty board"""
+        r = Mock()
+
+        assert ServerDiff(r).publish({}, 0, 1000) == []
+        r.register_script.return_value.assert_not_called()
+
+
+class TestPublishScript:
+    """Test cases for PUBLISH_SCRIPT itself, run by an in-process Redis"""
+
+    def entries(self, r):
+        return [{k.decode(): v.decode() for k, v in fields.items()} for _, fields in r.xrange("test:stream")]
+
+    @patch('server_diff.config')
+    def test_first_unchanged_and_changed_ticks(self, mock_config, fake_redis):
+        """Test only first and changed prices are added, with the hash tracking them"""
+        mock_config.STREAM_NAME = "test:stream"
+        diff = ServerDiff(fake_redis, state_key="test:last")
+
+        first = diff.publish({"ABSA": (19.80, 0.05), "NOKCHANGE": (100.00, None)}, 1642694400, 1000)
+        unchanged = diff.publish({"ABSA": (19.80, 0.05), "NOKCHANGE": (100.00, None)}, 1642694405, 1000)
+        changed = diff.publish({"ABSA": (19.85, 0.10), "NOKCHANGE": (100.00, None)}, 1642694410, 1000)
+
+        assert first == [
+            {"ticker": "ABSA", "price": "19.8", "ts": "1642694400", "price_change": "0.05",
+             "price_change_abs": "0.05", "price_change_direction": "up"},
+            {"ticker": "NOKCHANGE", "price": "100.0", "ts": "1642694400"},
+        ]
+        assert unchanged == []
+        assert changed == [
+            {"ticker": "ABSA", "price": "19.85", "ts": "1642694410", "price_change": "0.1",
+             "price_change_abs": "0.1", "price_change_direction": "up",
+             "calculated_change": "0.05000000000000071", "calculated_pct_change": "0.2525"},
+        ]
+        assert self.entries(fake_redis) == first + changed
+        assert fake_redis.hgetall("test:last") == {b"ABSA": b"19.85", b"NOKCHANGE": b"100.0"}
+        assert diff.last_prices() == {"ABSA": 19.85, "NOKCHANGE": 100.0}
+
+    @patch('streamer.config')
+    @patch('server_diff.config')
+    def test_fields_match_client_side_path(self, mock_config, mock_streamer_config, fake_redis):
+        """Test the script writes the same text as the streamer's client-side path"""
+        for cfg in (mock_config, mock_streamer_config):
+            cfg.STREAM_NAME = "test:stream"
+        mock_streamer_config.TIMESTAMP_MS = False
+        diff = ServerDiff(fake_redis, state_key="test:last")
+        client = RedisStreamer.__new__(RedisStreamer)
+        boards = [
+            {"ABSA": (19.80, 0.05), "BAT": (377.50, -1.25), "KQ": (4.0, None), "TINY": (0.0003, None)},
+            {"ABSA": (19.70, -0.10), "BAT": (381.275, 2.5), "KQ": (4.04, None), "TINY": (0.00031, None)},
+            {"ABSA": (1e15, None), "BAT": (0.1, None), "KQ": (8.08, None), "TINY": (3e-7, None)},
+            {"ABSA": (1e15 + 2, None), "BAT": (0.3, None), "KQ": (8.0, None), "TINY": (3.01e-7, None)},
+        ]
+
+        last, written = {}, []
+        for ts, board in enumerate(boards):
+            published = diff.publish(board, ts, 1000)
+            expected = [client._build_fields(t, *q, last.get(t), ts) for t, q in board.items()]
+            assert published == expected
+            written += published
+            last = {t: q[0] for t, q in board.items()}
+
+        # Cases where %.17g and tostring() differed from str()
+        assert ("KQ", "1.0") in [(f["ticker"], f.get("calculated_pct_change")) for f in written]
+        assert ("ABSA", "-0.10000000000000142") in [(f["ticker"], f.get("calculated_change")) for f in written]
+
+
+class TestServerSideStreamer:
+    """Test cases for RedisStreamer's server-side publish path"""
+
+    @patch('streamer.redis.Redis.from_url')
+    @patch('streamer.config')
+    def test_publish_through_script(self, mock_config, mock_redis, mock_redis_instance):
+        """Test the board goes through the script and the local cache mirrors it"""
+        mock_config.TIMESTAMP_MS = False
+        mock_config.STREAM_NAME = "test:stream"
+        mock_config.STREAM_MAXLEN = 1000
+        script = mock_redis_instance.register_script.return_value
+        script.return_value = [[b"ticker", b"ABSA", b"price", b"19.8", b"ts", b"1642694400"]]
+        mock_redis.return_value = mock_redis_instance
+
+        streamer = RedisStreamer(server_side=True)
+        published = streamer.publish_changes({"ABSA": (19.80, None), "BAT": (377.50, None)}, ts=1642694400)
+
+        assert [fields["ticker"] for fields in published] == ["ABSA"]
+        assert streamer.last_prices == {"ABSA": 19.80}
+        assert streamer.published == 1
+        mock_redis_instance.xadd.assert_not_called()
+
+    @patch('streamer.redis.Redis.from_url')
+    def test_incompatible_modes_rejected(self, mock_redis, mock_redis_instance):
+        """Test server-side diffing refuses idempotent mode"""
+        mock_redis.return_value = mock_redis_instance
+
+        with pytest.raises(ValueError):
+            RedisStreamer(server_side=True, idempotent=True)
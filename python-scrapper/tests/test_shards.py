@@ -0,0 +1,150 @@
+"""Tests for shards module"""
+
+import pytest
+from unittest.mock import Mock, patch
+from redis.exceptions import ConnectionError as RedisConnectionError, MovedError
+from shards import ClusterShards, HashRingShards, Shards, snapshot_key, stream_key
+
+URLS = ["redis://a:6379", "redis://b:6379", "redis://c:6379"]
+TICKERS = [f"T{i:03d}" for i in range(300)]
+
+
+def ring(urls=URLS):
+    """A ring over mock clients"""
+    return HashRingShards(urls, clients={url: Mock() for url in urls})
+
+
+class TestKeys:
+    """Test cases for per-ticker key names"""
+
+    @patch('shards.config')
+    def test_keys_share_hash_tag(self, mock_config):
+        """Test a ticker's stream and snapshot carry the same hash tag"""
+        mock_config.STREAM_NAME = "nse:realtime"
+        mock_config.SNAPSHOT_PREFIX = "nse:snapshot"
+        assert stream_key("ABSA") == "nse:realtime:{ABSA}"
+        assert snapshot_key("ABSA") == "nse:snapshot:{ABSA}"
+
+
+class TestHashRing:
+    """Test cases for client-side consistent hashing"""
+
+    def test_spreads_tickers_across_nodes(self):
+        """Test every node owns a reasonable share of tickers"""
+        counts = {url: 0 for url in URLS}
+        shards = ring()
+        for ticker in TICKERS:
+            counts[shards.node_for(ticker)] += 1
+        assert all(count > len(TICKERS) / len(URLS) / 2 for count in counts.values())
+
+    def test_adding_a_node_moves_few_tickers(self):
+        """Test only the new node's arcs change owner"""
+        before = ring()
+        after = ring(URLS + ["redis://d:6379"])
+        moved = [t for t in TICKERS if before.node_for(t) != after.node_for(t)]
+
+        assert all(after.node_for(t) == "redis://d:6379" for t in moved)
+        assert len(moved) < len(TICKERS) / 2
+
+    def test_requires_urls(self):
+        """Test an empty URL list is rejected"""
+        with pytest.raises(ValueError):
+            HashRingShards([])
+
+
+class TestExecute:
+    """Test cases for per-node parallel pipelines"""
+
+    def test_base_class_is_abstract(self):
+        """Test a layout must provide nodes, node_for and client"""
+        with pytest.raises(TypeError):
+            Shards()
+
+    def test_one_pipeline_per_node(self):
+        """Test each node's indexes are staged on that node's pipeline"""
+        shards = ring()
+        groups = shards.group(TICKERS[:30])
+        staged = {}
+
+        def stage(pipe, indexes):
+            staged[id(pipe)] = indexes
+
+        results = shards.execute(groups, stage)
+        shards.close()
+
+        assert set(results) == set(groups)
+        assert all(error is None for error in results.values())
+        for node, indexes in groups.items():
+            pipe = shards.client(node).pipeline.return_value
+            shards.client(node).pipeline.assert_called_once_with(transaction=False)
+            pipe.execute.assert_called_once()
+            assert staged[id(pipe)] == indexes
+        assert sum(shards.entries.values()) == 30
+
+    def test_failing_node_is_isolated(self):
+        """Test one node's error is reported without failing the others"""
+        shards = ring()
+        groups = shards.group(TICKERS[:30])
+        bad = next(iter(groups))
+        shards.client(bad).pipeline.return_value.execute.side_effect = RedisConnectionError("down")
+
+        results = shards.execute(groups, lambda pipe, indexes: None)
+        shards.close()
+
+        assert isinstance(results[bad], RedisConnectionError)
+        assert all(results[node] is None for node in groups if node != bad)
+        stats = shards.stats()
+        assert stats[f"shard_errors:{bad}"] == 1
+        assert stats[f"shard_entries:{bad}"] == 0
+
+
+class TestCluster:
+    """Test cases for Redis Cluster sharding"""
+
+    def test_routes_by_slot_owner(self):
+        """Test tickers map to the primary owning their stream key's slot"""
+        cluster = Mock()
+        cluster.get_node_from_key.return_value.name = "10.0.0.1:7000"
+        shards = ClusterShards("redis://localhost:7000", cluster=cluster)
+
+        assert shards.node_for("ABSA") == "10.0.0.1:7000"
+        assert cluster.get_node_from_key.call_args[0][0].endswith(":{ABSA}")
+
+    def test_moved_reloads_slot_map(self):
+        """Test a MOVED error refreshes the cluster topology"""
+        cluster = Mock()
+        shards = ClusterShards("redis://localhost:7000", cluster=cluster)
+
+        shards.refresh(MovedError("3999 10.0.0.2:7001"))
+        cluster.nodes_manager.initialize.assert_called_once()
+
+        shards.refresh(RedisConnectionError("down"))
+        cluster.nodes_manager.initialize.assert_called_once()
+
+
+class TestFromConfig:
+    """Test cases for building shards from config"""
+
+    @patch('shards.config')
+    def test_disabled_by_default(self, mock_config):
+        """Test no shards without a SHARD_MODE"""
+        mock_config.SHARD_MODE = ""
+        assert Shards.from_config() is None
+
+    @patch('shards.redis.Redis.from_url')
+    @patch('shards.config')
+    def test_ring_mode(self, mock_config, mock_from_url):
+        """Test ring mode connects to every SHARD_URLS entry"""
+        mock_config.SHARD_MODE = "ring"
+        mock_config.SHARD_URLS = "redis://a:6379, redis://b:6379"
+        shards = Shards.from_config()
+        assert shards is not None
+        assert shards.nodes() == ["redis://a:6379", "redis://b:6379"]
+        assert mock_from_url.call_count == 2
+
+    @patch('shards.config')
+    def test_unknown_mode(self, mock_config):
+        """Test an unknown mode is rejected"""
+        mock_config.SHARD_MODE = "hash"
+        with pytest.raises(ValueError):
+            Shards.from_config()
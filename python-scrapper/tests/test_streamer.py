@@ -3,8 +3,13 @@
 import pytest
 from typing import Dict, Tuple, Optional
 from unittest.mock import patch, Mock, MagicMock
-from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import ConnectionError as RedisConnectionError, ResponseError
+import config
 from streamer import RedisStreamer
+from indicators import IndicatorStage
+from coalescer import Coalescer
+from group_monitor import GroupMonitor
+from shards import HashRingShards
 
 
 class TestRedisStreamer:
@@ -206,3 +211,369 @@ class TestRedisStreamer:
         
         assert call_args[0][0] == "test:stream"  # stream name
         assert 'minid' in call_args[1]
+
+
+@pytest.fixture
+def fake_redis():
+    """An in-process Redis with Lua support, patched in as the streamer's client"""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    r = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+    with patch('streamer.redis.Redis.from_url', return_value=r):
+        yield r
+
+
+def stream_fields(r):
+    return [{k.decode(): v.decode() for k, v in fields.items()} for _, fields in r.xrange(config.STREAM_NAME)]
+
+
+class TestIdempotentPublish:
+    """Test cases for sequence-numbered publishing"""
+
+    def test_changes_numbered_per_ticker(self, fake_redis):
+        """Test each ticker's changes carry its own persisted sequence"""
+        streamer = RedisStreamer(idempotent=True)
+        streamer.publish_changes({"ABSA": (19.80, 0.05), "BAT": (377.50, -1.25)})
+        published = streamer.publish_changes({"ABSA": (19.85, 0.10), "BAT": (377.50, -1.25)})
+
+        assert [(f["ticker"], f["seq"]) for f in stream_fields(fake_redis)] == [("ABSA", "1"), ("BAT", "1"), ("ABSA", "2")]
+        assert [f["seq"] for f in published] == ["2"]
+        assert fake_redis.hgetall(config.STREAM_SEQ_KEY) == {b"ABSA": b"2|19.85", b"BAT": b"1|377.5"}
+        assert streamer.stats() == {"published": 3, "duplicates_rejected": 0}
+
+    def test_restart_resumes_without_republishing(self, fake_redis):
+        """Test a restarted streamer skips unchanged prices and continues the sequence"""
+        RedisStreamer(idempotent=True).publish_changes({"ABSA": (19.80, 0.05), "BAT": (377.50, -1.25)}, ts=2000)
+
+        restarted = RedisStreamer(idempotent=True)
+        published = restarted.publish_changes({"ABSA": (19.90, 0.15), "BAT": (377.50, -1.25)}, ts=2005)
+
+        assert fake_redis.xlen(config.STREAM_NAME) == 3
+        assert [(f["ticker"], f["seq"]) for f in published] == [("ABSA", "2")]
+        assert published[0]["calculated_change"] == str(19.90 - 19.80)
+
+    def test_clock_going_back_still_publishes(self, fake_redis):
+        """Test real changes are accepted whatever the tick timestamp"""
+        streamer = RedisStreamer(idempotent=True)
+        streamer.publish_changes({"ABSA": (19.80, 0.05)}, ts=2000)
+        published = streamer.publish_changes({"ABSA": (19.90, 0.15)}, ts=1000)
+
+        assert len(published) == 1
+        assert fake_redis.xlen(config.STREAM_NAME) == 2
+
+    def test_batch_replayed_after_lost_reply(self, fake_redis):
+        """Test a batch that landed before the connection dropped is not written twice"""
+        streamer = RedisStreamer(idempotent=True)
+        real_publish = streamer.sequencer.publish
+
+        def lost_reply(batch, maxlen):
+            real_publish(batch, maxlen)
+            raise RedisConnectionError("connection reset")
+
+        attempts = iter([lost_reply, real_publish])
+        with patch.object(streamer.sequencer, 'publish', side_effect=lambda *args: next(attempts)(*args)):
+            published = streamer.publish_changes({"ABSA": (19.80, 0.05)})
+
+        assert fake_redis.xlen(config.STREAM_NAME) == 1
+        assert [f["ticker"] for f in published] == ["ABSA"]
+        assert streamer.stats() == {"published": 1, "duplicates_rejected": 1}
+
+    def test_replayed_change_rejected(self, fake_redis):
+        """Test a change already written under its sequence is counted, not returned"""
+        streamer = RedisStreamer(idempotent=True)
+        # Another process wrote the same change after this one loaded its state
+        fake_redis.hset(config.STREAM_SEQ_KEY, "ABSA", "1|19.8")
+
+        published = streamer.publish_changes({"ABSA": (19.80, 0.05)})
+
+        assert published == []
+        assert fake_redis.xlen(config.STREAM_NAME) == 0
+        assert streamer.stats() == {"published": 0, "duplicates_rejected": 1}
+
+    def test_taken_sequence_resyncs(self, fake_redis):
+        """Test a sequence taken by a different price is adopted and the change retried"""
+        streamer = RedisStreamer(idempotent=True)
+        fake_redis.hset(config.STREAM_SEQ_KEY, "ABSA", "1|25.0")
+
+        assert streamer.publish_changes({"ABSA": (19.80, 0.05)}) == []
+        assert streamer.duplicates_rejected == 0
+        assert streamer.last_prices["ABSA"] == 25.0
+
+        published = streamer.publish_changes({"ABSA": (19.80, 0.05)})
+        assert [f["seq"] for f in published] == ["2"]
+
+    def test_other_response_errors_propagate(self, fake_redis):
+        """Test unrelated Redis errors are not swallowed as duplicates"""
+        fake_redis.set(config.STREAM_NAME, "not a stream")
+        streamer = RedisStreamer(idempotent=True)
+
+        with pytest.raises(ResponseError):
+            streamer.publish_changes({"ABSA": (19.80, 0.05)})
+
+
+class TestCoalescedPublish:
+    """Test cases for publishing through a coalescer"""
+
+    @patch('streamer.redis.Redis.from_url')
+    @patch('streamer.config')
+    def test_flip_flop_is_coalesced_and_flushed(self, mock_config, mock_redis, mock_redis_instance):
+        """Test suppressed flips stay off the stream until the trailing flush"""
+        mock_config.TIMESTAMP_MS = False
+        mock_config.STREAM_NAME = "test:stream"
+        mock_config.STREAM_MAXLEN = 1000
+        mock_redis.return_value = mock_redis_instance
+
+        streamer = RedisStreamer(coalescer=Coalescer(min_interval=30, flush_after=30))
+        streamer.publish_changes({"ABSA": (19.80, 0.05)}, ts=0)
+        streamer.publish_changes({"ABSA": (19.85, 0.10)}, ts=10)
+        streamer.publish_changes({"ABSA": (19.80, 0.05)}, ts=20)
+        streamer.publish_changes({"ABSA": (19.85, 0.10)}, ts=25)
+        assert mock_redis_instance.xadd.call_count == 1
+
+        published = streamer.publish_changes({}, ts=60)
+
+        assert [fields['price'] for fields in published] == ['19.85']
+        assert streamer.last_prices["ABSA"] == 19.85
+        stats = streamer.stats()
+        assert stats["coalesce_suppressed"] == 2
+        assert stats["coalesce_flushed"] == 1
+
+    @patch('streamer.redis.Redis.from_url')
+    @patch('streamer.config')
+    def test_flush_pending_on_shutdown(self, mock_config, mock_redis, mock_redis_instance):
+        """Test flush_pending publishes held values immediately"""
+        mock_config.TIMESTAMP_MS = False
+        mock_config.STREAM_NAME = "test:stream"
+        mock_config.STREAM_MAXLEN = 1000
+        mock_redis.return_value = mock_redis_instance
+
+        streamer = RedisStreamer(coalescer=Coalescer(min_interval=30))
+        streamer.publish_changes({"ABSA": (19.80, 0.05)}, ts=0)
+        streamer.publish_changes({"ABSA": (19.85, 0.10)}, ts=10)
+
+        published = streamer.flush_pending(ts=11)
+
+        assert len(published) == 1
+        assert mock_redis_instance.xadd.call_count == 2
+
+    @patch('streamer.redis.Redis.from_url')
+    @patch('streamer.config')
+    def test_failed_flush_is_retried(self, mock_config, mock_redis, mock_redis_instance):
+        """Test a trailing flush whose write fails stays pending for the next tick"""
+        mock_config.TIMESTAMP_MS = False
+        mock_config.STREAM_NAME = "test:stream"
+        mock_config.STREAM_MAXLEN = 1000
+        mock_redis.return_value = mock_redis_instance
+
+        streamer = RedisStreamer(coalescer=Coalescer(min_interval=30, flush_after=30))
+        streamer.publish_changes({"ABSA": (19.80, 0.05)}, ts=0)
+        streamer.publish_changes({"ABSA": (19.85, 0.10)}, ts=10)
+
+        mock_redis_instance.xadd.side_effect = RedisConnectionError("down")
+        with pytest.raises(RedisConnectionError):
+            streamer.publish_changes({}, ts=60)
+        assert streamer.stats()["coalesce_pending"] == 1
+        assert streamer.stats()["coalesce_flushed"] == 0
+
+        mock_redis_instance.xadd.side_effect = None
+        published = streamer.publish_changes({}, ts=61)
+
+        assert [fields['price'] for fields in published] == ['19.85']
+        assert streamer.stats()["coalesce_pending"] == 0
+        assert streamer.stats()["coalesce_flushed"] == 1
+
+
+class TestGroupBackpressure:
+    """Test cases for adapting to consumer-group backlog"""
+
+    @patch('streamer.redis.Redis.from_url')
+    @patch('streamer.config')
+    def test_raise_maxlen_and_coalesce_under_pressure(self, mock_config, mock_redis, mock_redis_instance):
+        """Test MAXLEN is raised and coalescing engaged, then both restored"""
+        mock_config.TIMESTAMP_MS = False
+        mock_config.STREAM_NAME = "test:stream"
+        mock_config.STREAM_MAXLEN = 1000
+        mock_redis_instance.xinfo_groups.return_value = [{"name": b"java-api", "pending": 100, "lag": 800}]
+        mock_redis.return_value = mock_redis_instance
+        monitor = GroupMonitor(interval=30, actions=["raise_maxlen", "coalesce"], maxlen_factor=4)
+
+        streamer = RedisStreamer(group_monitor=monitor)
+        streamer.publish_changes({"ABSA": (19.80, 0.05)}, ts=0)
+
+        assert mock_redis_instance.xadd.call_args[1]['maxlen'] == 4000
+        assert streamer.coalescer is not None
+        assert streamer.stats()["group_lag:java-api"] == 800
+
+        # Held back by the temporary coalescer
+        streamer.publish_changes({"ABSA": (19.85, 0.10)}, ts=10)
+        assert mock_redis_instance.xadd.call_count == 1
+
+        mock_redis_instance.xinfo_groups.return_value = [{"name": b"java-api", "pending": 0, "lag": 10}]
+        published = streamer.publish_changes({"ABSA": (19.85, 0.10)}, ts=30)
+
+        # The held value is flushed on release and reported with the tick
+        assert [(f["ticker"], f["price"]) for f in published] == [("ABSA", "19.85")]
+        assert streamer.coalescer is None
+        assert streamer.maxlen_override is None
+        assert mock_redis_instance.xadd.call_count == 2
+        assert mock_redis_instance.xadd.call_args[1]['maxlen'] == 1000
+        assert streamer.last_prices["ABSA"] == 19.85
+
+    @patch('streamer.redis.Redis.from_url')
+    @patch('streamer.config')
+    def test_group_read_failure_does_not_block_publish(self, mock_config, mock_redis, mock_redis_instance):
+        """Test a failing XINFO GROUPS is logged and publishing continues"""
+        mock_config.TIMESTAMP_MS = False
+        mock_config.STREAM_NAME = "test:stream"
+        mock_config.STREAM_MAXLEN = 1000
+        mock_redis_instance.xinfo_groups.side_effect = ResponseError("ERR no such key")
+        mock_redis.return_value = mock_redis_instance
+
+        streamer = RedisStreamer(group_monitor=GroupMonitor())
+        streamer.publish_changes({"ABSA": (19.80, 0.05)}, ts=0)
+
+        mock_redis_instance.xadd.assert_called_once()
+
+
+class TestMoversIndex:
+    """Test cases for maintaining movers indexes with each publish"""
+
+    @patch('streamer.redis.Redis.from_url')
+    @patch('streamer.config')
+    def test_index_updates_share_the_publish_pipeline(self, mock_config, mock_redis, mock_redis_instance):
+        """Test XADDs and index updates go out in one pipeline"""
+        mock_config.TIMESTAMP_MS = False
+        mock_config.STREAM_NAME = "test:stream"
+        mock_config.STREAM_MAXLEN = 1000
+        mock_redis.return_value = mock_redis_instance
+        pipe = mock_redis_instance.pipeline.return_value
+
+        streamer = RedisStreamer(movers_index=True)
+        streamer.publish_changes({"ABSA": (19.80, 0.05), "BAT": (377.50, -1.25)}, ts=1642694400)
+
+        mock_redis_instance.pipeline.assert_called_once_with(transaction=False)
+        assert pipe.xadd.call_count == 2
+        assert pipe.zincrby.call_count == 2
+        pipe.execute.assert_called_once()
+        mock_redis_instance.xadd.assert_not_called()
+        assert streamer.published == 2
+
+    def test_idempotent_duplicates_not_indexed(self, fake_redis):
+        """Test rejected duplicates do not bump the update count"""
+        streamer = RedisStreamer(idempotent=True, movers_index=True)
+        fake_redis.hset(config.STREAM_SEQ_KEY, "ABSA", "1|19.8")
+
+        streamer.publish_changes({"ABSA": (19.80, 0.05)})
+
+        assert fake_redis.keys("nse:movers:*") == []
+
+
+class TestIndicatorPublishing:
+    """Test cases for publishing incremental indicators"""
+
+    @patch('streamer.redis.Redis.from_url')
+    @patch('streamer.config')
+    def test_values_ride_on_tick_entries(self, mock_config, mock_redis, mock_redis_instance):
+        """Test indicator values are added to the tick's published fields"""
+        mock_config.TIMESTAMP_MS = False
+        mock_config.STREAM_NAME = "test:stream"
+        mock_config.STREAM_MAXLEN = 1000
+        mock_redis.return_value = mock_redis_instance
+
+        streamer = RedisStreamer(indicators=IndicatorStage([("ema", 3)]))
+        published = streamer.publish_changes({"ABSA": (10.0, None)}, ts=1642694400)
+        assert published[0]["ema_3"] == "10.0"
+
+        published = streamer.publish_changes({"ABSA": (12.0, None)}, ts=1642694410)
+        assert published[0]["ema_3"] == "11.0"
+        fields = mock_redis_instance.xadd.call_args[1]["fields"]
+        assert fields["ema_3"] == "11.0"
+
+    @patch('streamer.redis.Redis.from_url')
+    @patch('streamer.config')
+    def test_separate_stream_gets_changed_values_only(self, mock_config, mock_redis, mock_redis_instance):
+        """Test a separate indicators stream receives only changed values"""
+        mock_config.TIMESTAMP_MS = False
+        mock_config.STREAM_NAME = "test:stream"
+        mock_config.STREAM_MAXLEN = 1000
+        mock_redis.return_value = mock_redis_instance
+        pipe = mock_redis_instance.pipeline.return_value
+
+        stage = IndicatorStage([("sma", 2)], stream="test:indicators", maxlen=500)
+        streamer = RedisStreamer(indicators=stage)
+        board = {"ABSA": (10.0, None), "BAT": (20.0, None)}
+        streamer.publish_changes(board, ts=1)
+        pipe.xadd.assert_not_called()  # window not full yet
+
+        streamer.publish_changes(board, ts=2)
+        assert pipe.xadd.call_count == 2
+        stream, = pipe.xadd.call_args[0]
+        assert stream == "test:indicators"
+        assert pipe.xadd.call_args[1]["maxlen"] == 500
+
+        streamer.publish_changes(board, ts=3)
+        assert pipe.xadd.call_count == 2  # nothing moved
+        assert streamer.stats()["indicators_published"] == 2
+
+        # Tick entries carry no indicator fields in this mode
+        assert "sma_2" not in mock_redis_instance.xadd.call_args[1]["fields"]
+
+    @patch('streamer.redis.Redis.from_url')
+    @patch('streamer.config')
+    def test_server_side_requires_separate_stream(self, mock_config, mock_redis, mock_redis_instance):
+        """Test server-side diffing rejects in-entry indicator fields"""
+        mock_redis.return_value = mock_redis_instance
+        with pytest.raises(ValueError):
+            RedisStreamer(server_side=True, indicators=IndicatorStage([("sma", 2)]))
+
+
+class TestShardedPublish:
+    """Test cases for publishing across shards"""
+
+    @patch('streamer.config')
+    def test_changes_go_to_owning_nodes(self, mock_config):
+        """Test each change lands in its ticker's stream and snapshot on its node"""
+        mock_config.TIMESTAMP_MS = False
+        mock_config.SHARD_STREAM_MAXLEN = 100
+        urls = ["redis://a:6379", "redis://b:6379"]
+        shards = HashRingShards(urls, clients={url: Mock() for url in urls})
+
+        streamer = RedisStreamer(shards=shards)
+        board = {f"T{i}": (10.0 + i, None) for i in range(20)}
+        published = streamer.publish_changes(board, ts=1642694400)
+        shards.close()
+
+        assert len(published) == 20
+        assert streamer.published == 20
+        for ticker in board:
+            pipe = shards.client(shards.node_for(ticker)).pipeline.return_value
+            keys = [c[0][0] for c in pipe.xadd.call_args_list]
+            assert any(key.endswith(f":{{{ticker}}}") for key in keys)
+        stats = streamer.stats()
+        assert sum(stats[f"shard_entries:{url}"] for url in urls) == 20
+
+    @patch('streamer.config')
+    def test_failed_node_retries_next_tick(self, mock_config):
+        """Test tickers on a failed node are not marked published"""
+        mock_config.TIMESTAMP_MS = False
+        mock_config.SHARD_STREAM_MAXLEN = 100
+        urls = ["redis://a:6379", "redis://b:6379"]
+        shards = HashRingShards(urls, clients={url: Mock() for url in urls})
+        shards.client(urls[0]).pipeline.return_value.execute.side_effect = RedisConnectionError("down")
+
+        streamer = RedisStreamer(shards=shards)
+        board = {f"T{i}": (10.0, None) for i in range(20)}
+        published = streamer.publish_changes(board, ts=1)
+        streamer.close()
+
+        for ticker in board:
+            assert (ticker in streamer.last_prices) == (shards.node_for(ticker) != urls[0])
+        # Entries that never reached their node are not reported as published
+        assert sorted(f["ticker"] for f in published) == sorted(streamer.last_prices)
+        assert shards._executor is None
+
+    def test_incompatible_modes_rejected(self):
+        """Test sharding refuses modes that need a single stream"""
+        shards = HashRingShards(["redis://a:6379"], clients={"redis://a:6379": Mock()})
+        with pytest.raises(ValueError):
+            RedisStreamer(shards=shards, idempotent=True)
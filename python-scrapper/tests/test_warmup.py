@@ -0,0 +1,30 @@
+"""Tests for warmup module"""
+
+import threading
+import pytest
+from warmup import warm_up
+
+
+class TestWarmUp:
+    """Test cases for the parallel warm-up"""
+
+    def test_runs_tasks_in_parallel(self):
+        """Test tasks overlap instead of running one after another"""
+        barrier = threading.Barrier(3, timeout=5)
+
+        timings = warm_up({name: barrier.wait for name in ("redis", "http", "parser")})
+
+        assert set(timings) == {"redis", "http", "parser"}
+        assert all(ms >= 0 for ms in timings.values())
+
+    def test_failure_raised_after_all_finish(self):
+        """Test the first error surfaces only once every task is done"""
+        finished = []
+
+        def fail():
+            raise ConnectionError("redis down")
+
+        with pytest.raises(ConnectionError, match="redis down"):
+            warm_up({"redis": fail, "http": lambda: finished.append("http")})
+
+        assert finished == ["http"]
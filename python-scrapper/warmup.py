@@ -0,0 +1,43 @@
+# warmup.py
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up(tasks: Dict[str, Callable[[], Any]]) -> Dict[str, float]:
+    """
+    Run independent warm-up tasks in parallel threads.
+
+    Each task should touch a different lazily imported library (see
+    lazy.py), so imports, connection set-up and network round trips
+    overlap instead of adding up.
+
+    Returns:
+        Dict[str, float]: Milliseconds each task took.
+
+    Raises:
+        Exception: The first task error, after every task has finished.
+    """
+    def timed(fn: Callable[[], Any]) -> float:
+        start = time.perf_counter()
+        fn()
+        return (time.perf_counter() - start) * 1000
+
+    timings: Dict[str, float] = {}
+    error: Exception = None  # type: ignore[assignment]
+    with ThreadPoolExecutor(max_workers=max(len(tasks), 1), thread_name_prefix="warmup") as pool:
+        futures = {name: pool.submit(timed, fn) for name, fn in tasks.items()}
+        for name, future in futures.items():
+            try:
+                timings[name] = future.result()
+            except Exception as e:
+                logger.error(f"Warm-up of {name} failed: {e}")
+                error = error or e
+    if error is not None:
+        raise error
+    logger.info("Warm-up done: " + ", ".join(f"{name} {ms:.0f}ms" for name, ms in timings.items()))
+    return timings